@@ -0,0 +1,217 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+
+# Words that never change what a question asks; everything else must match for a similarity hit
+STOPWORDS = frozenset("""
+a an the and or but if so of to in on at by for with from as into about over after before than then
+i me my we us our you your he him his she her it its they them their this that these those there here
+is are was were be been being am do does did done have has had having will would shall should can could
+may might must just also very really please tell me some any
+don doesn didn isn aren wasn weren won wouldn shouldn couldn haven hasn hadn
+""".split())
+
+# Negations, with the contraction tail left by normalize_text ("don't" -> "don t") folded into "not"
+NEGATIONS = {'not': 'not', 't': 'not', 'cannot': 'not', 'no': 'no', 'never': 'never', 'nor': 'nor',
+             'none': 'none', 'nothing': 'nothing', 'neither': 'neither', 'nobody': 'nobody', 'without': 'without'}
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial variants share a key"""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def ngram_vector(normalized: str, dim=512) -> np.ndarray:
+    """Unit-length hashed vector of character trigrams and words"""
+    vector = np.zeros(dim, dtype=np.float32)
+    padded = f" {normalized} "
+    for i in range(len(padded) - 2):
+        vector[zlib.crc32(padded[i:i + 3].encode()) % dim] += 1.0
+    for word in normalized.split():
+        vector[zlib.crc32(f"w:{word}".encode()) % dim] += 1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def content_signature(normalized: str) -> tuple:
+    """The negations and content words of a question; similar questions must agree on both"""
+    words = normalized.split()
+    negations = frozenset(NEGATIONS[word] for word in words if word in NEGATIONS)
+    content = frozenset(word for word in words if word not in STOPWORDS and word not in NEGATIONS)
+    return negations, content
+
+
+class AnswerCache:
+    """LRU + TTL cache for OpenAI results with an optional SQLite backing store.
+
+    Entries are grouped by namespace (one per client method). Lookups try the
+    normalized text first. With a `similarity_threshold` below 1.0,
+    namespaces listed in `similar_namespaces` then fall back to the nearest
+    cached question by n-gram cosine similarity, provided it has the same
+    negations and content words; a high score alone does not tell "why should
+    we hire you" from "why should we not hire you".
+    """
+
+    def __init__(self, max_entries=1000, ttl=7 * 24 * 3600, path=None,
+                 similarity_threshold=1.0, similar_namespaces=('answer', 'follow_up')):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.similar_namespaces = set(similar_namespaces)
+
+        self.entries = OrderedDict()  # (namespace, key) -> (value, created)
+        self.vectors = {}  # (namespace, key) -> n-gram vector, similarity namespaces only
+        self.matrices = {}  # namespace -> (keys, stacked vectors), rebuilt lazily
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.db = None
+        if path:
+            self._open_store(path)
+
+    def get(self, namespace: str, text: str) -> Optional[Any]:
+        """Cached value for the text, or None"""
+        key = normalize_text(text)
+        with self.lock:
+            value = self._get_exact(namespace, key)
+            if value is not None:
+                self.hits += 1
+                return value
+
+            if namespace in self.similar_namespaces and self.similarity_threshold < 1.0:
+                value = self._get_similar(namespace, key)
+                if value is not None:
+                    self.similar_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, namespace: str, text: str, value: Any):
+        key = normalize_text(text)
+        created = time.time()
+        with self.lock:
+            self._insert(namespace, key, value, created)
+            if self.db is not None:
+                try:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO answer_cache (namespace, key, value, created) VALUES (?, ?, ?, ?)",
+                        (namespace, key, json.dumps(value), created)
+                    )
+                    self.db.commit()
+                except sqlite3.Error as e:
+                    logging.error(f"Error writing answer cache: {e}")
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'similar_hits': self.similar_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits + self.similar_hits) / lookups, 3) if lookups else 0.0
+            }
+
+    def _get_exact(self, namespace, key):
+        entry = self.entries.get((namespace, key))
+        if entry is None:
+            return None
+
+        value, created = entry
+        if time.time() - created > self.ttl:
+            self._remove((namespace, key))
+            return None
+
+        self.entries.move_to_end((namespace, key))
+        return value
+
+    def _get_similar(self, namespace, key):
+        keys, matrix = self._matrix(namespace)
+        if not keys:
+            return None
+
+        scores = matrix @ ngram_vector(key)
+        signature = content_signature(key)
+        for best in np.argsort(-scores):
+            if scores[best] < self.similarity_threshold:
+                return None
+            if content_signature(keys[best]) == signature:
+                logging.debug(f"Answer cache similarity hit ({scores[best]:.2f}): '{key}' ~ '{keys[best]}'")
+                return self._get_exact(namespace, keys[best])
+        return None
+
+    def _matrix(self, namespace):
+        if namespace not in self.matrices:
+            keys = [key for (ns, key) in self.vectors if ns == namespace]
+            matrix = np.stack([self.vectors[(namespace, key)] for key in keys]) if keys else None
+            self.matrices[namespace] = (keys, matrix)
+        return self.matrices[namespace]
+
+    def _insert(self, namespace, key, value, created):
+        self.entries[(namespace, key)] = (value, created)
+        self.entries.move_to_end((namespace, key))
+        if namespace in self.similar_namespaces:
+            self.vectors[(namespace, key)] = ngram_vector(key)
+            self.matrices.pop(namespace, None)
+
+        while len(self.entries) > self.max_entries:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, entry_key):
+        self.entries.pop(entry_key, None)
+        if self.vectors.pop(entry_key, None) is not None:
+            self.matrices.pop(entry_key[0], None)
+        if self.db is not None:
+            try:
+                self.db.execute("DELETE FROM answer_cache WHERE namespace = ? AND key = ?", entry_key)
+                self.db.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Error deleting from answer cache: {e}")
+
+    def _open_store(self, path):
+        """Open the SQLite store and load unexpired entries, most recent last"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS answer_cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, created REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self.db.execute("DELETE FROM answer_cache WHERE created < ?", (time.time() - self.ttl,))
+            self.db.commit()
+
+            rows = self.db.execute(
+                "SELECT namespace, key, value, created FROM answer_cache ORDER BY created DESC LIMIT ?",
+                (self.max_entries,)
+            ).fetchall()
+            for namespace, key, value, created in reversed(rows):
+                self.entries[(namespace, key)] = (json.loads(value), created)
+                if namespace in self.similar_namespaces:
+                    self.vectors[(namespace, key)] = ngram_vector(key)
+            logging.info(f"Loaded {len(rows)} cached answers from {path}")
+
+        except (sqlite3.Error, OSError) as e:
+            logging.error(f"Answer cache store unavailable, using memory only: {e}")
+            self.db = None
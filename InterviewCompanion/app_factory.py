@@ -0,0 +1,96 @@
+import logging
+import os
+
+from flask import Flask, render_template
+
+from config import Config
+from metrics import metrics
+from metrics_routes import metrics_bp
+from qa_routes import qa_bp, register_qa_events
+from services import AppServices, audio_transcription_available, persistence_available, preload
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+
+# What each mode serves: its page, whether it uses Socket.IO, and whether it transcribes audio
+MODES = {
+    'full': {'template': 'index.html', 'sockets': True, 'audio': True},
+    'simple': {'template': 'index_simple.html', 'sockets': True, 'audio': False},
+    'basic': {'template': 'index_basic.html', 'sockets': False, 'audio': False},
+}
+
+
+def create_app(mode: str = None) -> Flask:
+    """Build the Interview Assistant app for the given mode (full, simple or basic).
+
+    Only the blueprints and Socket.IO handlers the mode needs are registered,
+    and heavy dependencies (Whisper, torch, sounddevice, the OpenAI client)
+    are created lazily on first use unless Config.PRELOAD is set.
+    """
+    mode = mode or Config.APP_MODE
+    if mode not in MODES:
+        raise ValueError(f"Unknown app mode '{mode}', expected one of: {', '.join(MODES)}")
+    features = MODES[mode]
+
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SESSION_SECRET", "interview_assistant_secret_key")
+
+    socketio = None
+    if features['sockets']:
+        from flask_socketio import SocketIO
+        from socketio_broker import message_queue_options
+        # Initialize SocketIO for real-time communication, shared across processes if a message queue is set
+        socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading',
+                            **message_queue_options(Config.SOCKETIO_MESSAGE_QUEUE, Config.SOCKETIO_CHANNEL))
+
+    audio_enabled = features['audio'] and audio_transcription_available()
+    if features['audio'] and not audio_enabled:
+        logging.warning(f"Transcription backend '{Config.TRANSCRIPTION_BACKEND}' is not installed; audio transcription is disabled")
+
+    metrics.configure(Config.METRICS_ENABLED, Config.METRICS_SESSION_LABELS, Config.TRACE_SPANS)
+    services = AppServices(mode, socketio=socketio, audio_enabled=audio_enabled)
+    app.extensions['interview_assistant'] = services
+
+    @app.route('/')
+    def index():
+        """Main page with the interview assistant interface"""
+        return render_template(features['template'])
+
+    app.register_blueprint(qa_bp)
+    app.register_blueprint(metrics_bp)
+
+    if persistence_available():
+        from history_routes import history_bp
+        from persistence import PersistenceWriter, init_database
+        init_database(app, Config.DATABASE_URL)
+        services.persistence = PersistenceWriter(
+            app,
+            mode=mode,
+            batch_size=Config.PERSISTENCE_BATCH_SIZE,
+            flush_interval=Config.PERSISTENCE_FLUSH_INTERVAL,
+            max_pending=Config.PERSISTENCE_MAX_PENDING
+        )
+        app.register_blueprint(history_bp)
+    elif Config.PERSISTENCE_ENABLED:
+        logging.warning("flask-sqlalchemy is not installed; session history will not be saved")
+
+    if socketio is not None:
+        register_qa_events(socketio, services)
+
+    if features['audio']:
+        from transcription import register_transcription_events, transcription_bp
+        app.register_blueprint(transcription_bp)
+        register_transcription_events(socketio, services)
+        if audio_enabled:
+            from batch_routes import batch_bp, max_upload_bytes
+            # Caps bodies without a declared length too; uploads are the largest requests the app takes
+            app.config['MAX_CONTENT_LENGTH'] = max_upload_bytes()
+            app.register_blueprint(batch_bp)
+
+    if not Config.OPENAI_API_KEY:
+        logging.warning("OPENAI_API_KEY is not set; answer generation will fail until it is")
+
+    if Config.PRELOAD:
+        preload(services)
+
+    return app
@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+import logging
+import queue
+import random
+import threading
+from typing import AsyncIterator, Iterator, Optional
+
+import httpx
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    InternalServerError,
+    RateLimitError,
+)
+
+# Errors worth retrying: rate limits, timeouts, dropped connections and 5xx responses
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+_STREAM_DONE = object()
+
+
+class AsyncOpenAIClient:
+    """Shared AsyncOpenAI client with pooling, concurrency limits, retries and coalescing.
+
+    All requests run on one background event loop, so every caller shares a
+    single HTTP connection pool. At most `max_in_flight` requests are sent at
+    once. Rate limits and transient failures are retried with full-jitter
+    exponential backoff, and identical requests that arrive while one is
+    already in flight share its result instead of making a second call.
+    Synchronous wrappers let Flask handlers use it without an event loop.
+    """
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, max_in_flight=8, timeout=30.0,
+                 max_retries=4, backoff_base=0.5, backoff_cap=8.0, max_connections=20):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.max_in_flight = max_in_flight
+
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, name="openai-event-loop")
+        self.loop_thread.daemon = True
+        self.loop_thread.start()
+
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,  # retries are handled here, with jitter and coalescing
+            timeout=timeout,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+            )
+        )
+
+        # Only touched from the event loop thread
+        self.semaphore = None
+        self.in_flight = {}
+
+        self.stats_lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    # Async API
+
+    async def complete(self, messages: list, model: str, max_tokens: int, temperature: float) -> str:
+        """Return the completion text, joining an identical in-flight request if there is one"""
+        key = self._request_key(messages, model, max_tokens, temperature)
+        task = self.in_flight.get(key)
+        if task is not None:
+            self._count('coalesced')
+        else:
+            task = asyncio.ensure_future(self._complete_with_retry(messages, model, max_tokens, temperature))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+
+        # Shield so one cancelled waiter doesn't cancel the shared request
+        return await asyncio.shield(task)
+
+    async def stream(self, messages: list, model: str, max_tokens: int, temperature: float) -> AsyncIterator[str]:
+        """Yield completion deltas; retries only happen before the first token is received"""
+        for attempt in range(self.max_retries + 1):
+            received = False
+            try:
+                async with self._limit():
+                    self._count('requests')
+                    response = await self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        stream=True,
+                        timeout=self.timeout
+                    )
+                    async for chunk in response:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            received = True
+                            yield delta
+                return
+            except RETRYABLE_ERRORS as e:
+                if received or attempt == self.max_retries:
+                    self._count('failures')
+                    raise
+                await self._backoff(attempt, e)
+
+    # Synchronous wrappers for Flask / Socket.IO handlers
+
+    def run(self, coroutine, timeout: Optional[float] = None):
+        """Run a coroutine on the client's event loop and wait for the result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def complete_sync(self, messages: list, model: str, max_tokens: int, temperature: float) -> str:
+        return self.run(self.complete(messages, model, max_tokens, temperature))
+
+    def stream_sync(self, messages: list, model: str, max_tokens: int, temperature: float) -> Iterator[str]:
+        """Iterate over streamed deltas from a synchronous caller"""
+        deltas = queue.Queue()
+
+        async def pump():
+            try:
+                async for delta in self.stream(messages, model, max_tokens, temperature):
+                    deltas.put(delta)
+                deltas.put(_STREAM_DONE)
+            except BaseException as e:
+                deltas.put(e)
+                raise
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while True:
+                item = deltas.get()
+                if item is _STREAM_DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Stop generating if the consumer went away early
+            future.cancel()
+
+    def stats(self) -> dict:
+        with self.stats_lock:
+            return {
+                'requests': self.requests,
+                'retries': self.retries,
+                'coalesced': self.coalesced,
+                'failures': self.failures,
+                'in_flight': len(self.in_flight)
+            }
+
+    # Internals
+
+    async def _complete_with_retry(self, messages, model, max_tokens, temperature) -> str:
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._limit():
+                    self._count('requests')
+                    response = await self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        timeout=self.timeout
+                    )
+                return response.choices[0].message.content.strip()
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    self._count('failures')
+                    raise
+                await self._backoff(attempt, e)
+
+    def _limit(self) -> asyncio.Semaphore:
+        # Created lazily so it belongs to the client's event loop
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self.semaphore
+
+    async def _backoff(self, attempt: int, error: Exception):
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+        # Respect the server's Retry-After hint on rate limits when it asks for longer
+        response = getattr(error, 'response', None)
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get('retry-after', 0)))
+            except ValueError:
+                pass
+
+        self._count('retries')
+        logging.warning(f"OpenAI request failed ({type(error).__name__}), retry {attempt + 1} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    def _count(self, name: str):
+        with self.stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    @staticmethod
+    def _request_key(messages, model, max_tokens, temperature) -> str:
+        payload = json.dumps([messages, model, max_tokens, temperature], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Preallocated float32 ring: up to `capacity` unread samples plus `history` already read.
+
+    Every sample is stored twice, at i and i + size, so any window up to the
+    ring size is a single contiguous slice and reads return views, never
+    copies. A write that would leave more than `capacity` samples unread
+    drops the oldest unread ones instead and counts the overrun, so memory
+    is fixed and the reader is never more than `capacity` behind. A view
+    stays valid until the reader has read `history` more samples (or the
+    buffer is reset).
+    """
+
+    def __init__(self, capacity: int, history: int = 0):
+        self.capacity = max(1, capacity)
+        self.history = max(0, history)
+        self.size = self.capacity + self.history
+        self.data = np.zeros(2 * self.size, dtype=np.float32)
+        self.condition = threading.Condition()
+        self.reset()
+
+    def reset(self):
+        """Empty the buffer and zero its counters, keeping the allocation"""
+        with self.condition:
+            self.write_position = 0  # samples written since reset
+            self.read_position = 0
+            self.closed = False
+            self.writes = deque()  # (end position, perf_counter) of writes not fully read
+            self.overruns = 0  # writes that dropped unread audio
+            self.dropped_samples = 0
+
+    def write(self, audio: np.ndarray) -> bool:
+        """Append audio; returns False if unread audio had to be dropped to make room"""
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        with self.condition:
+            if self.closed or len(audio) == 0:
+                return not self.closed
+            if len(audio) > self.size:
+                skipped = len(audio) - self.size
+                self.write_position += skipped
+                audio = audio[skipped:]
+
+            start = self.write_position % self.size
+            first = min(len(audio), self.size - start)
+            self.data[start:start + first] = audio[:first]
+            self.data[self.size + start:self.size + start + first] = audio[:first]
+            rest = len(audio) - first
+            if rest:
+                self.data[:rest] = audio[first:]
+                self.data[self.size:self.size + rest] = audio[first:]
+            self.write_position += len(audio)
+            self.writes.append((self.write_position, time.perf_counter()))
+
+            overrun = self.write_position - self.read_position - self.capacity
+            if overrun > 0:
+                self.read_position += overrun
+                self.dropped_samples += overrun
+                self.overruns += 1
+                self._forget_writes()
+            self.condition.notify_all()
+            return overrun <= 0
+
+    def read(self, max_samples: int, timeout: Optional[float] = None) -> Optional[Tuple[np.ndarray, float]]:
+        """Next unread samples (at most `max_samples`) as a view, and how long the oldest of them waited.
+
+        Blocks until audio arrives; returns None on timeout, or once the
+        buffer is closed and drained.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.write_position > self.read_position or self.closed, timeout):
+                return None
+            count = min(self.write_position - self.read_position, max_samples)
+            if count <= 0:
+                return None
+            start = self.read_position
+            waited = time.perf_counter() - self.writes[0][1]
+            self.read_position += count
+            self._forget_writes()
+            return self._view(start, count), waited
+
+    def window(self, start: int, end: int) -> Optional[np.ndarray]:
+        """View of samples [start, end) by position since reset, e.g. for overlap or VAD; None once overwritten"""
+        with self.condition:
+            if start < max(0, self.write_position - self.size) or end > self.write_position or end < start:
+                return None
+            return self._view(start, end - start)
+
+    def latest(self, samples: int) -> np.ndarray:
+        """View of up to `samples` of the most recent audio"""
+        with self.condition:
+            samples = min(samples, self.write_position, self.size)
+            return self._view(self.write_position - samples, samples)
+
+    def close(self):
+        """No more writes; readers drain what is left and then get None"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def unread(self) -> int:
+        return self.write_position - self.read_position
+
+    def stats(self) -> dict:
+        return {
+            'capacity_samples': self.capacity,
+            'unread_samples': self.unread(),
+            'overruns': self.overruns,
+            'dropped_samples': self.dropped_samples
+        }
+
+    def _view(self, start: int, count: int) -> np.ndarray:
+        offset = start % self.size
+        view = self.data[offset:offset + count]
+        view.flags.writeable = False
+        return view
+
+    def _forget_writes(self):
+        while self.writes and self.writes[0][0] <= self.read_position:
+            self.writes.popleft()
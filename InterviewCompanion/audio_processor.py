@@ -1,66 +1,178 @@
+import contextlib
 import numpy as np
-import whisper
 import tempfile
 import os
 import logging
 import wave
 import threading
-import queue
-from typing import Optional
+import time
+from typing import Callable, Optional
+from audio_buffer import AudioRingBuffer
+from decoding import PromptContext
+from final_pass import live_decodes
+from preprocessing import AudioPreprocessor
+from vad import VoiceActivityDetector
+from whisper_server import get_transcriber
 
-# Try to import sounddevice, fall back gracefully if not available
-try:
-    import sounddevice as sd
-    AUDIO_AVAILABLE = True
-except (ImportError, OSError) as e:
-    print(f"Audio input not available: {e}")
-    AUDIO_AVAILABLE = False
-    sd = None
+# sounddevice (and PortAudio behind it) is only imported once a local mic is actually used
+_sounddevice = None
+_sounddevice_checked = False
+
+def load_sounddevice():
+    """Import sounddevice on first use; returns None if audio input is not available"""
+    global _sounddevice, _sounddevice_checked
+    if not _sounddevice_checked:
+        _sounddevice_checked = True
+        try:
+            import sounddevice
+            _sounddevice = sounddevice
+        except (ImportError, OSError) as e:
+            logging.warning(f"Audio input not available: {e}")
+    return _sounddevice
 
 class AudioProcessor:
     """Handles audio recording and transcription using Whisper"""
     
-    def __init__(self, sample_rate=16000, chunk_duration=3.0):
+    # Whisper models always operate on 16 kHz mono float32 audio
+    WHISPER_SAMPLE_RATE = 16000
+    
+    def __init__(self, sample_rate=16000, chunk_duration=3.0, in_memory=True, block_duration=None, use_vad=True,
+                 model_name="base", max_backlog=10.0, prompt_context_chars=300, buffer_history=5.0,
+                 dc_removal=True, agc=True, noise_reduction=True, condition_remote=False):
         self.sample_rate = sample_rate
         self.chunk_duration = chunk_duration
         self.chunk_size = int(sample_rate * chunk_duration)
         
-        # Initialize Whisper model (using base model for balance of speed/accuracy)
-        logging.info("Loading Whisper model...")
+        # Rate audio arrives at; a mic that can't do sample_rate is opened at its own rate and resampled
+        self.capture_rate = sample_rate
+        self.capture_channels = 1
+        
+        # Capture block size; streaming mode uses blocks shorter than a full chunk
+        self.block_duration = block_duration or chunk_duration
+        self.block_size = int(sample_rate * self.block_duration)
+        
+        # Voice activity detector used to keep silence and clicks away from Whisper
+        self.vad = VoiceActivityDetector(sample_rate) if use_vad else None
+        
+        # Hand numpy buffers straight to Whisper instead of round-tripping through a WAV file
+        self.in_memory = in_memory
+        
+        # Whisper is shared: one model per process, or a host-wide server when configured
         try:
-            self.whisper_model = whisper.load_model("base")
-            logging.info("Whisper model loaded successfully")
+            self.transcriber = get_transcriber(model_name)
+            self.whisper_model = self.transcriber.model
         except Exception as e:
             logging.error(f"Failed to load Whisper model: {e}")
             raise
         
+        # Recent transcript for this session, fed back to Whisper so chunks decode in context
+        self.prompt_context = PromptContext(prompt_context_chars)
+        
+        # Optional observe(stage, seconds) for latency metrics, set by the transcription worker
+        self.observe: Optional[Callable[[str, float], None]] = None
+        
         # Audio recording state
         self.recording = False
-        self.audio_queue = queue.Queue()
         self.recording_thread = None
+        self.stop_event = threading.Event()
+        
+        # Captured audio waits in a fixed ring: at most max_backlog seconds ahead of the transcriber
+        # (the oldest is dropped beyond that), plus buffer_history seconds already read, for windows
+        self.max_backlog = max_backlog
+        self.buffer_history = buffer_history
+        self.audio_buffer = AudioRingBuffer(int(max_backlog * sample_rate), int(buffer_history * sample_rate))
+        
+        # Resampling to sample_rate, DC removal, noise reduction and AGC, applied as audio leaves the ring
+        self.preprocessor = AudioPreprocessor(sample_rate, sample_rate, dc_removal=dc_removal, agc=agc,
+                                              noise_reduction=noise_reduction)
+        # Browsers already suppress noise and level the mic, so remote audio is only resampled unless asked
+        self.condition_remote = condition_remote
+        self.condition = True
+    
+    @property
+    def dropped_blocks(self) -> int:
+        """Captured blocks that overran the buffer since recording started"""
+        return self.audio_buffer.overruns
         
     def start_recording(self):
         """Start audio recording in a separate thread"""
-        if not AUDIO_AVAILABLE:
+        if load_sounddevice() is None:
             raise Exception("Audio recording not available in this environment. Please use manual text input instead.")
         
         if not self.recording:
+            self._set_capture_format(*self._input_format(load_sounddevice()))
+            self.condition = True
+            self._reset_run_state()
             self.recording = True
             self.recording_thread = threading.Thread(target=self._record_audio)
             self.recording_thread.daemon = True
             self.recording_thread.start()
             logging.info("Audio recording started")
     
+    def start_remote(self):
+        """Accept audio pushed from a remote client instead of a local device"""
+        if not self.recording:
+            self._set_capture_format(self.sample_rate, 1)  # clients send sample_rate mono
+            self.condition = self.condition_remote
+            self._reset_run_state()
+            self.recording = True
+            logging.info("Remote audio ingest started")
+    
+    def _input_format(self, sd):
+        """(rate, channels) for the default input: sample_rate mono if the device takes it, else its own rate"""
+        try:
+            sd.check_input_settings(samplerate=self.sample_rate, channels=1, dtype='float32')
+            return self.sample_rate, 1
+        except Exception:
+            device = sd.query_devices(kind='input')
+            rate = int(device['default_samplerate'])
+            try:
+                sd.check_input_settings(samplerate=rate, channels=1, dtype='float32')
+                return rate, 1
+            except Exception:
+                return rate, max(1, int(device['max_input_channels']))
+    
+    def _set_capture_format(self, rate: int, channels: int):
+        """Size the capture blocks, the ring and the resampler for audio arriving at `rate`"""
+        self.capture_channels = channels
+        if rate == self.capture_rate:
+            return
+        logging.info(f"Capturing at {rate} Hz, resampling to {self.sample_rate} Hz")
+        self.capture_rate = rate
+        self.block_size = int(rate * self.block_duration)
+        self.audio_buffer = AudioRingBuffer(int(self.max_backlog * rate), int(self.buffer_history * rate))
+        self.preprocessor.reset(source_rate=rate)
+    
+    def _reset_run_state(self):
+        """Discard audio, the stop signal and prompt context left over from a previous run"""
+        self.audio_buffer.reset()
+        self.preprocessor.reset()
+        self.stop_event.clear()
+        self.prompt_context.clear()
+    
+    def push_audio(self, audio_data: np.ndarray) -> bool:
+        """Copy captured audio into the buffer, dropping the oldest unread audio if it is full.
+        
+        Returns False when audio had to be dropped so the caller can signal backpressure.
+        """
+        if not self.recording:
+            return False
+        return self.audio_buffer.write(audio_data)
+    
     def stop_recording(self):
         """Stop audio recording"""
         self.recording = False
+        self.stop_event.set()
+        # Wake a consumer blocked in get_audio_chunk so it sees the end of input
+        self.audio_buffer.close()
         if self.recording_thread:
             self.recording_thread.join(timeout=1.0)
         logging.info("Audio recording stopped")
     
     def _record_audio(self):
         """Record audio in chunks"""
-        if not AUDIO_AVAILABLE:
+        sd = load_sounddevice()
+        if sd is None:
             return
             
         try:
@@ -68,76 +180,165 @@ class AudioProcessor:
                 if status:
                     logging.warning(f"Audio callback status: {status}")
                 if self.recording:
-                    # Convert to mono if stereo
-                    if len(indata.shape) > 1:
-                        audio_data = np.mean(indata, axis=1)
+                    # Mono view of PortAudio's buffer; push_audio copies it into the ring
+                    if indata.ndim > 1:
+                        audio_data = indata[:, 0] if indata.shape[1] == 1 else np.mean(indata, axis=1)
                     else:
-                        audio_data = indata.flatten()
+                        audio_data = indata
                     
-                    self.audio_queue.put(audio_data.copy())
+                    self.push_audio(audio_data)
             
             with sd.InputStream(
-                samplerate=self.sample_rate,
-                channels=1,
+                samplerate=self.capture_rate,
+                channels=self.capture_channels,
                 callback=audio_callback,
-                blocksize=self.chunk_size
+                blocksize=self.block_size
             ):
-                while self.recording:
-                    sd.sleep(100)  # Sleep for 100ms
+                # PortAudio delivers blocks on its own thread; just hold the stream open until stopped
+                self.stop_event.wait()
                     
         except Exception as e:
             logging.error(f"Error in audio recording: {e}")
             self.recording = False
     
-    def get_audio_chunk(self) -> Optional[np.ndarray]:
-        """Get the next audio chunk from the queue"""
+    def get_audio_chunk(self, timeout: Optional[float] = 0.5) -> Optional[np.ndarray]:
+        """Get up to one block of unread audio from the buffer, preprocessed to sample_rate.
+        
+        Returns None on timeout or once recording has stopped and the buffer
+        is drained; pass timeout=None to block until audio arrives.
+        """
         try:
-            # Get audio chunk with timeout to avoid blocking
-            audio_chunk = self.audio_queue.get(timeout=0.5)
+            while True:
+                entry = self.audio_buffer.read(self.block_size, timeout)
+                if entry is None:
+                    return None
+                captured, waited = entry
+                start = time.perf_counter()
+                audio_chunk = self.preprocessor.process(captured, self.condition)
+                if self.observe is not None:
+                    self.observe('audio_queue', waited)
+                    self.observe('preprocess', time.perf_counter() - start)
+                if len(audio_chunk):  # empty while the resampler and noise filter fill up
+                    break
+            if np.shares_memory(audio_chunk, captured):
+                # Pipeline stages hold chunks across threads, past the point where the ring reuses the slot
+                audio_chunk = audio_chunk.copy()
             return audio_chunk
-        except queue.Empty:
-            return None
         except Exception as e:
             logging.error(f"Error getting audio chunk: {e}")
             return None
     
-    def transcribe_audio(self, audio_data: np.ndarray) -> str:
-        """Transcribe audio data using Whisper"""
+    def transcribe_audio(self, audio_data: np.ndarray, mode='live') -> str:
+        """Transcribe audio data using Whisper.
+        
+        Live decodes are conditioned on, and then extend, the session's prompt
+        context; mode='final' uses the high-accuracy profile.
+        """
         try:
-            # Check if audio has enough volume to be worth transcribing
-            if np.max(np.abs(audio_data)) < 0.01:
-                return ""  # Too quiet, likely silence
+            if not self.has_speech(audio_data):
+                return ""  # Silence or a transient, not worth a decode
             
-            # Create temporary wav file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_path = temp_file.name
-                
-                # Write audio data to wav file
-                with wave.open(temp_path, 'wb') as wav_file:
-                    wav_file.setnchannels(1)  # Mono
-                    wav_file.setsampwidth(2)  # 16-bit
-                    wav_file.setframerate(self.sample_rate)
-                    
-                    # Convert float32 to int16
-                    audio_int16 = (audio_data * 32767).astype(np.int16)
-                    wav_file.writeframes(audio_int16.tobytes())
-                
-                # Transcribe using Whisper
-                result = self.whisper_model.transcribe(temp_path, language="en")
-                text = result["text"].strip()
-                
-                # Clean up temporary file
-                os.unlink(temp_path)
+            prompt = self.prompt_context.text()
+            text = None
+            start = time.perf_counter()
+            # Background final-pass work waits while live decodes are running
+            with live_decodes if mode == 'live' else contextlib.nullcontext():
+                if self.in_memory:
+                    try:
+                        text = self._transcribe_in_memory(audio_data, prompt, mode)
+                    except Exception as e:
+                        logging.warning(f"In-memory transcription failed, falling back to file path: {e}")
                 
-                return text
+                if text is None:
+                    text = self._transcribe_file(audio_data, prompt)
+            if self.observe is not None:
+                self.observe('transcribe_audio' if mode == 'live' else 'transcribe_audio_final', time.perf_counter() - start)
+            
+            if mode == 'live':
+                self.prompt_context.append(text)
+            return text
                 
         except Exception as e:
             logging.error(f"Error transcribing audio: {e}")
             return ""
     
+    def transcribe_words(self, audio_data: np.ndarray, prompt: Optional[str] = None) -> list:
+        """Transcribe audio and return words with start/end times relative to the buffer"""
+        try:
+            if not self.has_speech(audio_data):
+                return []
+            
+            start = time.perf_counter()
+            with live_decodes:
+                words = self.transcriber.transcribe_words(self.prepare_audio(audio_data), prompt=prompt)
+            if self.observe is not None:
+                self.observe('transcribe_audio', time.perf_counter() - start)
+            return words
+            
+        except Exception as e:
+            logging.error(f"Error transcribing audio with word timestamps: {e}")
+            return []
+    
+    def has_speech(self, audio_data: np.ndarray) -> bool:
+        """Cheap check run before every decode"""
+        if len(audio_data) == 0 or np.max(np.abs(audio_data)) < 0.01:
+            return False  # Too quiet, likely silence
+        if self.vad is not None:
+            return self.vad.contains_speech(audio_data)
+        return True
+    
+    def prepare_audio(self, audio_data: np.ndarray) -> np.ndarray:
+        """Convert captured audio into the 16 kHz mono float32 buffer Whisper expects"""
+        audio = np.asarray(audio_data, dtype=np.float32)
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1, dtype=np.float32)
+        
+        if self.sample_rate != self.WHISPER_SAMPLE_RATE and len(audio) > 0:
+            # Linear resampling is plenty for speech at these rates and avoids a scipy dependency
+            target_length = int(round(len(audio) * self.WHISPER_SAMPLE_RATE / self.sample_rate))
+            source_positions = np.linspace(0, len(audio) - 1, num=target_length, dtype=np.float64)
+            audio = np.interp(source_positions, np.arange(len(audio)), audio).astype(np.float32)
+        
+        return np.ascontiguousarray(np.clip(audio, -1.0, 1.0))
+    
+    def _transcribe_in_memory(self, audio_data: np.ndarray, prompt: Optional[str] = None, mode='live') -> str:
+        """Transcribe a numpy buffer directly, with no disk I/O or ffmpeg subprocess"""
+        # The transcriber pads the buffer to Whisper's 30 s window when building the mel spectrogram
+        return self.transcriber.transcribe(self.prepare_audio(audio_data), prompt=prompt, mode=mode)
+    
+    def _transcribe_file(self, audio_data: np.ndarray, prompt: Optional[str] = None) -> str:
+        """Transcribe by writing a temporary WAV file and letting Whisper decode it via ffmpeg"""
+        if self.whisper_model is None:
+            raise RuntimeError("File transcription needs a local Whisper model")
+        
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_path = temp_file.name
+        
+        try:
+            # Write audio data to wav file
+            with wave.open(temp_path, 'wb') as wav_file:
+                wav_file.setnchannels(1)  # Mono
+                wav_file.setsampwidth(2)  # 16-bit
+                wav_file.setframerate(self.sample_rate)
+                
+                # Convert float32 to int16
+                audio_int16 = (np.clip(audio_data, -1.0, 1.0) * 32767).astype(np.int16)
+                wav_file.writeframes(audio_int16.tobytes())
+            
+            # Transcribe using Whisper
+            result = self.whisper_model.transcribe(temp_path, language="en", initial_prompt=prompt)
+            return result["text"].strip()
+        finally:
+            # Clean up temporary file even if transcription raised
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+    
     def list_audio_devices(self):
         """List available audio input devices"""
-        if not AUDIO_AVAILABLE:
+        sd = load_sounddevice()
+        if sd is None:
             logging.info("Audio devices not available in this environment")
             return
             
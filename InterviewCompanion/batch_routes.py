@@ -0,0 +1,76 @@
+import logging
+import os
+import tempfile
+
+from flask import Blueprint, jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+
+from config import Config
+from services import get_services
+
+batch_bp = Blueprint('batch', __name__)
+
+
+def max_upload_bytes() -> int:
+    return int(Config.BATCH_MAX_UPLOAD_MB * 1024 * 1024)
+
+
+@batch_bp.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    """Raised before the body is read (declared length) or while reading it (app MAX_CONTENT_LENGTH)"""
+    return jsonify({
+        'success': False,
+        'message': f'Recording is larger than {Config.BATCH_MAX_UPLOAD_MB} MB'
+    }), 413
+
+
+@batch_bp.route('/batch/transcribe', methods=['POST'])
+def transcribe_file():
+    """Upload a recorded interview (form field 'audio'); poll the returned job for results"""
+    services = get_services()
+    # Reject before touching request.files, which would spool the whole body first
+    if request.content_length and request.content_length > max_upload_bytes():
+        raise RequestEntityTooLarge()
+    upload = request.files.get('audio')
+    if upload is None or not upload.filename:
+        return jsonify({
+            'success': False,
+            'message': 'No audio file provided'
+        }), 400
+
+    path = None
+    try:
+        fd, path = tempfile.mkstemp(prefix='batch-', suffix=os.path.splitext(secure_filename(upload.filename))[1])
+        os.close(fd)
+        upload.save(path)
+        job = services.batch_runner.submit(path, answers=request.form.get('answers', '1') != '0')
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status
+        }), 202
+
+    except Exception as e:
+        logging.error(f"Error starting batch transcription: {e}")
+        if path:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        return jsonify({
+            'success': False,
+            'message': f'Failed to start transcription: {str(e)}'
+        }), 500
+
+
+@batch_bp.route('/batch/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Progress and results of a job; ?after=<n> skips segments already fetched"""
+    job = get_services().batch_runner.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'message': 'Unknown job'
+        }), 404
+    return jsonify(job.to_dict(after=max(0, request.args.get('after', 0, type=int))))
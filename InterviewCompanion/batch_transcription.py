@@ -0,0 +1,354 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from question_detector import get_detector
+from vad import UtteranceSegmenter, VoiceActivityDetector
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+class StreamResampler:
+    """Linear resampling of a stream of blocks, with no seams at block boundaries"""
+
+    def __init__(self, source_rate: int, target_rate=WHISPER_SAMPLE_RATE):
+        self.step = source_rate / target_rate  # source samples per output sample
+        self.position = 0.0  # next output sample, in source samples from the start of `previous`
+        self.previous = np.zeros(0, dtype=np.float32)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        audio = np.concatenate((self.previous, block))
+        positions = np.arange(self.position, len(audio) - 1, self.step)
+        resampled = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+        # Keep the last sample so the next block interpolates across the join
+        keep = max(0, len(audio) - 1)
+        self.position += len(positions) * self.step - keep
+        self.previous = audio[keep:]
+        return resampled
+
+
+def is_pcm_wav(path: str) -> bool:
+    try:
+        with wave.open(path, 'rb') as wav_file:
+            return wav_file.getsampwidth() == 2 and wav_file.getcomptype() == 'NONE'
+    except (wave.Error, EOFError):
+        return False
+
+
+def read_audio_blocks(path: str, block_seconds=1.0) -> Iterator[np.ndarray]:
+    """Decode an audio file incrementally into 16 kHz mono float32 blocks.
+
+    16-bit PCM WAV is read with the wave module; anything else (mp3, m4a,
+    webm, ...) is piped through ffmpeg, which Whisper needs anyway. Only a
+    block at a time is held, so memory does not grow with the file.
+    """
+    if is_pcm_wav(path):
+        yield from _wav_blocks(path, block_seconds)
+    else:
+        yield from _ffmpeg_blocks(path, block_seconds)
+
+
+def _wav_blocks(path: str, block_seconds: float) -> Iterator[np.ndarray]:
+    with wave.open(path, 'rb') as wav_file:
+        channels = wav_file.getnchannels()
+        sample_rate = wav_file.getframerate()
+        resampler = StreamResampler(sample_rate) if sample_rate != WHISPER_SAMPLE_RATE else None
+        frames = max(1, int(block_seconds * sample_rate))
+        while True:
+            data = wav_file.readframes(frames)
+            if not data:
+                break
+            audio = np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+            if channels > 1:
+                audio = audio.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+            yield resampler.process(audio) if resampler else audio
+
+
+def _ffmpeg_blocks(path: str, block_seconds: float) -> Iterator[np.ndarray]:
+    if shutil.which('ffmpeg') is None:
+        raise RuntimeError(f"ffmpeg is needed to decode {os.path.basename(path)}; only 16-bit WAV is read without it")
+    process = subprocess.Popen(
+        ['ffmpeg', '-nostdin', '-v', 'error', '-i', path, '-f', 'f32le', '-ac', '1', '-ar', str(WHISPER_SAMPLE_RATE), '-'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    block_bytes = max(1, int(block_seconds * WHISPER_SAMPLE_RATE)) * 4
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype='<f4')
+    finally:
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        _, errors = process.communicate()
+    if process.returncode:
+        raise RuntimeError(f"ffmpeg could not decode {os.path.basename(path)}: {errors.decode(errors='replace').strip()}")
+
+
+def split_segments(blocks: Iterator[np.ndarray], max_segment=28.0, min_silence=0.5) \
+        -> Iterator[Tuple[float, float, np.ndarray]]:
+    """Cut a block stream at pauses into (start, end, audio) segments of up to `max_segment` seconds.
+
+    Consecutive utterances are packed into one segment while they fit, so
+    each decode gets most of a Whisper window rather than one sentence;
+    the silence between them is left out.
+    """
+    segmenter = UtteranceSegmenter(VoiceActivityDetector(WHISPER_SAMPLE_RATE), min_silence=min_silence,
+                                   max_utterance=max_segment)
+    max_samples = int(max_segment * WHISPER_SAMPLE_RATE)
+
+    def utterances():
+        for block in blocks:
+            yield from segmenter.push_timed(block)
+        last = segmenter.flush_timed()
+        if last is not None:
+            yield last
+
+    packed, packed_samples, packed_start, packed_end = [], 0, 0.0, 0.0
+    for start, utterance in utterances():
+        if packed and packed_samples + len(utterance) > max_samples:
+            yield packed_start, packed_end, np.concatenate(packed)
+            packed, packed_samples = [], 0
+        if not packed:
+            packed_start = start
+        packed.append(utterance)
+        packed_samples += len(utterance)
+        packed_end = start + len(utterance) / WHISPER_SAMPLE_RATE
+    if packed:
+        yield packed_start, packed_end, np.concatenate(packed)
+
+
+class BatchJob:
+    """Transcribes one recorded interview, with detected questions and suggested answers.
+
+    Segments are decoded `concurrency` at a time and merged back in file
+    order; no more than that many are held, so memory stays flat however
+    long the file is. Questions found in a merged segment are answered on
+    a separate pool while decoding carries on. Segments decode without a
+    prompt, since the text before them is not known yet.
+    """
+
+    def __init__(self, path: str, transcriber, answer: Optional[Callable[[str, str], str]] = None,
+                 concurrency=8, mode='final', max_segment=28.0, min_silence=0.5, answer_workers=4):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.transcriber = transcriber
+        self.answer = answer
+        self.concurrency = max(1, concurrency)
+        self.mode = mode
+        self.max_segment = max_segment
+        self.min_silence = min_silence
+        self.answer_workers = answer_workers
+
+        self.status = 'queued'  # queued, running, done or failed
+        self.error = None
+        self.segments = []  # {'index', 'start', 'end', 'text', 'questions'}, in file order
+        self.answers = []  # {'segment', 'question', 'answer'} or 'error' instead of 'answer'
+        self.audio_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.lock = threading.Lock()
+
+    def run(self, on_segment: Optional[Callable[[dict], None]] = None):
+        """Transcribe the whole file; `on_segment` sees each segment as it is merged"""
+        self.status = 'running'
+        self.started = time.time()
+        decoders = ThreadPoolExecutor(self.concurrency, thread_name_prefix='batch-decode')
+        answerers = ThreadPoolExecutor(self.answer_workers, thread_name_prefix='batch-answer') if self.answer else None
+        try:
+            pending = deque()  # (index, start, end, future) in file order
+            segments = split_segments(self._counted(read_audio_blocks(self.path)), self.max_segment, self.min_silence)
+            for index, (start, end, audio) in enumerate(segments):
+                pending.append((index, start, end, decoders.submit(self._decode, audio)))
+                # Merge whatever is finished at the head; block only once the window is full
+                while pending and (len(pending) >= self.concurrency or pending[0][3].done()):
+                    self._merge(*pending.popleft(), answerers, on_segment)
+            while pending:
+                self._merge(*pending.popleft(), answerers, on_segment)
+            if answerers is not None:
+                answerers.shutdown(wait=True)
+            self.status = 'done'
+        except Exception as e:
+            logging.error(f"Error in batch transcription of {os.path.basename(self.path)}: {e}")
+            self.error = str(e)
+            self.status = 'failed'
+        finally:
+            decoders.shutdown(wait=False, cancel_futures=True)
+            if answerers is not None:
+                answerers.shutdown(wait=False, cancel_futures=True)
+            self.finished = time.time()
+
+    def _counted(self, blocks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+        for block in blocks:
+            self.audio_seconds += len(block) / WHISPER_SAMPLE_RATE
+            yield block
+
+    def _decode(self, audio: np.ndarray) -> str:
+        start = time.perf_counter()
+        text = self.transcriber.transcribe(audio, mode=self.mode)
+        with self.lock:
+            self.decode_seconds += time.perf_counter() - start
+        return text
+
+    def _merge(self, index, start, end, future, answerers, on_segment):
+        text = future.result()
+        segment = {
+            'index': index,
+            'start': round(start, 2),
+            'end': round(end, 2),
+            'text': text,
+            'questions': get_detector().detect(text) if text else []
+        }
+        with self.lock:
+            context = " ".join(s['text'] for s in self.segments[-20:] if s['text'])
+            self.segments.append(segment)
+        if answerers is not None:
+            for question in segment['questions']:
+                answerers.submit(self._answer, index, question, f"{context} {text}".strip())
+        if on_segment is not None:
+            on_segment(segment)
+
+    def _answer(self, index: int, question: str, transcript: str):
+        entry = {'segment': index, 'question': question}
+        try:
+            entry['answer'] = self.answer(question, transcript)
+        except Exception as e:
+            logging.error(f"Error answering batch question: {e}")
+            entry['error'] = str(e)
+        with self.lock:
+            self.answers.append(entry)
+            self.answers.sort(key=lambda a: a['segment'])
+
+    def stats(self) -> dict:
+        elapsed = (self.finished or time.time()) - self.started if self.started else 0.0
+        return {
+            'audio_seconds': round(self.audio_seconds, 2),
+            'elapsed_seconds': round(elapsed, 2),
+            'speed': round(self.audio_seconds / elapsed, 2) if elapsed else None,  # audio seconds per second
+            'decode_seconds': round(self.decode_seconds, 2),
+            'segments': len(self.segments),
+            'questions': sum(len(s['questions']) for s in self.segments)
+        }
+
+    def to_dict(self, after=0) -> dict:
+        """Status and results, with segments from index `after` on"""
+        with self.lock:
+            segments = self.segments[after:]
+            answers = list(self.answers)
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'stats': self.stats(),
+            'segments': segments,
+            'answers': answers
+        }
+
+
+class BatchRunner:
+    """Runs uploaded jobs in the background, `max_running` at a time, and keeps the latest for polling"""
+
+    def __init__(self, create_job: Callable[..., BatchJob], max_running=1, keep_jobs=20):
+        self.create_job = create_job
+        self.keep_jobs = keep_jobs
+        self.executor = ThreadPoolExecutor(max_running, thread_name_prefix='batch-job')
+        self.jobs = {}  # job id -> BatchJob, oldest first
+        self.lock = threading.Lock()
+
+    def submit(self, path: str, answers=True, remove_file=True) -> BatchJob:
+        job = self.create_job(path, answers)
+        with self.lock:
+            self.jobs[job.id] = job
+            finished = [job_id for job_id, j in self.jobs.items() if j.status in ('done', 'failed')]
+            for job_id in finished[:max(0, len(self.jobs) - self.keep_jobs)]:
+                del self.jobs[job_id]
+        self.executor.submit(self._run, job, remove_file)
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    @staticmethod
+    def _run(job: BatchJob, remove_file: bool):
+        try:
+            job.run()
+        finally:
+            if remove_file:
+                try:
+                    os.unlink(job.path)
+                except OSError:
+                    pass
+
+
+def create_job(path: str, transcriber, openai_client=None, concurrency=None, mode=None) -> BatchJob:
+    """A BatchJob configured from Config; answers need an OpenAIClient"""
+    answer = None
+    if openai_client is not None:
+        from conversation_context import ConversationContext
+        # No earlier Q&A to carry, so the context is just the transcript before each question
+        conversation = ConversationContext(max_tokens=Config.CONTEXT_MAX_TOKENS,
+                                           transcript_tokens=Config.CONTEXT_TRANSCRIPT_TOKENS)
+        answer = lambda question, transcript: openai_client.generate_answer(question, conversation, transcript)
+    return BatchJob(
+        path,
+        transcriber,
+        answer,
+        concurrency=concurrency or Config.BATCH_CONCURRENCY,
+        mode=mode or Config.BATCH_DECODING_MODE,
+        max_segment=Config.BATCH_MAX_SEGMENT,
+        min_silence=Config.BATCH_MIN_SILENCE,
+        answer_workers=Config.BATCH_ANSWER_WORKERS
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Transcribe a recorded interview and answer the questions in it")
+    parser.add_argument('audio', help='audio file (16-bit WAV, or anything ffmpeg reads)')
+    parser.add_argument('--model', default=Config.WHISPER_MODEL)
+    parser.add_argument('--backend', default=None, help='whisper or faster-whisper (default: Config)')
+    parser.add_argument('--processes', type=int, default=None, help='decode processes (default: TRANSCRIPTION_PROCESSES)')
+    parser.add_argument('--concurrency', type=int, default=None, help='segments decoding at once')
+    parser.add_argument('--mode', choices=('live', 'final'), default=None, help='decoding profile')
+    parser.add_argument('--no-answers', action='store_true', help='skip answer generation')
+    parser.add_argument('--output', help='write the full result JSON here')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    from whisper_server import create_transcriber
+    transcriber = create_transcriber(args.model, args.backend, processes=args.processes)
+    openai_client = None
+    if not args.no_answers:
+        from openai_client import OpenAIClient
+        openai_client = OpenAIClient()
+
+    job = create_job(args.audio, transcriber, openai_client, args.concurrency, args.mode)
+    job.run(on_segment=lambda segment: print(json.dumps(segment), flush=True))
+    if hasattr(transcriber, 'close'):
+        transcriber.close()
+
+    result = job.to_dict()
+    print(json.dumps({'status': result['status'], 'error': result['error'], 'stats': result['stats'],
+                      'answers': result['answers']}))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    raise SystemExit(0 if job.status == 'done' else 1)
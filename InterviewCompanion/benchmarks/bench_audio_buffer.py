@@ -0,0 +1,104 @@
+"""Memory and latency of the capture buffer when transcription cannot keep up.
+
+Usage:
+    python benchmarks/bench_audio_buffer.py [--load 0.5 1.0 2.0 4.0] [--duration 60] [--block 0.1]
+        [--capacity 10] [--speed 10]
+
+A writer pushes `block`-second blocks into an AudioProcessor-sized
+AudioRingBuffer on a fixed schedule, `speed` times faster than real time,
+while a reader takes up to 0.5 s at a time and then stays busy for `load`
+times the audio it took (load > 1 means the transcriber is falling behind).
+For each load, reports how long audio waited in the buffer while capture
+was running (p50/p99/max), the audio dropped, the Python heap growth
+during the run (stays flat because the ring is preallocated) and the cost
+of a write and a read.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_buffer import AudioRingBuffer
+
+SAMPLE_RATE = 16000
+
+
+def run(load, duration, block_seconds, capacity, speed):
+    ring = AudioRingBuffer(int(capacity * SAMPLE_RATE), int(5.0 * SAMPLE_RATE))
+    block = (np.random.default_rng(0).standard_normal(int(block_seconds * SAMPLE_RATE)) * 0.1).astype(np.float32)
+    step = int(0.5 * SAMPLE_RATE)
+    waits, write_times, read_times = [], [], []
+    writing = threading.Event()
+    writing.set()
+
+    def reader():
+        while True:
+            start = time.perf_counter()
+            entry = ring.read(step)
+            read_times.append(time.perf_counter() - start)
+            if entry is None:
+                return
+            audio, waited = entry
+            if writing.is_set():  # not the drain after the last write
+                waits.append(waited * speed)  # in audio time
+            time.sleep(len(audio) / SAMPLE_RATE * load / speed)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    thread = threading.Thread(target=reader)
+    thread.start()
+
+    blocks = int(duration / block_seconds)
+    start = time.perf_counter()
+    for i in range(blocks):
+        delay = start + i * block_seconds / speed - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        begin = time.perf_counter()
+        ring.write(block)
+        write_times.append(time.perf_counter() - begin)
+    writing.clear()
+    ring.close()
+    thread.join()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    waits_ms = np.asarray(waits) * 1000
+    return {
+        'load': load,
+        'audio_seconds': round(blocks * block_seconds, 2),
+        'wait_p50_ms': round(float(np.percentile(waits_ms, 50)), 1),
+        'wait_p99_ms': round(float(np.percentile(waits_ms, 99)), 1),
+        'wait_max_ms': round(float(waits_ms.max()), 1),
+        'overruns': ring.overruns,
+        'dropped_seconds': round(ring.dropped_samples / SAMPLE_RATE, 2),
+        'ring_mb': round(ring.data.nbytes / 2 ** 20, 2),
+        'heap_growth_kb': round((peak - baseline) / 1024, 1),
+        'write_us': round(float(np.median(write_times)) * 1e6, 2),
+        'read_us': round(float(np.median(read_times)) * 1e6, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--load', type=float, nargs='+', default=[0.5, 1.0, 2.0, 4.0],
+                        help='reader cost relative to real time')
+    parser.add_argument('--duration', type=float, default=60.0, help='seconds of audio pushed')
+    parser.add_argument('--block', type=float, default=0.1, help='seconds per captured block')
+    parser.add_argument('--capacity', type=float, default=10.0, help='seconds buffered before dropping')
+    parser.add_argument('--speed', type=float, default=10.0, help='run this many times faster than real time')
+    args = parser.parse_args()
+
+    for load in args.load:
+        print(json.dumps(run(load, args.duration, args.block, args.capacity, args.speed)))
+
+
+if __name__ == '__main__':
+    main()
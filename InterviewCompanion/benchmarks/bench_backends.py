@@ -0,0 +1,130 @@
+"""Compare transcription backends on real-time factor and word error rate.
+
+Usage:
+    python benchmarks/bench_backends.py --audio-dir path/to/clips [--backends whisper faster-whisper]
+        [--model base] [--threads 4] [--beam-size 1] [--compute-type int8] [--mode live] [--runs 1]
+
+The audio set is a directory of 16-bit PCM WAV files, each with a reference
+transcript next to it (clip.wav + clip.txt). Every clip is decoded whole by
+each backend after a warm-up; RTF is decode time divided by audio duration
+(below 1.0 is faster than real time). Output is one JSON object per backend.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_transcribe_paths import load_wav
+from config import Config
+from decoding import DECODING_MODES
+from whisper_server import TRANSCRIPTION_BACKENDS, create_transcriber
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+def normalize_words(text):
+    """Lowercase words with punctuation removed, so WER only counts recognition errors"""
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """(substitutions + deletions + insertions) / reference words, via word-level edit distance"""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def load_clips(audio_dir):
+    """(name, 16 kHz float32 audio, reference text) for every WAV with a transcript"""
+    clips = []
+    for wav_path in sorted(glob.glob(os.path.join(audio_dir, '*.wav'))):
+        txt_path = os.path.splitext(wav_path)[0] + '.txt'
+        if not os.path.exists(txt_path):
+            continue
+
+        audio, sample_rate = load_wav(wav_path)
+        if sample_rate != WHISPER_SAMPLE_RATE:
+            positions = np.linspace(0, len(audio) - 1, num=int(len(audio) * WHISPER_SAMPLE_RATE / sample_rate))
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+        with open(txt_path) as f:
+            clips.append((os.path.basename(wav_path), audio, f.read().strip()))
+    return clips
+
+
+def bench_backend(backend, model_name, clips, runs, mode):
+    transcriber = create_transcriber(model_name, backend)
+    transcriber.transcribe(clips[0][1])  # warm-up: model load, kernel selection, caches
+
+    audio_seconds = 0.0
+    decode_seconds = 0.0
+    errors = []
+    weights = []
+    for name, audio, reference in clips:
+        for _ in range(runs):
+            start = time.perf_counter()
+            text = transcriber.transcribe(audio, mode=mode)
+            decode_seconds += time.perf_counter() - start
+            audio_seconds += len(audio) / WHISPER_SAMPLE_RATE
+        errors.append(word_error_rate(reference, text))
+        weights.append(len(normalize_words(reference)))
+
+    return {
+        'backend': backend,
+        'model': model_name,
+        'clips': len(clips),
+        'audio_seconds': round(audio_seconds / runs, 2),
+        'rtf': round(decode_seconds / audio_seconds, 4),
+        'wer': round(float(np.average(errors, weights=weights)) if sum(weights) else 0.0, 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--audio-dir', required=True, help='directory of clip.wav + clip.txt pairs')
+    parser.add_argument('--backends', nargs='+', default=list(TRANSCRIPTION_BACKENDS), choices=TRANSCRIPTION_BACKENDS)
+    parser.add_argument('--model', default=Config.WHISPER_MODEL)
+    parser.add_argument('--threads', type=int, default=Config.TRANSCRIPTION_THREADS)
+    parser.add_argument('--beam-size', type=int, default=Config.TRANSCRIPTION_BEAM_SIZE)
+    parser.add_argument('--compute-type', default=Config.FASTER_WHISPER_COMPUTE_TYPE, help='faster-whisper weight type')
+    parser.add_argument('--mode', default='live', choices=DECODING_MODES, help='decoding profile')
+    parser.add_argument('--runs', type=int, default=1, help='decodes per clip')
+    args = parser.parse_args()
+
+    clips = load_clips(args.audio_dir)
+    if not clips:
+        parser.error(f"no WAV files with matching .txt transcripts in {args.audio_dir}")
+
+    Config.TRANSCRIPTION_THREADS = args.threads
+    Config.TRANSCRIPTION_BEAM_SIZE = args.beam_size
+    Config.FASTER_WHISPER_COMPUTE_TYPE = args.compute_type
+
+    for backend in args.backends:
+        result = bench_backend(backend, args.model, clips, args.runs, args.mode)
+        result.update({'mode': args.mode, 'threads': args.threads, 'beam_size': args.beam_size})
+        if backend == 'faster-whisper':
+            result['compute_type'] = args.compute_type
+        print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
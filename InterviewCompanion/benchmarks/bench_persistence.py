@@ -0,0 +1,103 @@
+"""Measure write-behind persistence throughput under many concurrent sessions.
+
+Usage:
+    python benchmarks/bench_persistence.py [--sessions 50] [--segments 200] [--answers 10]
+        [--batch-sizes 1 100 500] [--database sqlite:////tmp/history.sqlite3]
+
+Each session thread records transcript segments, a few revisions and
+answers as fast as it can, the way publish_transcription and the Q&A
+handlers do. Reports, per batch size, the time the callers spent queueing
+(what the transcription path pays), operations written per second until the
+queue drained, and batch write times. Uses a fresh temporary SQLite file
+unless --database is given.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from persistence import PersistenceWriter, db, init_database
+
+
+def run_session(writer, sid, segments, answers, enqueue_times):
+    times = []
+    for i in range(segments):
+        start = time.perf_counter()
+        writer.record_segment(sid, i, f"segment {i} of the interview transcript for {sid}, about fifteen words long")
+        if i % 20 == 19:
+            writer.record_revision(sid, i - 1, i, f"revised segments {i - 1} and {i}")
+        if answers and i % max(1, segments // answers) == 0:
+            writer.record_answer(sid, f"Question {i}?", "An answer of a few sentences. " * 10)
+        times.append(time.perf_counter() - start)
+    writer.end_session(sid)
+    enqueue_times.extend(times)
+
+
+def run(database_url, batch_size, sessions, segments, answers):
+    app = Flask(__name__)
+    init_database(app, database_url)
+    writer = PersistenceWriter(app, mode='bench', batch_size=batch_size, flush_interval=0.05,
+                               max_pending=sessions * segments * 2)
+
+    enqueue_times = []
+    threads = [
+        threading.Thread(target=run_session, args=(writer, f"sid-{i}", segments, answers, enqueue_times))
+        for i in range(sessions)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    enqueued = time.perf_counter() - start
+    writer.flush()
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        rows = db.session.execute(db.text("SELECT COUNT(*) FROM transcript_segments")).scalar()
+        db.engine.dispose()
+
+    enqueue_us = np.asarray(enqueue_times) * 1e6
+    stats = writer.stats()
+    return {
+        'batch_size': batch_size,
+        'sessions': sessions,
+        'operations': stats['written'],
+        'segment_rows': rows,
+        'enqueue_seconds': round(enqueued, 3),
+        'drain_seconds': round(elapsed, 3),
+        'operations_per_second': round(stats['written'] / elapsed, 1),
+        'enqueue_p50_us': round(float(np.percentile(enqueue_us, 50)), 2),
+        'enqueue_p99_us': round(float(np.percentile(enqueue_us, 99)), 2),
+        'batches': stats['batches'],
+        'avg_batch_ms': stats['avg_batch_ms'],
+        'dropped': stats['dropped'],
+        'errors': stats['errors']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--segments', type=int, default=200, help='segments per session')
+    parser.add_argument('--answers', type=int, default=10, help='answers per session')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100, 500])
+    parser.add_argument('--database', help='SQLAlchemy URL; default is a temporary SQLite file per run')
+    args = parser.parse_args()
+
+    for batch_size in args.batch_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            database_url = args.database or f"sqlite:///{os.path.join(tmp, 'history.sqlite3')}"
+            print(json.dumps(run(database_url, batch_size, args.sessions, args.segments, args.answers)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Per-block cost of the capture preprocessing, as a fraction of real time.
+
+Usage:
+    python benchmarks/bench_preprocessing.py [--rates 16000 44100 48000] [--blocks 0.1 0.5]
+        [--seconds 30]
+
+For each capture rate and block length, runs `seconds` of noisy harmonic
+audio through AudioPreprocessor block by block, once with every step and
+once per step on its own, and reports the median and p99 microseconds per
+block and the total as a percentage of the audio's duration (the budget is
+well under 1%). The cost per block is mostly fixed NumPy call overhead, so
+much shorter blocks cost proportionally more.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing import AudioPreprocessor
+
+TARGET_RATE = 16000
+
+STEPS = {
+    'all': {},
+    'resample': {'dc_removal': False, 'agc': False, 'noise_reduction': False},
+    'dc_removal': {'agc': False, 'noise_reduction': False},
+    'noise_reduction': {'dc_removal': False, 'agc': False},
+    'agc': {'dc_removal': False, 'noise_reduction': False},
+}
+
+
+def test_audio(rate, seconds):
+    t = np.arange(int(rate * seconds)) / rate
+    voiced = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((180, 360, 540, 720), 1)) * ((t % 2) < 1)
+    noise = np.random.default_rng(0).standard_normal(len(t))
+    return (0.05 * voiced + 0.01 * noise + 0.02).astype(np.float32)
+
+
+def run(rate, block_seconds, seconds, options):
+    audio = test_audio(rate, seconds)
+    block = max(1, int(rate * block_seconds))
+    preprocessor = AudioPreprocessor(rate, TARGET_RATE, **options)
+    times = []
+    for offset in range(0, len(audio) - block + 1, block):
+        chunk = audio[offset:offset + block]
+        start = time.perf_counter()
+        preprocessor.process(chunk)
+        times.append(time.perf_counter() - start)
+    times_us = np.asarray(times) * 1e6
+    return {
+        'median_us': round(float(np.median(times_us)), 1),
+        'p99_us': round(float(np.percentile(times_us, 99)), 1),
+        'percent_of_real_time': round(float(times_us.sum() / 1e6 / (len(times) * block_seconds) * 100), 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rates', type=int, nargs='+', default=[16000, 44100, 48000], help='capture rates (Hz)')
+    parser.add_argument('--blocks', type=float, nargs='+', default=[0.1, 0.5],
+                        help='block lengths (s); browser frames are 0.1 s, mic blocks STREAM_STEP')
+    parser.add_argument('--seconds', type=float, default=30.0, help='audio per measurement')
+    args = parser.parse_args()
+
+    for rate in args.rates:
+        for block_seconds in args.blocks:
+            result = {'rate': rate, 'block_seconds': block_seconds}
+            for step, options in STEPS.items():
+                result[step] = run(rate, block_seconds, args.seconds, options)
+            print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Web-tier latency while transcription saturates the CPU, in-process vs. a worker process pool.
+
+Usage:
+    python benchmarks/bench_process_pool.py [--wav clip.wav] [--model base] [--backend whisper]
+        [--processes 0 2 4] [--threads 0] [--concurrency 8] [--duration 20]
+
+For each pool size (0 = decode on threads inside this process), keeps
+`concurrency` transcription requests in flight for `duration` seconds while
+a probe thread requests the app's index page through the Flask test client
+every 10 ms. Reports probe latency percentiles (what HTTP and Socket.IO
+handling would see), decodes per second and the pool's counters. Without
+--wav the clip is 5 s of low-level white noise.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_factory import create_app
+from bench_transcribe_paths import load_wav
+from whisper_server import create_transcriber, pool_threads
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+def probe(client, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        client.get('/')
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.01)
+
+
+def run(transcriber, audio, client, concurrency, duration):
+    transcriber.transcribe(audio)  # warm-up
+
+    stop = threading.Event()
+    latencies = []
+    decodes = [0]
+
+    def decode_loop():
+        while not stop.is_set():
+            transcriber.transcribe(audio)
+            decodes[0] += 1
+
+    # Probe latency with the CPU idle first, as the baseline
+    idle = []
+    probe_stop = threading.Event()
+    thread = threading.Thread(target=probe, args=(client, probe_stop, idle))
+    thread.start()
+    time.sleep(min(2.0, duration / 4))
+    probe_stop.set()
+    thread.join()
+
+    threads = [threading.Thread(target=decode_loop) for _ in range(concurrency)]
+    threads.append(threading.Thread(target=probe, args=(client, stop, latencies)))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    idle_ms = np.asarray(idle) * 1000
+    busy_ms = np.asarray(latencies) * 1000
+    return {
+        'idle_p50_ms': round(float(np.percentile(idle_ms, 50)), 2),
+        'idle_p99_ms': round(float(np.percentile(idle_ms, 99)), 2),
+        'busy_p50_ms': round(float(np.percentile(busy_ms, 50)), 2),
+        'busy_p99_ms': round(float(np.percentile(busy_ms, 99)), 2),
+        'busy_max_ms': round(float(busy_ms.max()), 2),
+        'decodes_per_second': round(decodes[0] / elapsed, 2),
+        'audio_seconds_per_second': round(decodes[0] * len(audio) / WHISPER_SAMPLE_RATE / elapsed, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--wav', help='16-bit PCM WAV file to transcribe')
+    parser.add_argument('--model', default='base')
+    parser.add_argument('--backend', default=None, help='whisper or faster-whisper (default: Config)')
+    parser.add_argument('--processes', type=int, nargs='+', default=[0, 2])
+    parser.add_argument('--threads', type=int, default=0, help='threads per decode; 0 = cores / processes')
+    parser.add_argument('--concurrency', type=int, default=8, help='transcription requests kept in flight')
+    parser.add_argument('--duration', type=float, default=20.0)
+    args = parser.parse_args()
+
+    if args.wav:
+        audio, sample_rate = load_wav(args.wav)
+        if sample_rate != WHISPER_SAMPLE_RATE:
+            positions = np.linspace(0, len(audio) - 1, num=int(len(audio) * WHISPER_SAMPLE_RATE / sample_rate))
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    else:
+        audio = (np.random.default_rng(0).standard_normal(5 * WHISPER_SAMPLE_RATE) * 0.05).astype(np.float32)
+
+    client = create_app('basic').test_client()
+    for processes in args.processes:
+        threads = args.threads or (pool_threads(processes) if processes else 0)
+        transcriber = create_transcriber(args.model, args.backend, processes=processes, threads=threads)
+        result = {'processes': processes, 'threads': threads, 'concurrency': args.concurrency}
+        result.update(run(transcriber, audio, client, args.concurrency, args.duration))
+        if hasattr(transcriber, 'stats'):
+            result['transcriber'] = transcriber.stats()
+        if hasattr(transcriber, 'close'):
+            transcriber.close()
+        print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""Replay recorded interviews through the live pipeline and measure speech-to-answer latency.
+
+Usage:
+    python benchmarks/bench_replay.py --audio-dir path/to/interviews [--speed 1.0] [--block 0.1]
+        [--model base] [--mock-latency 0.3] [--mock-token-delay 0.02] [--output results.json]
+        [--baseline previous.json]
+
+Each clip.wav (with its reference transcript clip.txt) is fed in blocks, at
+`speed` times real time, into a browser-source session running the real
+AudioProcessor and transcription_worker. Answers come from a local mock
+OpenAI server, so no network is needed. Every detected question is
+answered the way the UI would answer it: the speculative answer if there
+is one, otherwise a streamed request. If clip.questions lists the times
+(in seconds, one per line) at which questions end in the audio, the
+report includes the delay from end of question to first answer token.
+
+Reported per clip and overall:
+- real-time factor (decode seconds / audio seconds)
+- per-stage latency percentiles from the metrics spans
+- detection-to-first-token and end-of-question-to-first-token
+- CPU seconds and peak RSS
+- WER of the final transcript
+
+Results are JSON, tagged with the git commit. --baseline prints the
+relative change of the headline numbers against an earlier --output file.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_openai_server import start_mock_server
+
+WHISPER_SAMPLE_RATE = 16000
+SESSION_ID = 'replay'
+
+# Lower is better for all of these
+HEADLINE = ('rtf', 'transcribe_audio_p95_ms', 'detect_to_first_token_p50_ms', 'question_to_first_token_p50_ms',
+            'cpu_seconds_per_audio_second', 'peak_rss_mb', 'wer')
+
+
+def percentile_ms(values, q):
+    return round(float(np.percentile(values, q)) * 1000, 2) if len(values) else None
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def load_question_times(wav_path):
+    path = os.path.splitext(wav_path)[0] + '.questions'
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [float(line) for line in f if line.strip() and not line.startswith('#')]
+
+
+class AnswerRecorder:
+    """Answers each detected question like the UI would and timestamps the first token"""
+
+    def __init__(self, services, session):
+        self.services = services
+        self.session = session
+        self.answers = []  # (detected at, first token at, speculative)
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def on_question(self, question):
+        detected = time.perf_counter()
+        thread = threading.Thread(target=self._answer, args=(question, detected))
+        thread.start()
+        self.threads.append(thread)
+
+    def _answer(self, question, detected):
+        speculator = self.session.speculator
+        speculation = speculator.claim(question) if speculator else None
+        deltas = speculation.stream() if speculation else self.services.openai_client.stream_answer(
+            question, **self.services.answer_context(self.session.sid)
+        )
+        first_token = None
+        try:
+            for _ in deltas:
+                if first_token is None:
+                    first_token = time.perf_counter()
+        except Exception as e:
+            print(f"answer failed: {e}", file=sys.stderr)
+            return
+        if first_token is not None:
+            with self.lock:
+                self.answers.append((detected, first_token, speculation is not None))
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+
+def replay_clip(services, name, audio, reference, question_times, speed, block_seconds, word_error_rate):
+    from metrics import metrics
+    from transcription import transcription_worker
+
+    session = services.session_manager.get_or_create(SESSION_ID)
+    session.audio_source = 'browser'
+    session.transcript.clear()
+    recorder = AnswerRecorder(services, session)
+
+    emit = services.emit
+
+    def observing_emit(event, data, to=None):
+        if event == 'question_detected' and to == session.room:
+            recorder.on_question(data['question'])
+        emit(event, data, to=to)
+
+    services.emit = observing_emit
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    session.start(lambda s: transcription_worker(services, s))
+    while not session.audio_processor.recording:
+        time.sleep(0.01)
+
+    # Push blocks on a fixed schedule so a slow pipeline shows up as queueing, not as a slower clock
+    block = int(block_seconds * WHISPER_SAMPLE_RATE)
+    start = time.perf_counter()
+    for i, offset in enumerate(range(0, len(audio), block)):
+        delay = start + i * block_seconds / speed - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        session.audio_processor.push_audio(audio[offset:offset + block])
+    audio_done = time.perf_counter()
+
+    session.audio_processor.stop_recording()
+    session.thread.join()
+    final_pass = services.final_pass
+    while final_pass is not None and not final_pass.idle():
+        time.sleep(0.05)
+    recorder.join()
+    elapsed = time.perf_counter() - start
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    services.emit = emit
+    session.active = False
+
+    spans = {}
+    for span in metrics.trace(SESSION_ID):
+        spans.setdefault(span['stage'], []).append(span['duration_ms'] / 1000)
+    metrics.forget_session(SESSION_ID)
+
+    audio_seconds = len(audio) / WHISPER_SAMPLE_RATE
+    detect_to_token = [first - detected for detected, first, _ in recorder.answers]
+    # Wall-clock moment each annotated question ended in the replayed audio
+    question_to_token = []
+    for question_end in question_times:
+        ended = start + question_end / speed
+        firsts = [first for detected, first, _ in recorder.answers if detected >= ended]
+        if firsts:
+            question_to_token.append(min(firsts) - ended)
+
+    result = {
+        'clip': name,
+        'audio_seconds': round(audio_seconds, 2),
+        'speed': speed,
+        'drain_seconds': round(elapsed - (audio_done - start), 3),
+        'rtf': round(sum(spans.get('transcribe_audio', [])) / audio_seconds, 4),
+        'questions_detected': len(recorder.answers),
+        'speculative_answers': sum(speculative for _, _, speculative in recorder.answers),
+        'detect_to_first_token_p50_ms': percentile_ms(detect_to_token, 50),
+        'detect_to_first_token_p95_ms': percentile_ms(detect_to_token, 95),
+        'question_to_first_token_p50_ms': percentile_ms(question_to_token, 50),
+        'question_to_first_token_p95_ms': percentile_ms(question_to_token, 95),
+        'questions_annotated': len(question_times),
+        'cpu_seconds': round(usage_after.ru_utime + usage_after.ru_stime
+                             - usage_before.ru_utime - usage_before.ru_stime, 3),
+        'peak_rss_mb': round(usage_after.ru_maxrss / 1024, 1),
+        'wer': round(word_error_rate(reference, session.transcript.text()), 4),
+        'stages': {
+            stage: {'count': len(values), 'p50_ms': percentile_ms(values, 50),
+                    'p95_ms': percentile_ms(values, 95), 'p99_ms': percentile_ms(values, 99)}
+            for stage, values in sorted(spans.items())
+        }
+    }
+    result['transcribe_audio_p95_ms'] = result['stages'].get('transcribe_audio', {}).get('p95_ms')
+    result['cpu_seconds_per_audio_second'] = round(result['cpu_seconds'] / audio_seconds, 4)
+    return result, detect_to_token, question_to_token
+
+
+def summarize(results, detect_to_token, question_to_token):
+    audio_seconds = sum(r['audio_seconds'] for r in results)
+    words = [max(1, r['reference_words']) for r in results]
+    return {
+        'clips': len(results),
+        'audio_seconds': round(audio_seconds, 2),
+        'rtf': round(sum(r['rtf'] * r['audio_seconds'] for r in results) / audio_seconds, 4),
+        'transcribe_audio_p95_ms': max((r['transcribe_audio_p95_ms'] or 0) for r in results),
+        'detect_to_first_token_p50_ms': percentile_ms(detect_to_token, 50),
+        'detect_to_first_token_p95_ms': percentile_ms(detect_to_token, 95),
+        'question_to_first_token_p50_ms': percentile_ms(question_to_token, 50),
+        'question_to_first_token_p95_ms': percentile_ms(question_to_token, 95),
+        'cpu_seconds_per_audio_second': round(sum(r['cpu_seconds'] for r in results) / audio_seconds, 4),
+        'peak_rss_mb': max(r['peak_rss_mb'] for r in results),
+        'wer': round(float(np.average([r['wer'] for r in results], weights=words)), 4)
+    }
+
+
+def compare(summary, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['summary']
+    changes = {}
+    for key in HEADLINE:
+        old, new = baseline.get(key), summary.get(key)
+        if old and new is not None:
+            changes[key] = {'baseline': old, 'current': new, 'change': round((new - old) / old, 4)}
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--audio-dir', required=True, help='directory of clip.wav + clip.txt (+ clip.questions)')
+    parser.add_argument('--speed', type=float, default=1.0, help='replay speed; 1.0 is real time')
+    parser.add_argument('--block', type=float, default=0.1, help='seconds of audio per pushed block')
+    parser.add_argument('--model', default='base')
+    parser.add_argument('--mock-latency', type=float, default=0.3, help='mock OpenAI seconds before the first token')
+    parser.add_argument('--mock-token-delay', type=float, default=0.02)
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    parser.add_argument('--baseline', help='results JSON from an earlier run to compare against')
+    args = parser.parse_args()
+
+    # Configuration is read from the environment at import, so set it before loading the app
+    mock = start_mock_server(latency=args.mock_latency, token_delay=args.mock_token_delay)
+    os.environ.update({
+        'OPENAI_BASE_URL': f"http://127.0.0.1:{mock.server_port}/v1",
+        'OPENAI_API_KEY': os.environ.get('OPENAI_API_KEY', 'replay-benchmark'),
+        'WHISPER_MODEL': args.model,
+        'AUDIO_SOURCE': 'browser',
+        'PERSISTENCE_ENABLED': '0',
+        'ANSWER_CACHE_ENABLED': '0',
+        'TRACE_SPANS': '1000000'
+    })
+
+    import logging
+    from bench_backends import load_clips, normalize_words, word_error_rate
+    from app_factory import create_app
+    from config import Config
+
+    logging.getLogger().setLevel(logging.WARNING)
+    Config.MAX_TRANSCRIPTION_LENGTH = 10 ** 7  # keep the whole transcript for WER
+    services = create_app('full').extensions['interview_assistant']
+    if not services.audio_enabled:
+        parser.error(f"transcription backend '{Config.TRANSCRIPTION_BACKEND}' is not installed")
+
+    clips = load_clips(args.audio_dir)
+    if not clips:
+        parser.error(f"no clip.wav + clip.txt pairs in {args.audio_dir}")
+
+    results, detect_to_token, question_to_token = [], [], []
+    for name, audio, reference in clips:
+        question_times = load_question_times(os.path.join(args.audio_dir, name))
+        result, detect, question = replay_clip(services, name, audio, reference, question_times,
+                                               args.speed, args.block, word_error_rate)
+        result['reference_words'] = len(normalize_words(reference))
+        print(json.dumps(result))
+        results.append(result)
+        detect_to_token += detect
+        question_to_token += question
+
+    report = {
+        'commit': git_commit(),
+        'config': {
+            'model': args.model,
+            'backend': Config.TRANSCRIPTION_BACKEND,
+            'streaming': Config.STREAMING_ENABLED,
+            'vad': Config.VAD_ENABLED,
+            'final_pass': Config.FINAL_PASS_ENABLED,
+            'speculative_policy': Config.SPECULATIVE_POLICY,
+            'speed': args.speed,
+            'cpu_count': os.cpu_count()
+        },
+        'summary': summarize(results, detect_to_token, question_to_token),
+        'clips': results
+    }
+    if args.baseline:
+        report['comparison'] = compare(report['summary'], args.baseline)
+    print(json.dumps({'summary': report['summary'], 'comparison': report.get('comparison')}))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Measure worker startup time and memory for each app mode.
+
+Usage:
+    python benchmarks/bench_startup.py [--modes full simple basic] [--runs 3] [--preload]
+
+Each run is a fresh interpreter that imports the factory, builds the app
+and reports wall time, peak RSS and which heavy modules got imported.
+Output is one JSON object per mode.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, resource, sys, time
+start = time.perf_counter()
+from app_factory import create_app
+app = create_app(sys.argv[1])
+elapsed = time.perf_counter() - start
+heavy = [m for m in ('torch', 'whisper', 'sounddevice', 'openai') if m in sys.modules]
+print(json.dumps({
+    'seconds': elapsed,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy_modules': heavy
+}))
+"""
+
+
+def probe(mode, preload):
+    env = dict(os.environ, PRELOAD='1' if preload else '0')
+    env.setdefault('OPENAI_API_KEY', 'startup-benchmark')
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, mode],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', default=['full', 'simple', 'basic'])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--preload', action='store_true', help='measure with PRELOAD=1 (eager model loading)')
+    args = parser.parse_args()
+
+    for mode in args.modes:
+        results = [probe(mode, args.preload) for _ in range(args.runs)]
+        print(json.dumps({
+            'mode': mode,
+            'preload': args.preload,
+            'startup_seconds_median': round(float(np.median([r['seconds'] for r in results])), 3),
+            'max_rss_mb_median': round(float(np.median([r['max_rss_mb'] for r in results])), 1),
+            'heavy_modules': results[-1]['heavy_modules']
+        }))
+
+
+if __name__ == '__main__':
+    main()
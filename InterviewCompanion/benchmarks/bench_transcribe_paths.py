@@ -0,0 +1,82 @@
+"""Compare in-memory and temp-file Whisper transcription latency.
+
+Usage:
+    python benchmarks/bench_transcribe_paths.py [--wav path/to/audio.wav] [--runs 5]
+
+Without --wav a synthetic 3 s voiced signal is used, which is enough to
+measure the I/O and ffmpeg overhead of the file path even though Whisper
+will not produce meaningful text for it.
+"""
+import argparse
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_processor import AudioProcessor
+
+
+def load_wav(path):
+    """Load a 16-bit PCM WAV file as mono float32"""
+    with wave.open(path, 'rb') as wav_file:
+        sample_rate = wav_file.getframerate()
+        channels = wav_file.getnchannels()
+        frames = wav_file.readframes(wav_file.getnframes())
+    audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return audio, sample_rate
+
+
+def synthetic_chunk(sample_rate, duration):
+    """A harmonic signal with a slow envelope, loud enough to pass the silence gate"""
+    t = np.arange(int(sample_rate * duration), dtype=np.float32) / sample_rate
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * t / duration))
+    tone = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 540, 720)))
+    return (0.2 * envelope * tone).astype(np.float32)
+
+
+def time_path(fn, audio, runs):
+    """Return per-run wall times in milliseconds"""
+    fn(audio)  # warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(audio)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--wav', help='16-bit PCM WAV file to transcribe')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--duration', type=float, default=3.0, help='synthetic chunk length in seconds')
+    args = parser.parse_args()
+
+    if args.wav:
+        audio, sample_rate = load_wav(args.wav)
+    else:
+        sample_rate = 16000
+        audio = synthetic_chunk(sample_rate, args.duration)
+
+    processor = AudioProcessor(sample_rate=sample_rate, chunk_duration=len(audio) / sample_rate)
+
+    results = {
+        'in_memory': time_path(processor._transcribe_in_memory, audio, args.runs),
+        'temp_file': time_path(processor._transcribe_file, audio, args.runs),
+    }
+
+    print(f"audio: {len(audio) / sample_rate:.2f} s @ {sample_rate} Hz, runs: {args.runs}")
+    for name, timings in results.items():
+        print(f"{name:>10}: median {np.median(timings):8.1f} ms   min {np.min(timings):8.1f} ms   max {np.max(timings):8.1f} ms")
+    saved = np.median(results['temp_file']) - np.median(results['in_memory'])
+    print(f"in-memory saves {saved:.1f} ms per chunk (median)")
+
+
+if __name__ == '__main__':
+    main()
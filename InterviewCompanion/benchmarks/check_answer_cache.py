@@ -0,0 +1,78 @@
+"""Check that repeated socket questions are answered from the answer cache.
+
+Usage:
+    python benchmarks/check_answer_cache.py [--question "Tell me about yourself"]
+
+Runs the simple app against the local mock OpenAI server and asks the same
+question over Socket.IO ('manual_question') from two fresh clients, then
+once more from the first client after its answer became part of its
+history. The second client must be served from the cache (no API request);
+the third ask must not reuse the context-free answer. Prints the API
+request count per ask and the cache counters, and exits non-zero if either
+expectation fails.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_openai_server import start_mock_server
+
+
+def ask(client, mock, question):
+    """API requests made while answering `question` on this client"""
+    before = mock.requests
+    client.emit('manual_question', {'question': question})
+    received = [event for event in client.get_received() if event['name'] == 'answer_received']
+    if not received:
+        raise RuntimeError(f"no answer for {question!r}")
+    return mock.requests - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--question', default='Tell me about yourself')
+    args = parser.parse_args()
+
+    # Configuration is read from the environment at import, so set it before loading the app
+    mock = start_mock_server(latency=0.01, token_delay=0.0)
+    os.environ.update({
+        'OPENAI_BASE_URL': f"http://127.0.0.1:{mock.server_port}/v1",
+        'OPENAI_API_KEY': os.environ.get('OPENAI_API_KEY', 'cache-check'),
+        'PERSISTENCE_ENABLED': '0',
+        'ANSWER_CACHE_ENABLED': '1',
+        'ANSWER_CACHE_PATH': ''
+    })
+
+    import logging
+    from app_factory import create_app
+
+    logging.getLogger().setLevel(logging.WARNING)
+    app = create_app('simple')
+    services = app.extensions['interview_assistant']
+    socketio = services.socketio
+
+    first = socketio.test_client(app)
+    second = socketio.test_client(app)
+    requests = {
+        'first_client': ask(first, mock, args.question),
+        'second_client': ask(second, mock, args.question)
+    }
+    # Let the first answer land in the first client's history before asking again
+    for thread in [t for t in threading.enumerate() if t.name == 'conversation-summary']:
+        thread.join()
+    requests['first_client_with_history'] = ask(first, mock, args.question)
+
+    checks = {
+        'repeat_served_from_cache': requests['second_client'] == 0,
+        'history_not_served_context_free': requests['first_client_with_history'] > 0
+    }
+    print(json.dumps({'api_requests': requests, 'cache': services.openai_client.cache_stats(), 'checks': checks}))
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Evaluate question detection on a labeled corpus.
+
+Usage:
+    python benchmarks/eval_question_detector.py [--corpus benchmarks/data/question_corpus.tsv]
+        [--folds 5] [--save question_classifier.npz]
+
+Compares the old startswith word list, the rule-based detector, and the
+rules plus a classifier for ambiguous sentences (k-fold cross-validated on
+the corpus). Reports precision, recall, false positives and microseconds
+per sentence. --save trains the classifier on the whole corpus and writes
+it for Config.QUESTION_CLASSIFIER_PATH.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_detector import QuestionClassifier, QuestionDetector
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'question_corpus.tsv')
+
+LEGACY_WORDS = ['what', 'where', 'when', 'why', 'how', 'who', 'which', 'can', 'could', 'would', 'should', 'do',
+                'does', 'did', 'are', 'is', 'was', 'were']
+
+
+def legacy_is_question(text):
+    """The detector this module replaced"""
+    text_lower = text.lower().strip()
+    return '?' in text or any(text_lower.startswith(word + ' ') for word in LEGACY_WORDS)
+
+
+def load_corpus(path):
+    sentences, labels = [], []
+    with open(path) as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'):
+                continue
+            label, sentence = line.rstrip('\n').split('\t', 1)
+            labels.append(int(label))
+            sentences.append(sentence)
+    return sentences, np.array(labels)
+
+
+def report(name, predictions, labels, seconds):
+    predictions = np.asarray(predictions, dtype=bool)
+    labels = labels.astype(bool)
+    true_positives = int(np.sum(predictions & labels))
+    false_positives = int(np.sum(predictions & ~labels))
+    false_negatives = int(np.sum(~predictions & labels))
+    precision = true_positives / (true_positives + false_positives) if true_positives + false_positives else 0.0
+    recall = true_positives / (true_positives + false_negatives) if true_positives + false_negatives else 0.0
+    return {
+        'detector': name,
+        'precision': round(precision, 3),
+        'recall': round(recall, 3),
+        'f1': round(2 * precision * recall / (precision + recall), 3) if precision + recall else 0.0,
+        'false_positives': false_positives,
+        'false_negatives': false_negatives,
+        'us_per_sentence': round(1e6 * seconds / len(labels), 2)
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def cross_validated(sentences, labels, folds):
+    """Predictions with the classifier for each fold trained on the other folds"""
+    order = np.random.default_rng(0).permutation(len(sentences))
+    predictions = np.zeros(len(sentences), dtype=bool)
+    seconds = 0.0
+    for fold in np.array_split(order, folds):
+        train = np.setdiff1d(order, fold)
+        classifier = QuestionClassifier.fit([sentences[i] for i in train], labels[train])
+        detector = QuestionDetector(classifier)
+        found, elapsed = timed(lambda: detector.detect_batch([sentences[i] for i in fold]))
+        seconds += elapsed
+        predictions[fold] = [bool(questions) for questions in found]
+    return predictions, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='TSV of label<TAB>sentence')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--save', help='train on the whole corpus and save the classifier here')
+    args = parser.parse_args()
+
+    sentences, labels = load_corpus(args.corpus)
+
+    legacy, seconds = timed(lambda: [legacy_is_question(s) for s in sentences])
+    print(json.dumps(report('legacy_word_list', legacy, labels, seconds)))
+
+    rules = QuestionDetector()
+    found, seconds = timed(lambda: [rules.is_question(s) for s in sentences])
+    print(json.dumps(report('rules', found, labels, seconds)))
+
+    found, seconds = timed(lambda: rules.detect_batch(sentences))
+    print(json.dumps(report('rules_batched', [bool(q) for q in found], labels, seconds)))
+
+    predictions, seconds = cross_validated(sentences, labels, args.folds)
+    print(json.dumps(report(f'rules_classifier_{args.folds}fold', predictions, labels, seconds)))
+
+    if args.save:
+        QuestionClassifier.fit(sentences, labels).save(args.save)
+        print(f"saved classifier to {args.save}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Load-test AsyncOpenAIClient against the local mock OpenAI server.
+
+Usage:
+    python benchmarks/load_test_openai.py [--requests 200] [--concurrency 50] [--distinct 20] [--rate-limit 0.1]
+
+Fires concurrent completions (a mix of distinct and repeated questions, so
+coalescing kicks in) plus a few streams, and reports latency percentiles,
+time to first token, retries and how many requests were coalesced.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_openai_client import AsyncOpenAIClient
+from mock_openai_server import start_mock_server
+
+
+def percentiles(values):
+    values = np.asarray(values) * 1000
+    return f"p50 {np.percentile(values, 50):7.1f} ms  p95 {np.percentile(values, 95):7.1f} ms  p99 {np.percentile(values, 99):7.1f} ms"
+
+
+async def run_load(client, args):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    first_tokens = []
+    errors = 0
+
+    async def one_completion(i):
+        nonlocal errors
+        messages = [{"role": "user", "content": f"Interview question {i % args.distinct}"}]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client.complete(messages, model="gpt-4o", max_tokens=200, temperature=0.7)
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    async def one_stream(i):
+        nonlocal errors
+        messages = [{"role": "user", "content": f"Streamed question {i}"}]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                first = None
+                async for _ in client.stream(messages, model="gpt-4o", max_tokens=200, temperature=0.7):
+                    if first is None:
+                        first = time.perf_counter() - start
+                first_tokens.append(first)
+            except Exception:
+                errors += 1
+
+    tasks = [one_completion(i) for i in range(args.requests)]
+    tasks += [one_stream(i) for i in range(args.streams)]
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start, latencies, first_tokens, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--streams', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=50, help='concurrent callers')
+    parser.add_argument('--distinct', type=int, default=20, help='distinct questions among the requests')
+    parser.add_argument('--max-in-flight', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--token-delay', type=float, default=0.005)
+    parser.add_argument('--rate-limit', type=float, default=0.1)
+    args = parser.parse_args()
+
+    server = start_mock_server(latency=args.latency, token_delay=args.token_delay, rate_limit=args.rate_limit)
+    client = AsyncOpenAIClient(
+        api_key='mock',
+        base_url=f"http://127.0.0.1:{server.server_port}/v1",
+        max_in_flight=args.max_in_flight,
+        backoff_base=0.05,
+        backoff_cap=1.0
+    )
+
+    elapsed, latencies, first_tokens, errors = client.run(run_load(client, args))
+
+    print(f"{args.requests} completions + {args.streams} streams in {elapsed:.2f} s "
+          f"({(args.requests + args.streams) / elapsed:.1f} req/s), errors: {errors}")
+    if latencies:
+        print(f"completion latency:  {percentiles(latencies)}")
+    if first_tokens:
+        print(f"time to first token: {percentiles(first_tokens)}")
+    print(f"client: {client.stats()}")
+    print(f"server: {server.requests} HTTP requests, {server.rate_limited} rate-limited")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""Minimal offline stand-in for the OpenAI chat completions API.
+
+Usage:
+    python benchmarks/mock_openai_server.py [--port 8765] [--latency 0.3] [--token-delay 0.02] [--rate-limit 0.1]
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8765/v1 and any
+OPENAI_API_KEY. Supports streaming and non-streaming requests, and can
+inject 429 responses to exercise retry/backoff.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ANSWER = (
+    "That's a great question. In my last role I led a small team through a difficult migration, "
+    "broke the work into milestones, kept stakeholders informed every week and delivered on time. "
+    "What I learned is that clear communication matters as much as technical skill."
+)
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so client connection pooling is exercised
+
+    def log_message(self, format, *args):
+        pass  # keep load tests quiet
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        server = self.server
+
+        with server.stats_lock:
+            server.requests += 1
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+            return
+
+        if random.random() < server.rate_limit:
+            with server.stats_lock:
+                server.rate_limited += 1
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}},
+                            headers={'retry-after': '0.1'})
+            return
+
+        time.sleep(server.latency)
+        tokens = self._tokens(body)
+
+        if body.get('stream'):
+            self._send_stream(body, tokens)
+        else:
+            self._send_json(200, self._completion(body, ''.join(tokens)))
+
+    def _tokens(self, body):
+        max_tokens = body.get('max_tokens') or 500
+        words = self.server.answer.split(' ')
+        return [(' ' if i else '') + word for i, word in enumerate(words[:max_tokens])]
+
+    def _completion(self, body, text):
+        return {
+            'id': f"chatcmpl-{uuid.uuid4().hex}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'mock'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': text},
+                'finish_reason': 'stop'
+            }],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': len(text.split()), 'total_tokens': len(text.split())}
+        }
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, body, tokens):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        for i, token in enumerate(tokens + [None]):
+            if i and token is not None:
+                time.sleep(self.server.token_delay)
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': body.get('model', 'mock'),
+                'choices': [{
+                    'index': 0,
+                    'delta': {'content': token} if token is not None else {},
+                    'finish_reason': None if token is not None else 'stop'
+                }]
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_mock_server(port=0, latency=0.3, token_delay=0.02, rate_limit=0.0, answer=DEFAULT_ANSWER):
+    """Start the mock server on a background thread; returns the server (see server.server_port)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockOpenAIHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.token_delay = token_delay
+    server.rate_limit = rate_limit
+    server.answer = answer
+    server.requests = 0
+    server.rate_limited = 0
+    server.stats_lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever, name="mock-openai")
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds before the first token')
+    parser.add_argument('--token-delay', type=float, default=0.02, help='seconds between streamed tokens')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='fraction of requests answered with 429')
+    args = parser.parse_args()
+
+    server = start_mock_server(args.port, args.latency, args.token_delay, args.rate_limit)
+    print(f"Mock OpenAI API on http://127.0.0.1:{server.server_port}/v1 (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
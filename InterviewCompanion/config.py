@@ -6,20 +6,132 @@ class Config:
     # Flask settings
     SECRET_KEY = os.environ.get('SESSION_SECRET', 'interview_assistant_secret_key')
     DEBUG = True
+    APP_MODE = os.environ.get('APP_MODE', 'basic')  # full, simple or basic
+    PRELOAD = os.environ.get('PRELOAD', '0') == '1'  # load OpenAI client and Whisper at startup instead of on first use
+    
+    # Multi-process Socket.IO: emits are shared through this queue so any worker can reach any client
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE', '')  # redis://..., amqp://... or local://host:port; empty = one process
+    SOCKETIO_CHANNEL = os.environ.get('SOCKETIO_CHANNEL', 'interview-assistant')
+    SOCKETIO_BROKER_AUTHKEY = os.environ.get('SOCKETIO_BROKER_AUTHKEY', '').encode()  # required for local:// queues; peers with it can emit to any client
     
     # Audio settings
     SAMPLE_RATE = 16000
     CHUNK_DURATION = 3.0  # seconds
     
+    # Where audio comes from: 'browser' streams frames over Socket.IO, 'server' uses a local mic
+    AUDIO_SOURCE = os.environ.get('AUDIO_SOURCE', 'browser')
+    AUDIO_ENCODING = 'mulaw'  # browser frame encoding: mulaw (128 kbit/s) or pcm16 (256 kbit/s)
+    AUDIO_MAX_BACKLOG = float(os.environ.get('AUDIO_MAX_BACKLOG', '10.0'))  # seconds of captured audio buffered before the oldest is dropped
+    AUDIO_BUFFER_HISTORY = 5.0  # seconds of already-read audio the ring keeps for windowed reads
+    # Conditioning between capture and transcription (preprocessing.py); resampling to SAMPLE_RATE always runs
+    PREPROCESS_DC_REMOVAL = os.environ.get('PREPROCESS_DC_REMOVAL', '1') != '0'
+    PREPROCESS_AGC = os.environ.get('PREPROCESS_AGC', '1') != '0'  # level speech to about -20 dBFS, up to +20 dB
+    PREPROCESS_NOISE_REDUCTION = os.environ.get('PREPROCESS_NOISE_REDUCTION', '1') != '0'  # spectral subtraction
+    PREPROCESS_BROWSER_AUDIO = os.environ.get('PREPROCESS_BROWSER_AUDIO', '0') == '1'  # browsers already suppress noise and apply AGC
+    
+    # Streaming transcription (overlapping windows re-decoded on a fast cadence)
+    STREAMING_ENABLED = os.environ.get('STREAMING_ENABLED', '1') != '0'
+    STREAM_STEP = 0.5  # seconds between re-decodes
+    STREAM_MAX_WINDOW = 15.0  # seconds of uncommitted audio kept for re-decoding
+    
+    # Voice activity detection (only speech segments reach Whisper)
+    VAD_ENABLED = os.environ.get('VAD_ENABLED', '1') != '0'
+    VAD_MIN_SILENCE = 0.6  # seconds of pause that ends an utterance
+    VAD_MAX_UTTERANCE = 15.0  # seconds before a long utterance is force-split
+    
+    # Bounded queues between pipeline stages (capture, vad, transcribe, detect, emit)
+    PIPELINE_QUEUE_SIZE = 8  # items per stage; the transcriber drops its oldest input beyond this
+    
     # Whisper settings
-    WHISPER_MODEL = "base"  # Options: tiny, base, small, medium, large
+    WHISPER_MODEL = os.environ.get('WHISPER_MODEL', 'base')  # Options: tiny, base, small, medium, large
+    # Engine: 'whisper' (openai-whisper on PyTorch) or 'faster-whisper' (CTranslate2, needs the faster-whisper package)
+    TRANSCRIPTION_BACKEND = os.environ.get('TRANSCRIPTION_BACKEND', 'whisper')
+    TRANSCRIPTION_THREADS = int(os.environ.get('TRANSCRIPTION_THREADS', '0'))  # CPU threads per decode; 0 = library default
+    # Decode in this many worker processes (off the web process's GIL); 0 = threads in this process
+    TRANSCRIPTION_PROCESSES = int(os.environ.get('TRANSCRIPTION_PROCESSES', '0'))  # threads each: TRANSCRIPTION_THREADS, or cores / processes
+    TRANSCRIPTION_POOL_MAX_SECONDS = 30.0  # shared-memory slot length; longer audio is sent pickled
+    TRANSCRIPTION_POOL_START_TIMEOUT = 30.0  # seconds a worker process has to connect before it is killed
+    TRANSCRIPTION_BEAM_SIZE = int(os.environ.get('TRANSCRIPTION_BEAM_SIZE', '1'))  # live decoding; 1 = greedy
+    FASTER_WHISPER_DEVICE = os.environ.get('FASTER_WHISPER_DEVICE', 'cpu')  # cpu or cuda
+    FASTER_WHISPER_COMPUTE_TYPE = os.environ.get('FASTER_WHISPER_COMPUTE_TYPE', 'int8')  # int8, int8_float16, float16, float32
+    FASTER_WHISPER_WORKERS = int(os.environ.get('FASTER_WHISPER_WORKERS', '2'))  # decodes run in parallel
+    WHISPER_IN_MEMORY = os.environ.get('WHISPER_IN_MEMORY', '1') != '0'  # Skip the temp WAV/ffmpeg round trip
+    WHISPER_BATCH_SIZE = int(os.environ.get('WHISPER_BATCH_SIZE', '8'))  # max chunks per decode batch
+    WHISPER_BATCH_WAIT = float(os.environ.get('WHISPER_BATCH_WAIT', '0.05'))  # seconds to wait for a batch to fill
+    # Decoding profiles: 'live' caps retries and search for latency, 'final' is the high-accuracy pass
+    LIVE_TEMPERATURES = (0.0, 0.4)  # fallback ladder tried when a decode looks like a failure
+    LIVE_BEST_OF = 1  # candidates sampled per fallback temperature
+    FINAL_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)  # Whisper's full ladder
+    FINAL_BEAM_SIZE = 5
+    FINAL_BEST_OF = 5
+    PROMPT_CONTEXT_CHARS = 300  # recent transcript passed to Whisper as its prompt; 0 disables
+    
+    # Final pass: finished utterances (needs VAD) are re-transcribed in the background and the live text revised
+    FINAL_PASS_ENABLED = os.environ.get('FINAL_PASS_ENABLED', '1') != '0'
+    FINAL_PASS_MODEL = os.environ.get('FINAL_PASS_MODEL', WHISPER_MODEL)  # e.g. 'small' for a larger model than live
+    FINAL_PASS_WORKERS = 1
+    FINAL_PASS_MAX_PENDING = 8  # utterances queued before the oldest is dropped
+    FINAL_PASS_MAX_DEFER = 5.0  # seconds a job waits for live decoding to go idle before running anyway
+    # Host-wide model server ("host:port"); unset keeps the model inside each process
+    WHISPER_SERVER_ADDRESS = os.environ.get('WHISPER_SERVER_ADDRESS')
+    WHISPER_SERVER_AUTHKEY = os.environ.get('WHISPER_SERVER_AUTHKEY', '').encode()  # required; the server runs what peers send
     
     # OpenAI settings
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+    OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL')  # e.g. a local mock server for load tests
+    OPENAI_MAX_IN_FLIGHT = int(os.environ.get('OPENAI_MAX_IN_FLIGHT', '8'))  # concurrent requests per process
+    OPENAI_MAX_CONNECTIONS = 20  # HTTP connection pool size
+    OPENAI_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT', '30'))  # seconds per request
+    OPENAI_MAX_RETRIES = 4  # on rate limits, timeouts and 5xx, with jittered exponential backoff
     OPENAI_MODEL = "gpt-4o"
     MAX_TOKENS = 500
     TEMPERATURE = 0.7
     
+    # Batch transcription of uploaded recordings (POST /batch/transcribe, or python batch_transcription.py)
+    BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', '8'))  # segments decoding at once; at least WHISPER_BATCH_SIZE or TRANSCRIPTION_PROCESSES
+    BATCH_DECODING_MODE = os.environ.get('BATCH_DECODING_MODE', 'final')  # decoding profile: live or final
+    BATCH_MAX_SEGMENT = 28.0  # seconds; utterances are packed up to this, inside one Whisper window
+    BATCH_MIN_SILENCE = 0.5  # seconds of pause to cut at
+    BATCH_ANSWER_WORKERS = 4  # questions answered concurrently per job
+    BATCH_MAX_RUNNING = 1  # jobs transcribing at once; the rest wait
+    BATCH_KEEP_JOBS = 20  # finished jobs kept for polling
+    BATCH_MAX_UPLOAD_MB = int(os.environ.get('BATCH_MAX_UPLOAD_MB', '500'))
+    
+    # Answer cache (exact match on normalized text; n-gram similarity for questions is opt-in)
+    ANSWER_CACHE_ENABLED = os.environ.get('ANSWER_CACHE_ENABLED', '1') != '0'
+    ANSWER_CACHE_PATH = os.environ.get('ANSWER_CACHE_PATH', 'instance/answer_cache.sqlite3')  # empty = memory only
+    ANSWER_CACHE_MAX_ENTRIES = 2000
+    ANSWER_CACHE_TTL = 7 * 24 * 3600  # seconds
+    ANSWER_CACHE_SIMILARITY = float(os.environ.get('ANSWER_CACHE_SIMILARITY', '1.0'))  # cosine threshold, e.g. 0.9; 1.0 = exact match only
+    
+    # History: sessions, transcript segments and answers, written in batches off the hot path
+    PERSISTENCE_ENABLED = os.environ.get('PERSISTENCE_ENABLED', '1') != '0'
+    DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///interview_history.sqlite3')  # relative SQLite paths live in instance/
+    PERSISTENCE_BATCH_SIZE = 500  # rows per transaction
+    PERSISTENCE_FLUSH_INTERVAL = 0.5  # seconds a partial batch waits for more rows
+    PERSISTENCE_MAX_PENDING = 20000  # queued writes before new ones are dropped
+    HISTORY_ADMIN_TOKEN = os.environ.get('HISTORY_ADMIN_TOKEN', '')  # bearer token that reads every session; empty = clients see only their own
+    
+    # Conversation context sent with each answer (summary + recent Q&A + recent transcript)
+    CONTEXT_MAX_TOKENS = 3000  # excluding the system prompt and the question itself
+    CONTEXT_TRANSCRIPT_TOKENS = 800  # most recent transcript included
+    CONTEXT_VERBATIM_TURNS = 4  # latest Q&A pairs resent as-is; older ones are folded into the summary
+    CONTEXT_SUMMARY_TOKENS = 250
+    
+    # Speculative answers: start generating as soon as a question is detected, before the user asks
+    SPECULATIVE_POLICY = os.environ.get('SPECULATIVE_POLICY', 'committed')  # off, committed, or partial (also in-progress hypotheses)
+    SPECULATIVE_TOKEN_BUDGET = int(os.environ.get('SPECULATIVE_TOKEN_BUDGET', '20000'))  # estimated tokens per session
+    
+    # Question detection (rules, plus an optional classifier for sentences the rules can't decide)
+    QUESTION_CLASSIFIER_PATH = os.environ.get('QUESTION_CLASSIFIER_PATH', '')  # .npz from benchmarks/eval_question_detector.py --save
+    QUESTION_CLASSIFIER_THRESHOLD = 0.5
+    
+    # Latency metrics at /metrics (Prometheus text format)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+    METRICS_SESSION_LABELS = os.environ.get('METRICS_SESSION_LABELS', '1') != '0'  # per-session series, dropped on disconnect
+    TRACE_SPANS = int(os.environ.get('TRACE_SPANS', '0'))  # recent spans kept per session for /metrics/trace/<sid>; 0 = off
+    TRACE_DIR = os.environ.get('TRACE_DIR', '')  # write each session's trace here when it disconnects
+    
     # UI settings
     MAX_TRANSCRIPTION_LENGTH = 5000  # characters
     AUTO_QUESTION_DETECTION = True
@@ -0,0 +1,147 @@
+import logging
+import threading
+from typing import Callable, List, Optional, Tuple
+
+# tiktoken is optional; without it token counts fall back to a character estimate
+_encoding = None
+_encoding_checked = False
+
+
+def load_encoding():
+    """The GPT-4o tokenizer if tiktoken (and its vocabulary) is available, else None"""
+    global _encoding, _encoding_checked
+    if not _encoding_checked:
+        _encoding_checked = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logging.info(f"tiktoken not available, estimating token counts: {e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count for prompt budgeting; about four characters per token without tiktoken"""
+    if not text:
+        return 0
+    encoding = load_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text) // 4)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Keep the last `max_tokens` tokens of text (the most recent part of a transcript)"""
+    if max_tokens <= 0:
+        return ""
+    encoding = load_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[-max_tokens:])
+    tail = text[-max_tokens * 4:]
+    if len(tail) < len(text) and " " in tail:
+        tail = tail[tail.index(" ") + 1:]  # start on a word boundary
+    return tail
+
+
+class ConversationContext:
+    """Token-budgeted interview history for one session.
+
+    Each answer request is built as: the fixed system prompt, a summary of
+    older turns, the most recent Q&A pairs verbatim, and finally the recent
+    transcript with the new question. Everything before the last message
+    only changes when a turn is added or folded into the summary, so
+    consecutive requests share a long identical prefix that the provider
+    can cache. Turns beyond `verbatim_turns` are summarized incrementally
+    (old summary + those turns -> new summary) rather than resent.
+    """
+
+    def __init__(self, max_tokens=3000, transcript_tokens=800, verbatim_turns=4, summary_tokens=250):
+        self.max_tokens = max_tokens
+        self.transcript_tokens = transcript_tokens
+        self.verbatim_turns = verbatim_turns
+        self.summary_tokens = summary_tokens
+
+        self.summary = ""
+        self.turns: List[Tuple[str, str]] = []
+        self.folding = False
+        self.lock = threading.Lock()
+
+    def add_turn(self, question: str, answer: str, summarize: Optional[Callable] = None):
+        """Record an answered question, folding the oldest turns into the summary once there are too many.
+
+        `summarize(summary, turns, max_tokens)` returns the new summary; call
+        this after the answer has been delivered so folding never delays it.
+        """
+        if not question or not answer:
+            return
+
+        with self.lock:
+            self.turns.append((question, answer))
+            if len(self.turns) <= self.verbatim_turns or self.folding:
+                return
+            self.folding = True
+            folded = self.turns[:-self.verbatim_turns]
+            summary = self.summary
+
+        try:
+            if summarize is None:
+                raise ValueError("no summarizer")
+            new_summary = summarize(summary, folded, self.summary_tokens)
+        except Exception as e:
+            logging.warning(f"Summarizing conversation failed, keeping questions only: {e}")
+            new_summary = " ".join([summary] + [f"Asked: {question}" for question, _ in folded]).strip()
+
+        with self.lock:
+            # The fallback summary grows with every fold; keep its most recent part
+            self.summary = truncate_tokens(new_summary, self.summary_tokens * 2)
+            self.turns = self.turns[len(folded):]
+            self.folding = False
+
+    def has_history(self) -> bool:
+        """True once a turn has been recorded, i.e. answers can depend on earlier ones"""
+        with self.lock:
+            return bool(self.summary or self.turns)
+
+    def build_messages(self, system_prompt: str, question: str, transcript: str = "") -> list:
+        """Chat messages for answering `question`, within the token budget"""
+        with self.lock:
+            summary = self.summary
+            turns = list(self.turns)
+
+        budget = self.max_tokens
+        prefix = []
+        if summary:
+            prefix.append({"role": "system", "content": f"Summary of the interview so far: {summary}"})
+            budget -= count_tokens(prefix[0]["content"])
+
+        # Newest turns first until the budget (less room for the transcript) runs out
+        reserve = min(self.transcript_tokens, max(budget, 0)) if transcript else 0
+        included = []
+        for turn_question, turn_answer in reversed(turns):
+            cost = count_tokens(turn_question) + count_tokens(turn_answer) + 8
+            if cost > budget - reserve:
+                break
+            included.append((turn_question, turn_answer))
+            budget -= cost
+
+        for turn_question, turn_answer in reversed(included):
+            prefix.append({"role": "user", "content": f"Interview question: {turn_question}"})
+            prefix.append({"role": "assistant", "content": turn_answer})
+
+        content = f"Interview question: {question}"
+        transcript = truncate_tokens(transcript.strip(), min(self.transcript_tokens, budget)) if transcript else ""
+        if transcript:
+            content = f"Recent interview transcript:\n{transcript}\n\n{content}"
+
+        return [{"role": "system", "content": system_prompt}] + prefix + [{"role": "user", "content": content}]
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'turns': len(self.turns),
+                'summary_tokens': count_tokens(self.summary),
+                'context_tokens': count_tokens(self.summary) + sum(
+                    count_tokens(q) + count_tokens(a) for q, a in self.turns
+                )
+            }
@@ -0,0 +1,73 @@
+from typing import Optional
+
+from config import Config
+
+# 'live' keeps the fallback ladder and search narrow for latency; 'final' spends more for accuracy
+DECODING_MODES = ('live', 'final')
+
+# Modes whose decodes only use capacity that live decoding leaves idle
+BACKGROUND_MODES = ('final',)
+
+# Whisper's own thresholds for deciding that a decode failed and should be retried at a higher temperature
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def decoding_profile(mode: str = 'live') -> dict:
+    """Temperature ladder, beam size and best_of for a decoding mode"""
+    if mode == 'final':
+        return {
+            'temperatures': tuple(Config.FINAL_TEMPERATURES),
+            'beam_size': Config.FINAL_BEAM_SIZE,
+            'best_of': Config.FINAL_BEST_OF
+        }
+    if mode == 'live':
+        return {
+            'temperatures': tuple(Config.LIVE_TEMPERATURES),
+            'beam_size': Config.TRANSCRIPTION_BEAM_SIZE,
+            'best_of': Config.LIVE_BEST_OF
+        }
+    raise ValueError(f"Unknown decoding mode '{mode}', expected one of: {', '.join(DECODING_MODES)}")
+
+
+def needs_fallback(compression_ratio: float, avg_logprob: float, no_speech_prob: float) -> bool:
+    """True if a decode looks like a repetition loop or low-confidence garbage"""
+    if no_speech_prob > NO_SPEECH_THRESHOLD and avg_logprob < LOGPROB_THRESHOLD:
+        return False  # silence: retrying would only invent text
+    return compression_ratio > COMPRESSION_RATIO_THRESHOLD or avg_logprob < LOGPROB_THRESHOLD
+
+
+class PromptContext:
+    """Rolling tail of a session's transcript, passed to Whisper as its prompt.
+
+    Conditioning each chunk on the text before it keeps spelling, casing and
+    names consistent across chunk boundaries and makes hard audio less likely
+    to fail the first decode. Only the last `max_chars` characters are kept,
+    cut at a word boundary, well inside Whisper's 224-token prompt limit.
+    """
+
+    def __init__(self, max_chars=300):
+        self.max_chars = max_chars
+        self.value = ""
+
+    def append(self, text: str):
+        text = text.strip()
+        if not text or self.max_chars <= 0:
+            return
+
+        combined = f"{self.value} {text}".strip()
+        if len(combined) > self.max_chars:
+            combined = combined[-self.max_chars:]
+            # Don't start the prompt halfway through a word
+            space = combined.find(" ")
+            if space != -1:
+                combined = combined[space + 1:]
+        self.value = combined
+
+    def text(self) -> Optional[str]:
+        """The prompt, or None when there is no context yet"""
+        return self.value or None
+
+    def clear(self):
+        self.value = ""
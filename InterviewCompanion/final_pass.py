@@ -0,0 +1,96 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+import numpy as np
+
+from pipeline import StageQueue
+
+
+class LiveActivity:
+    """Counts live decodes in progress so background work can wait for a quiet moment"""
+
+    def __init__(self):
+        self.count = 0
+        self.condition = threading.Condition()
+
+    def __enter__(self):
+        with self.condition:
+            self.count += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        with self.condition:
+            self.count -= 1
+            if self.count == 0:
+                self.condition.notify_all()
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Block until no live decode is running; False if `timeout` passed first"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.count == 0, timeout=timeout)
+
+
+# Entered around every live decode in this process
+live_decodes = LiveActivity()
+
+
+class FinalPassWorker:
+    """Re-transcribes finished utterances with the high-accuracy profile in the background.
+
+    Jobs wait until no live decode is running (or `max_defer` seconds have
+    passed) before they start, and decode with mode='final', which the
+    transcribers serve from a low-priority lane: live decodes that arrive
+    while a job runs still go first (see BACKGROUND_MODES). The queue holds at most `max_pending` utterances and drops the oldest
+    when it overflows: a late revision is worth less than a fresh one.
+    """
+
+    def __init__(self, transcribe: Callable[[np.ndarray, Optional[str]], str], workers=1, max_pending=8,
+                 max_defer=5.0):
+        self.transcribe = transcribe
+        self.max_defer = max_defer
+        self.jobs = StageQueue(maxsize=max_pending, drop_oldest=True)
+
+        self.submitted = 0
+        self.completed = 0
+        self.forced = 0
+        self.errors = 0
+
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._run, name=f"final-pass-{i}")
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, audio: np.ndarray, prompt: Optional[str], callback: Callable[[str], None]):
+        """Queue 16 kHz float32 audio; `callback(text)` runs on the worker thread"""
+        self.submitted += 1
+        self.jobs.put((audio, prompt, callback))
+
+    def _run(self):
+        while True:
+            audio, prompt, callback = self.jobs.get()
+            if not live_decodes.wait_idle(self.max_defer):
+                self.forced += 1  # waited long enough; run alongside live decoding
+
+            try:
+                text = self.transcribe(audio, prompt)
+                callback(text)
+                self.completed += 1
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Error in final-pass transcription: {e}")
+
+    def idle(self) -> bool:
+        """True once every submitted job has been revised, dropped or has failed"""
+        return self.completed + self.errors + self.jobs.dropped >= self.submitted
+
+    def stats(self) -> dict:
+        return {
+            'pending': self.jobs.depth(),
+            'dropped': self.jobs.dropped,
+            'completed': self.completed,
+            'forced': self.forced,
+            'errors': self.errors
+        }
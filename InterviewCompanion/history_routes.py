@@ -0,0 +1,88 @@
+import hmac
+import logging
+from typing import Optional
+
+from flask import Blueprint, jsonify, request
+from werkzeug.exceptions import Forbidden
+
+from config import Config
+from persistence import list_sessions, session_answers, session_transcript
+from services import get_services, request_sid
+
+history_bp = Blueprint('history', __name__)
+
+MAX_PAGE_SIZE = 500
+
+
+def page_size(default: int) -> int:
+    return max(1, min(request.args.get('limit', default, type=int), MAX_PAGE_SIZE))
+
+
+def is_admin() -> bool:
+    """True if the caller sent `Authorization: Bearer <HISTORY_ADMIN_TOKEN>` and that token is configured"""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    return bool(Config.HISTORY_ADMIN_TOKEN) and scheme == 'Bearer' and \
+        hmac.compare_digest(token.encode(), Config.HISTORY_ADMIN_TOKEN.encode())
+
+
+def visible_sessions() -> Optional[list]:
+    """Session ids the caller may read: None for all (admin), else the one its sid and token prove it owns"""
+    if is_admin():
+        return None
+    sid = request_sid()
+    if sid is None:
+        raise Forbidden('Send your session sid and token to read its history')
+    session_id = get_services().persistence.owned_session(sid)
+    return [session_id] if session_id else []
+
+
+@history_bp.errorhandler(Forbidden)
+def forbidden(e):
+    """History is only readable by the session's own client, or with the admin token"""
+    return jsonify({'success': False, 'message': e.description}), 403
+
+
+@history_bp.route('/history/sessions', methods=['GET'])
+def sessions():
+    """Past sessions the caller may read, newest first; page with ?before=<next_before>&before_id=<next_before_id>"""
+    visible = visible_sessions()
+    try:
+        return jsonify(list_sessions(request.args.get('before', type=float), request.args.get('before_id'),
+                                     page_size(20), visible))
+    except Exception as e:
+        logging.error(f"Error listing sessions: {e}")
+        return jsonify({'success': False, 'message': f'Failed to load history: {str(e)}'}), 500
+
+
+@history_bp.route('/history/sessions/<session_id>/transcript', methods=['GET'])
+def transcript(session_id):
+    """A session's transcript segments in order; page with ?after=<next_after>"""
+    visible = visible_sessions()
+    if visible is not None and session_id not in visible:
+        raise Forbidden('Not one of your sessions')
+    try:
+        return jsonify(session_transcript(session_id, request.args.get('after', -1, type=int), page_size(200)))
+    except Exception as e:
+        logging.error(f"Error loading transcript for session {session_id}: {e}")
+        return jsonify({'success': False, 'message': f'Failed to load history: {str(e)}'}), 500
+
+
+@history_bp.route('/history/sessions/<session_id>/answers', methods=['GET'])
+def answers(session_id):
+    """A session's questions and answers in order; page with ?after=<next_after>"""
+    visible = visible_sessions()
+    if visible is not None and session_id not in visible:
+        raise Forbidden('Not one of your sessions')
+    try:
+        return jsonify(session_answers(session_id, request.args.get('after', 0, type=int), page_size(50)))
+    except Exception as e:
+        logging.error(f"Error loading answers for session {session_id}: {e}")
+        return jsonify({'success': False, 'message': f'Failed to load history: {str(e)}'}), 500
+
+
+@history_bp.route('/history/stats', methods=['GET'])
+def stats():
+    """Write-behind queue counters; admin only"""
+    if not is_admin():
+        raise Forbidden('History stats need the admin token')
+    return jsonify(get_services().persistence.stats())
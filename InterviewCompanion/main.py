@@ -1,4 +1,11 @@
-from app_basic import app
+from app_factory import create_app
+
+# Mode comes from APP_MODE (full, simple or basic)
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    socketio = app.extensions.get('socketio')
+    if socketio:
+        socketio.run(app, host='0.0.0.0', port=5000, debug=True)
+    else:
+        app.run(host='0.0.0.0', port=5000, debug=True)
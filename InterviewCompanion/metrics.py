@@ -0,0 +1,199 @@
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+# Upper bounds in seconds, from sub-millisecond queue hand-offs to long answers
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with one series per label set, in Prometheus terms"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series: Dict[tuple, list] = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float, *label_values):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += seconds
+
+    def remove(self, label: str, value: str):
+        """Drop every series whose `label` equals `value`"""
+        position = self.label_names.index(label)
+        with self.lock:
+            for key in [key for key in self.series if key[position] == value]:
+                del self.series[key]
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = sorted((key, list(values)) for key, values in self.series.items())
+        for label_values, values in series:
+            labels = ",".join(
+                f'{name}="{escape_label(value)}"' for name, value in zip(self.label_names, label_values)
+            )
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += values[len(self.buckets)]
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic count with one series per label set, in Prometheus terms"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series: Dict[tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float, *label_values):
+        with self.lock:
+            self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def remove(self, label: str, value: str):
+        """Drop every series whose `label` equals `value`"""
+        position = self.label_names.index(label)
+        with self.lock:
+            for key in [key for key in self.series if key[position] == value]:
+                del self.series[key]
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            series = sorted(self.series.items())
+        for label_values, value in series:
+            labels = ",".join(
+                f'{name}="{escape_label(value)}"' for name, value in zip(self.label_names, label_values)
+            )
+            lines.append(f"{self.name}{{{labels}}} {value:g}")
+        return lines
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Process-wide latency spans: a histogram per stage (and session), drop counts and optional traces.
+
+    `observe()` costs one bisect and a short lock, so it is safe on the
+    audio and emit paths. With `trace_spans` > 0 the last that many spans
+    of each session are also kept for /metrics/trace/<sid>.
+    """
+
+    def __init__(self, enabled=True, session_labels=True, trace_spans=0):
+        self.enabled = enabled
+        self.session_labels = session_labels
+        self.trace_spans = trace_spans
+        self.stages = Histogram(
+            "interview_assistant_stage_seconds",
+            "Time spent in each step between captured speech and delivered answer",
+            ("stage", "session")
+        )
+        self.drops = Counter(
+            "interview_assistant_dropped_total",
+            "Items a stage discarded because it fell behind",
+            ("stage", "session")
+        )
+        self.traces: Dict[str, deque] = {}
+        self.lock = threading.Lock()
+
+    def configure(self, enabled: bool, session_labels: bool, trace_spans: int):
+        self.enabled = enabled
+        self.session_labels = session_labels
+        self.trace_spans = trace_spans
+
+    def observe(self, stage: str, seconds: float, session: Optional[str] = None):
+        if not self.enabled:
+            return
+        self.stages.observe(seconds, stage, (session or "") if self.session_labels else "")
+        if self.trace_spans and session:
+            with self.lock:
+                trace = self.traces.get(session)
+                if trace is None:
+                    trace = self.traces[session] = deque(maxlen=self.trace_spans)
+            # Wall-clock end time, so spans line up with client-side logs
+            trace.append((time.time(), stage, seconds))
+
+    def dropped(self, stage: str, count: int = 1, session: Optional[str] = None):
+        if self.enabled:
+            self.drops.inc(count, stage, (session or "") if self.session_labels else "")
+
+    def drop_counter(self, session: Optional[str]) -> Callable[[str, int], None]:
+        """dropped() bound to one session"""
+        return lambda stage, count: self.dropped(stage, count, session)
+
+    def observer(self, session: Optional[str]) -> Callable[[str, float], None]:
+        """observe() bound to one session, for components that don't know their sid"""
+        return lambda stage, seconds: self.observe(stage, seconds, session)
+
+    def span(self, stage: str, session: Optional[str] = None):
+        return Span(self, stage, session)
+
+    def trace(self, session: str) -> list:
+        with self.lock:
+            spans = list(self.traces.get(session, ()))
+        return [
+            {'end': end, 'start': end - seconds, 'stage': stage, 'duration_ms': round(seconds * 1000, 3)}
+            for end, stage, seconds in spans
+        ]
+
+    def forget_session(self, session: str, dump_dir: Optional[str] = None):
+        """Drop a finished session's series and trace, writing the trace to `dump_dir` first if given"""
+        if dump_dir and session in self.traces:
+            try:
+                os.makedirs(dump_dir, exist_ok=True)
+                with open(os.path.join(dump_dir, f"trace-{session}-{int(time.time())}.json"), "w") as f:
+                    json.dump(self.trace(session), f)
+            except Exception as e:
+                logging.error(f"Failed to write trace for session {session}: {e}")
+        self.stages.remove("session", session)
+        self.drops.remove("session", session)
+        with self.lock:
+            self.traces.pop(session, None)
+
+    def render(self) -> str:
+        return "\n".join(self.stages.render() + self.drops.render()) + "\n"
+
+
+class Span:
+    """Times a `with` block into Metrics.observe()"""
+
+    __slots__ = ('metrics', 'stage', 'session', 'start')
+
+    def __init__(self, metrics: Metrics, stage: str, session: Optional[str]):
+        self.metrics = metrics
+        self.stage = stage
+        self.session = session
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start, self.session)
+
+
+# Shared by every component in this process; configured by the app factory
+metrics = Metrics()
@@ -0,0 +1,17 @@
+from flask import Blueprint, Response, jsonify
+
+from metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage latency histograms in the Prometheus text exposition format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@metrics_bp.route('/metrics/trace/<sid>', methods=['GET'])
+def session_trace(sid):
+    """Recent spans for one session, oldest first (needs TRACE_SPANS > 0)"""
+    return jsonify({'session': sid, 'spans': metrics.trace(sid)})
@@ -1,8 +1,15 @@
+import hashlib
+import json
 import os
 import logging
-from openai import OpenAI
-from typing import Optional
+import time
+from typing import Iterator, Optional
 from dotenv import load_dotenv
+from answer_cache import AnswerCache
+from async_openai_client import AsyncOpenAIClient
+from config import Config
+from conversation_context import ConversationContext
+from metrics import metrics
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,7 +23,25 @@ class OpenAIClient:
         if not api_key:
             raise ValueError("OPENAI_API_KEY is not set in environment variables")
         
-        self.client = OpenAI(api_key=api_key)
+        # One pooled async client per process; its sync wrappers are used from request handlers
+        self.client = AsyncOpenAIClient(
+            api_key=api_key,
+            base_url=Config.OPENAI_BASE_URL,
+            max_in_flight=Config.OPENAI_MAX_IN_FLIGHT,
+            timeout=Config.OPENAI_TIMEOUT,
+            max_retries=Config.OPENAI_MAX_RETRIES,
+            max_connections=Config.OPENAI_MAX_CONNECTIONS
+        )
+        
+        # Repeated questions (and near-duplicates, if enabled) are served from the cache instead of the API
+        self.cache = None
+        if Config.ANSWER_CACHE_ENABLED:
+            self.cache = AnswerCache(
+                max_entries=Config.ANSWER_CACHE_MAX_ENTRIES,
+                ttl=Config.ANSWER_CACHE_TTL,
+                path=Config.ANSWER_CACHE_PATH,
+                similarity_threshold=Config.ANSWER_CACHE_SIMILARITY
+            )
         
         # System prompt for interview assistance
         self.system_prompt = """You are an intelligent interview assistant. Your role is to help candidates answer interview questions effectively. 
@@ -28,30 +53,133 @@ When given a question, provide:
 
 Keep responses focused and interview-appropriate. Aim for answers that are 1-3 minutes when spoken aloud."""
     
-    def generate_answer(self, question: str) -> str:
-        """Generate an answer for the given interview question"""
+    def _answer_messages(self, question: str, conversation: Optional[ConversationContext] = None,
+                         transcript: str = "") -> list:
+        """Chat messages used to answer an interview question, with the session's history if given"""
+        if conversation is not None:
+            return conversation.build_messages(self.system_prompt, question, transcript)
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": f"Interview question: {question}"}
+        ]
+    
+    def _answer_cache_key(self, question: str, messages: list, conversation: Optional[ConversationContext],
+                          transcript: str):
+        """Cache namespace and key for an answer.
+
+        Without history or transcript the request is just the question, so it
+        shares the question-keyed (and near-duplicate) cache. Otherwise the
+        answer depends on the context, so the key adds a digest of the
+        rendered messages and only an identical request matches.
+        """
+        if (conversation is None or not conversation.has_history()) and not transcript.strip():
+            return 'answer', question
+        digest = hashlib.sha1(json.dumps(messages, sort_keys=True).encode()).hexdigest()
+        return 'answer_context', f"{question} {digest}"
+    
+    def _cache_get(self, namespace: str, text: str):
+        return self.cache.get(namespace, text) if self.cache else None
+    
+    def _cache_set(self, namespace: str, text: str, value):
+        if self.cache and value:
+            self.cache.set(namespace, text, value)
+    
+    def cache_stats(self) -> dict:
+        """Hit/miss counters for the answer cache"""
+        return self.cache.stats() if self.cache else {}
+    
+    def generate_answer(self, question: str, conversation: Optional[ConversationContext] = None,
+                        transcript: str = "", session: Optional[str] = None) -> str:
+        """Generate an answer for the given interview question, aware of the session's history if given.
+
+        `session` (the client's sid) labels the latency metrics.
+        """
+        messages = self._answer_messages(question, conversation, transcript)
+        cache_key = self._answer_cache_key(question, messages, conversation, transcript)
+        cached = self._cache_get(*cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.chat.completions.create(
+            start = time.perf_counter()
+            answer = self.client.complete_sync(
                 model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"Interview question: {question}"}
-                ],
+                messages=messages,
                 max_tokens=500,
                 temperature=0.7
             )
-            answer = response.choices[0].message.content.strip()
-            logging.info(f"Generated answer for question: {question[:50]}...")
+            elapsed = time.perf_counter() - start
+            metrics.observe('openai_total', elapsed, session)
+            logging.info(f"Generated answer in {elapsed:.2f}s for question: {question[:50]}...")
+            self._cache_set(*cache_key, answer)
             return answer
             
         except Exception as e:
             logging.error(f"Error generating answer with OpenAI: {e}")
             raise Exception(f"Failed to generate answer: {str(e)}")
     
+    def stream_answer(self, question: str, conversation: Optional[ConversationContext] = None,
+                      transcript: str = "", session: Optional[str] = None) -> Iterator[str]:
+        """Generate an answer for the given interview question, yielding text deltas as they arrive"""
+        messages = self._answer_messages(question, conversation, transcript)
+        cache_key = self._answer_cache_key(question, messages, conversation, transcript)
+        cached = self._cache_get(*cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        try:
+            parts = []
+            start = time.perf_counter()
+            first_token = None
+            for delta in self.client.stream_sync(
+                model="gpt-4o",
+                messages=messages,
+                max_tokens=500,
+                temperature=0.7
+            ):
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                    metrics.observe('openai_first_token', first_token, session)
+                parts.append(delta)
+                yield delta
+            elapsed = time.perf_counter() - start
+            metrics.observe('openai_total', elapsed, session)
+            logging.info(f"Streamed answer in {elapsed:.2f}s (first token {first_token or elapsed:.2f}s) "
+                         f"for question: {question[:50]}...")
+            self._cache_set(*cache_key, ''.join(parts).strip())
+            
+        except Exception as e:
+            logging.error(f"Error streaming answer with OpenAI: {e}")
+            raise Exception(f"Failed to generate answer: {str(e)}")
+    
+    def summarize_conversation(self, summary: str, turns: list, max_tokens: int) -> str:
+        """Fold earlier Q&A turns into the running interview summary"""
+        history = "\n\n".join(f"Q: {question}\nA: {answer}" for question, answer in turns)
+        return self.client.complete_sync(
+            model="gpt-4o",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You maintain a brief running summary of a job interview for an assistant that helps the candidate. Keep facts the candidate stated (roles, projects, numbers, technologies) and the topics already covered. Reply with the updated summary only."
+                },
+                {
+                    "role": "user",
+                    "content": f"Current summary: {summary or '(none)'}\n\nNew exchanges:\n{history}\n\nUpdated summary:"
+                }
+            ],
+            max_tokens=max_tokens,
+            temperature=0.2
+        ).strip()
+    
     def generate_follow_up_questions(self, topic: str) -> list:
         """Generate potential follow-up questions for a given topic"""
+        cached = self._cache_get('follow_up', topic)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.chat.completions.create(
+            questions_text = self.client.complete_sync(
                 model="gpt-4o",
                 messages=[
                     {
@@ -63,9 +191,10 @@ Keep responses focused and interview-appropriate. Aim for answers that are 1-3 m
                 max_tokens=200,
                 temperature=0.8
             )
-            questions_text = response.choices[0].message.content.strip()
             questions = [q.strip() for q in questions_text.split('\n') if q.strip()]
-            return questions[:3]  # Return max 3 questions
+            questions = questions[:3]  # Return max 3 questions
+            self._cache_set('follow_up', topic, questions)
+            return questions
             
         except Exception as e:
             logging.error(f"Error generating follow-up questions: {e}")
@@ -73,8 +202,13 @@ Keep responses focused and interview-appropriate. Aim for answers that are 1-3 m
     
     def improve_answer(self, question: str, current_answer: str) -> str:
         """Improve an existing answer"""
+        cache_key = f"{question}\n{current_answer}"
+        cached = self._cache_get('improve', cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            response = self.client.chat.completions.create(
+            improved_answer = self.client.complete_sync(
                 model="gpt-4o",
                 messages=[
                     {
@@ -89,7 +223,7 @@ Keep responses focused and interview-appropriate. Aim for answers that are 1-3 m
                 max_tokens=500,
                 temperature=0.6
             )
-            improved_answer = response.choices[0].message.content.strip()
+            self._cache_set('improve', cache_key, improved_answer)
             return improved_answer
             
         except Exception as e:
@@ -0,0 +1,325 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import and_, delete, event, insert, or_, update
+from sqlalchemy.orm import DeclarativeBase
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+db = SQLAlchemy(model_class=Base)
+
+
+class InterviewSession(db.Model):
+    """One client connection; timestamps are Unix seconds like the rest of the app"""
+    __tablename__ = 'interview_sessions'
+
+    id = db.Column(db.String(32), primary_key=True)  # generated in-process so rows can be queued before insert
+    mode = db.Column(db.String(16))
+    started_at = db.Column(db.Float, nullable=False, index=True)
+    ended_at = db.Column(db.Float)
+
+
+class TranscriptSegment(db.Model):
+    """A committed transcript segment; `segment_id` is the session's TranscriptStore id"""
+    __tablename__ = 'transcript_segments'
+    __table_args__ = (db.Index('ix_transcript_segments_session_segment', 'session_id', 'segment_id'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(32), db.ForeignKey('interview_sessions.id'), nullable=False)
+    segment_id = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.Float, nullable=False)
+    revised_at = db.Column(db.Float)
+
+
+class AnswerRecord(db.Model):
+    """A question and the answer delivered for it"""
+    __tablename__ = 'answers'
+    __table_args__ = (db.Index('ix_answers_session_id', 'session_id', 'id'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(32), db.ForeignKey('interview_sessions.id'), nullable=False)
+    question = db.Column(db.Text, nullable=False)
+    answer = db.Column(db.Text, nullable=False)
+    speculative = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.Float, nullable=False)
+
+
+# Rows are inserted in this order within a batch so foreign keys always resolve
+INSERT_ORDER = (InterviewSession, TranscriptSegment, AnswerRecord)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets history reads run alongside the writer; NORMAL sync is durable across app crashes
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def init_database(app, database_url: str):
+    """Bind the models to `app` and create any missing tables"""
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'pool_pre_ping': True}
+    db.init_app(app)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', _sqlite_pragmas)
+        db.create_all()
+
+
+class PersistenceWriter:
+    """Write-behind persistence for sessions, transcript segments and answers.
+
+    The record_* methods only put a tuple on a queue, so callers on the
+    transcription path never wait for the database. One thread drains the
+    queue in batches of up to `batch_size` rows (or whatever arrived within
+    `flush_interval` seconds) and writes each batch in a single transaction
+    with executemany inserts. If the database falls behind by more than
+    `max_pending` operations, new ones are dropped and counted rather than
+    blocking the caller.
+
+    Records that arrive for a client after its session ended (an answer
+    still streaming at disconnect, say) are attached to the ended session;
+    the last `max_ended` ended sessions are remembered for that.
+    """
+
+    def __init__(self, app, mode: Optional[str] = None, batch_size=500, flush_interval=0.5, max_pending=20000,
+                 max_ended=1024):
+        self.app = app
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_pending)
+
+        self.session_ids: Dict[str, str] = {}  # Socket.IO sid -> InterviewSession.id
+        self.ended = OrderedDict()  # sid -> InterviewSession.id of recently ended sessions, oldest first
+        self.max_ended = max_ended
+        self.lock = threading.Lock()
+
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+        self.write_seconds = 0.0
+
+        self.thread = threading.Thread(target=self._run, name="persistence-writer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def session_id(self, sid: str) -> str:
+        """The stored session for a client, queued for insert on first use"""
+        with self.lock:
+            session_id = self.session_ids.get(sid) or self.ended.get(sid)
+            if session_id is not None:
+                return session_id
+            session_id = uuid.uuid4().hex
+            self.session_ids[sid] = session_id
+        self._put(('insert', InterviewSession, {'id': session_id, 'mode': self.mode, 'started_at': time.time()}))
+        return session_id
+
+    def owned_session(self, sid: str) -> Optional[str]:
+        """The stored session for a client, current or recently ended, without creating one"""
+        with self.lock:
+            return self.session_ids.get(sid) or self.ended.get(sid)
+
+    def record_segment(self, sid: str, segment_id: Optional[int], text: str):
+        if segment_id is None:
+            return
+        self._put(('insert', TranscriptSegment, {
+            'session_id': self.session_id(sid),
+            'segment_id': segment_id,
+            'text': text.strip(),
+            'created_at': time.time()
+        }))
+
+    def record_revision(self, sid: str, first_id: int, last_id: int, text: str):
+        """Mirror TranscriptStore.revise: the first segment takes the text, the rest of the run is removed"""
+        self._put(('revise', self.session_id(sid), first_id, last_id, text.strip(), time.time()))
+
+    def record_answer(self, sid: str, question: str, answer: str, speculative=False):
+        self._put(('insert', AnswerRecord, {
+            'session_id': self.session_id(sid),
+            'question': question,
+            'answer': answer,
+            'speculative': speculative,
+            'created_at': time.time()
+        }))
+
+    def end_session(self, sid: str):
+        with self.lock:
+            session_id = self.session_ids.pop(sid, None)
+            if session_id is not None:
+                self.ended[sid] = session_id
+                if len(self.ended) > self.max_ended:
+                    self.ended.popitem(last=False)
+        if session_id is not None:
+            self._put(('end', session_id, time.time()))
+
+    def flush(self):
+        """Block until everything queued so far has been written (or failed)"""
+        self.queue.join()
+
+    def stats(self) -> dict:
+        return {
+            'pending': self.queue.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'avg_batch_ms': round(1000 * self.write_seconds / self.batches, 2) if self.batches else 0.0
+        }
+
+    def _put(self, operation):
+        try:
+            self.queue.put_nowait(operation)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logging.warning(f"Persistence queue full; {self.dropped} writes dropped so far")
+
+    def _next_batch(self) -> list:
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            start = time.perf_counter()
+            try:
+                with self.app.app_context():
+                    self._write(batch)
+                self.written += len(batch)
+                self.batches += 1
+                self.write_seconds += time.perf_counter() - start
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Error writing {len(batch)} records to the database: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _write(self, batch: list):
+        """One transaction: inserts grouped per table, then revisions and session ends in arrival order"""
+        rows = {model: [] for model in INSERT_ORDER}
+        changes = []
+        for operation in batch:
+            if operation[0] == 'insert':
+                rows[operation[1]].append(operation[2])
+            else:
+                changes.append(operation)
+
+        try:
+            for model in INSERT_ORDER:
+                if rows[model]:
+                    db.session.execute(insert(model), rows[model])
+
+            for operation in changes:
+                if operation[0] == 'revise':
+                    _, session_id, first_id, last_id, text, revised_at = operation
+                    in_session = TranscriptSegment.session_id == session_id
+                    db.session.execute(
+                        update(TranscriptSegment)
+                        .where(in_session, TranscriptSegment.segment_id == first_id)
+                        .values(text=text, revised_at=revised_at)
+                    )
+                    db.session.execute(
+                        delete(TranscriptSegment)
+                        .where(in_session, TranscriptSegment.segment_id > first_id,
+                               TranscriptSegment.segment_id <= last_id)
+                    )
+                elif operation[0] == 'end':
+                    _, session_id, ended_at = operation
+                    db.session.execute(
+                        update(InterviewSession).where(InterviewSession.id == session_id).values(ended_at=ended_at)
+                    )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            db.session.remove()
+
+
+def list_sessions(before: Optional[float] = None, before_id: Optional[str] = None, limit=20,
+                  session_ids: Optional[list] = None) -> dict:
+    """Most recent sessions first, only `session_ids` if given; pass the returned `next_before` and
+    `next_before_id` to get the following page"""
+    query = (db.select(InterviewSession)
+             .order_by(InterviewSession.started_at.desc(), InterviewSession.id.desc())
+             .limit(limit))
+    if session_ids is not None:
+        query = query.where(InterviewSession.id.in_(session_ids))
+    if before is not None:
+        # Keyset on (started_at, id) so sessions sharing a start time are not skipped between pages
+        older = InterviewSession.started_at < before
+        if before_id is not None:
+            older = or_(older, and_(InterviewSession.started_at == before, InterviewSession.id < before_id))
+        query = query.where(older)
+    sessions = db.session.execute(query).scalars().all()
+    last = sessions[-1] if len(sessions) == limit else None
+    return {
+        'sessions': [{
+            'id': session.id,
+            'mode': session.mode,
+            'started_at': session.started_at,
+            'ended_at': session.ended_at
+        } for session in sessions],
+        'next_before': last.started_at if last else None,
+        'next_before_id': last.id if last else None
+    }
+
+
+def session_transcript(session_id: str, after: int = -1, limit=200) -> dict:
+    """Transcript segments in order, `limit` at a time after segment id `after`"""
+    segments = db.session.execute(
+        db.select(TranscriptSegment)
+        .where(TranscriptSegment.session_id == session_id, TranscriptSegment.segment_id > after)
+        .order_by(TranscriptSegment.segment_id)
+        .limit(limit)
+    ).scalars().all()
+    return {
+        'segments': [{
+            'id': segment.segment_id,
+            'text': segment.text,
+            'created_at': segment.created_at,
+            'revised': segment.revised_at is not None
+        } for segment in segments],
+        'next_after': segments[-1].segment_id if len(segments) == limit else None
+    }
+
+
+def session_answers(session_id: str, after: int = 0, limit=50) -> dict:
+    """Questions and answers in the order they were given, `limit` at a time"""
+    answers = db.session.execute(
+        db.select(AnswerRecord)
+        .where(AnswerRecord.session_id == session_id, AnswerRecord.id > after)
+        .order_by(AnswerRecord.id)
+        .limit(limit)
+    ).scalars().all()
+    return {
+        'answers': [{
+            'question': record.question,
+            'answer': record.answer,
+            'speculative': record.speculative,
+            'timestamp': record.created_at
+        } for record in answers],
+        'next_after': answers[-1].id if len(answers) == limit else None
+    }
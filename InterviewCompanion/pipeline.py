@@ -0,0 +1,189 @@
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+
+# Passed down the pipeline after the last item; each stage flushes then forwards it
+STOP = object()
+
+
+class StageQueue:
+    """Bounded hand-off queue between stages.
+
+    Producers block when it is full unless `drop_oldest` is set, in which case
+    the oldest waiting item that `droppable(item)` allows (any item by
+    default) is discarded and counted, so a slow consumer always works on the
+    most recent data. Items that must not be lost, such as utterance
+    boundaries, are never discarded, and they and STOP wait for room when
+    nothing droppable is queued. Items are stamped on the way in so
+    consumers can tell how long they waited.
+    """
+
+    def __init__(self, maxsize=32, drop_oldest=False, droppable: Optional[Callable] = None):
+        self.maxsize = maxsize
+        self.drop_oldest = drop_oldest
+        self.droppable = droppable
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.on_drop: Optional[Callable[[int], None]] = None  # called with the number of items just dropped
+
+    def put(self, item):
+        entry = (time.perf_counter(), item)
+        dropped = 0
+        with self.condition:
+            while 0 < self.maxsize <= len(self.items):
+                if self.drop_oldest and item is not STOP and self._drop_oldest():
+                    dropped += 1
+                else:
+                    self.condition.wait()
+            self.items.append(entry)
+            self.condition.notify_all()
+        if dropped and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    def _drop_oldest(self) -> bool:
+        for index, (_, queued) in enumerate(self.items):
+            if queued is not STOP and (self.droppable is None or self.droppable(queued)):
+                del self.items[index]
+                self.dropped += 1
+                return True
+        return False
+
+    def get(self):
+        return self.get_timed()[0]
+
+    def get_timed(self):
+        """(item, seconds it spent queued)"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.items)
+            queued_at, item = self.items.popleft()
+            self.condition.notify_all()
+        return item, time.perf_counter() - queued_at
+
+    def depth(self) -> int:
+        return len(self.items)
+
+
+class Stage:
+    """One pipeline step running on its own thread.
+
+    `handler(item)` returns an iterable of outputs (or None) for the next
+    stage; `on_stop()` may return final outputs when the pipeline drains.
+    If `observe(name, seconds)` is set, queue waits are reported as
+    '<name>_queue' and handler times as '<name>'. With `drop_oldest`, only
+    input items for which `droppable(item)` is true may be discarded.
+    """
+
+    def __init__(self, name: str, handler: Callable, on_stop: Optional[Callable] = None,
+                 maxsize=32, drop_oldest=False, droppable: Optional[Callable] = None):
+        self.name = name
+        self.handler = handler
+        self.on_stop = on_stop
+        self.input = StageQueue(maxsize, drop_oldest, droppable)
+        self.output: Optional[StageQueue] = None
+        self.thread = None
+        self.observe: Optional[Callable[[str, float], None]] = None
+
+        self.processed = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_latency = 0.0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name=f"pipeline-{self.name}")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item, waited = self.input.get_timed()
+            if self.observe is not None and item is not STOP:
+                self.observe(f"{self.name}_queue", waited)
+            if item is STOP:
+                if self.on_stop:
+                    self._forward(self._call(self.on_stop))
+                if self.output is not None:
+                    self.output.put(STOP)
+                return
+
+            self._forward(self._call(self.handler, item))
+
+    def _call(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        except Exception as e:
+            self.errors += 1
+            logging.error(f"Error in pipeline stage '{self.name}': {e}")
+            return None
+        finally:
+            latency = time.perf_counter() - start
+            if self.observe is not None:
+                self.observe(self.name, latency)
+            self.processed += 1
+            self.total_latency += latency
+            self.last_latency = latency
+            self.max_latency = max(self.max_latency, latency)
+
+    def _forward(self, outputs: Optional[Iterable]):
+        if outputs is None or self.output is None:
+            return
+        for output in outputs:
+            self.output.put(output)
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': self.input.depth(),
+            'dropped': self.input.dropped,
+            'processed': self.processed,
+            'errors': self.errors,
+            'avg_latency_ms': round(1000 * self.total_latency / self.processed, 2) if self.processed else 0.0,
+            'max_latency_ms': round(1000 * self.max_latency, 2),
+            'last_latency_ms': round(1000 * self.last_latency, 2)
+        }
+
+
+class Pipeline:
+    """A blocking source feeding a chain of stages connected by bounded queues.
+
+    `source()` blocks until it has an item and returns None when the input is
+    finished; that sends STOP down the chain so every stage can flush.
+    Nothing polls or sleeps: each thread is parked on its queue until work
+    or the shutdown signal arrives. `on_drop(name, count)` is told about
+    items a stage's queue discarded.
+    """
+
+    def __init__(self, source: Callable, stages: List[Stage], observe: Optional[Callable[[str, float], None]] = None,
+                 on_drop: Optional[Callable[[str, int], None]] = None):
+        self.source = source
+        self.stages = stages
+        for upstream, downstream in zip(stages, stages[1:]):
+            upstream.output = downstream.input
+        for stage in stages:
+            stage.observe = observe
+            if on_drop is not None:
+                stage.input.on_drop = functools.partial(on_drop, stage.name)
+
+    def run(self):
+        """Run until the source is exhausted and every stage has drained"""
+        for stage in self.stages:
+            stage.start()
+
+        first = self.stages[0].input
+        try:
+            while True:
+                item = self.source()
+                if item is None:
+                    break
+                first.put(item)
+        finally:
+            first.put(STOP)
+            for stage in self.stages:
+                stage.thread.join()
+
+    def stats(self) -> dict:
+        return {stage.name: stage.stats() for stage in self.stages}
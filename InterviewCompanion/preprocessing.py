@@ -0,0 +1,196 @@
+import math
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def lowpass_filter(length: int, cutoff: float) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass FIR; `cutoff` is a fraction of Nyquist"""
+    n = np.arange(length) - (length - 1) / 2
+    return cutoff * np.sinc(cutoff * n) * np.kaiser(length, 8.0)
+
+
+class PolyphaseResampler:
+    """Streaming rational resampler: up by L, low-pass, down by M, computing only the kept outputs.
+
+    The filter is split into L phases of `taps` coefficients, so each output
+    is one `taps`-long dot product over the most recent input, vectorized
+    across the block. The last taps - 1 input samples carry over to the
+    next block, so block edges are seamless; the cost is a delay of about
+    taps / 2 input samples.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int, taps=32):
+        divisor = math.gcd(int(source_rate), int(target_rate))
+        self.up = int(target_rate) // divisor
+        self.down = int(source_rate) // divisor
+        self.taps = taps
+
+        # Cut just below the lower of the two Nyquist rates, in the upsampled domain
+        h = lowpass_filter(taps * self.up, 0.9 / max(self.up, self.down))
+        h *= self.up / h.sum()
+        # phases[p, k] = h[k * L + p], reversed so it lines up with an oldest-first input window
+        self.phases = np.ascontiguousarray(h.reshape(taps, self.up).T[:, ::-1], dtype=np.float32)
+        self.reset()
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def reset(self):
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.position = (self.taps - 1) * self.up  # next output, in upsampled samples from the start of history
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if self.passthrough:
+            return np.asarray(block, dtype=np.float32)
+        x = np.concatenate((self.history, np.asarray(block, dtype=np.float32)))
+        outputs = np.arange(self.position, len(x) * self.up, self.down)
+        newest = outputs // self.up  # newest input sample each output depends on
+        windows = sliding_window_view(x, self.taps)[newest - (self.taps - 1)]
+        resampled = np.einsum('nk,nk->n', windows, self.phases[outputs % self.up])
+
+        consumed = len(x) - (self.taps - 1)
+        self.position = (outputs[-1] + self.down if len(outputs) else self.position) - consumed * self.up
+        self.history = x[consumed:]
+        return resampled.astype(np.float32, copy=False)
+
+
+class SpectralSubtractor:
+    """Streaming spectral-subtraction noise reduction on 50%-overlapping sqrt-Hann frames.
+
+    The noise spectrum is the mean of the quietest fifth of the frames in
+    the last `history` frames (2 s at 16 kHz), which holds a pause in
+    almost any stretch of speech and does not depend on the block size.
+    Each bin keeps at least `floor` of its amplitude, which limits musical
+    noise. Output lags input by frame / 2 samples.
+    """
+
+    def __init__(self, frame=512, over_subtraction=2.0, floor=0.2, history=125):
+        self.frame = frame
+        self.hop = frame // 2
+        self.over_subtraction = over_subtraction
+        self.floor_power = floor * floor
+        self.history = np.zeros((history, frame // 2 + 1), dtype=np.float32)  # recent frame power spectra
+        self.history_energy = np.zeros(history, dtype=np.float32)  # and their totals
+        # sqrt of a periodic Hann on analysis and synthesis sums to one at 50% overlap
+        self.window = np.sqrt(np.hanning(frame + 1)[:frame]).astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        self.pending = np.zeros(self.frame - self.hop, dtype=np.float32)
+        self.tail = np.zeros(self.hop, dtype=np.float32)
+        self.history_frames = 0  # frames seen, capped by the history length
+        self.history_index = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        x = np.concatenate((self.pending, block))
+        frames = (len(x) - self.frame) // self.hop + 1 if len(x) >= self.frame else 0
+        if frames == 0:
+            self.pending = x
+            return np.zeros(0, dtype=np.float32)
+
+        spectrum = np.fft.rfft(sliding_window_view(x, self.frame)[::self.hop][:frames] * self.window, axis=1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+
+        noise = self._update_noise(power)
+        gain = np.sqrt(np.maximum(1.0 - self.over_subtraction * noise / (power + 1e-12), self.floor_power))
+        frames_out = np.fft.irfft(spectrum * gain, n=self.frame, axis=1).astype(np.float32) * self.window
+
+        # Overlap-add: first half of each frame plus second half of the one before
+        second_halves = np.concatenate((self.tail[None, :], frames_out[:-1, self.hop:]))
+        output = (frames_out[:, :self.hop] + second_halves).reshape(-1)
+        self.tail = frames_out[-1, self.hop:].copy()
+        self.pending = x[frames * self.hop:]
+        return output
+
+    def _update_noise(self, power: np.ndarray) -> np.ndarray:
+        size = len(self.history)
+        recent = power[-size:]
+        rows = (self.history_index + np.arange(len(recent))) % size
+        self.history[rows] = recent
+        self.history_energy[rows] = recent.sum(axis=1)
+        self.history_index = (rows[-1] + 1) % size
+        self.history_frames = min(size, self.history_frames + len(recent))
+
+        quietest = max(1, self.history_frames // 5)
+        rows = np.argpartition(self.history_energy[:self.history_frames], quietest - 1)[:quietest]
+        return self.history[rows].mean(axis=0)
+
+
+class AudioPreprocessor:
+    """Conditions captured audio before transcription: resample, remove DC, suppress noise, level.
+
+    Every step works on whole blocks with NumPy and carries its state
+    between blocks, and gains are ramped across each block, so block edges
+    are inaudible. Noise reduction runs before the AGC so the noise
+    estimate does not follow gain changes. Output is float32 at
+    `target_rate`, possibly a little shorter or longer than the input
+    while the resampler and noise filter fill up.
+    """
+
+    def __init__(self, source_rate: int, target_rate=16000, dc_removal=True, agc=True, noise_reduction=True,
+                 resampler_taps=32, dc_time=0.5, agc_target_db=-20.0, agc_max_gain_db=20.0, agc_gate_db=-50.0,
+                 agc_attack=0.05, agc_release=2.0, ceiling=0.95):
+        self.target_rate = target_rate
+        self.resampler = PolyphaseResampler(source_rate, target_rate, resampler_taps)
+        self.dc_removal = dc_removal
+        self.agc = agc
+        self.noise_filter = SpectralSubtractor(frame=512 if target_rate >= 16000 else 256) if noise_reduction else None
+
+        self.dc_time = dc_time
+        self.agc_target = 10 ** (agc_target_db / 20)
+        self.agc_max_gain = 10 ** (agc_max_gain_db / 20)
+        self.agc_gate = 10 ** (agc_gate_db / 20)
+        self.agc_attack = agc_attack
+        self.agc_release = agc_release
+        self.ceiling = ceiling
+        self.reset()
+
+    def reset(self, source_rate: Optional[int] = None):
+        """Forget all state, e.g. between recordings; optionally for a new capture rate"""
+        if source_rate is not None:
+            self.resampler = PolyphaseResampler(source_rate, self.target_rate, self.resampler.taps)
+        self.resampler.reset()
+        if self.noise_filter is not None:
+            self.noise_filter.reset()
+        self.dc = None
+        self.gain = 1.0
+
+    def process(self, block: np.ndarray, condition=True) -> np.ndarray:
+        """Resample a block and, with `condition`, apply the enabled conditioning steps"""
+        audio = self.resampler.process(block)
+        if len(audio) == 0 or not condition:
+            return audio
+        if self.dc_removal:
+            audio = self._remove_dc(audio)
+        if self.noise_filter is not None:
+            audio = self.noise_filter.process(audio)
+            if len(audio) == 0:
+                return audio
+        if self.agc:
+            audio = self._level(audio)
+        return audio
+
+    def _remove_dc(self, audio: np.ndarray) -> np.ndarray:
+        mean = float(audio.mean())
+        if self.dc is None:
+            self.dc = mean
+        previous = self.dc
+        self.dc += (1.0 - math.exp(-len(audio) / (self.target_rate * self.dc_time))) * (mean - self.dc)
+        return audio - np.linspace(previous, self.dc, len(audio), dtype=np.float32)
+
+    def _level(self, audio: np.ndarray) -> np.ndarray:
+        rms = float(np.sqrt(np.mean(audio * audio)))
+        # Hold the gain through silence so pauses are not pumped up to speech level
+        desired = min(self.agc_target / rms, self.agc_max_gain) if rms > self.agc_gate else self.gain
+        time_constant = self.agc_attack if desired < self.gain else self.agc_release
+        gain = self.gain + (1.0 - math.exp(-len(audio) / (self.target_rate * time_constant))) * (desired - self.gain)
+
+        peak = float(np.max(np.abs(audio)))
+        if peak * gain > self.ceiling:
+            gain = self.ceiling / peak
+        leveled = audio * np.linspace(self.gain, gain, len(audio), dtype=np.float32)
+        self.gain = gain
+        return np.clip(leveled, -self.ceiling, self.ceiling, out=leveled)
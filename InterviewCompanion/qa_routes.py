@@ -0,0 +1,179 @@
+import json
+import logging
+import time
+import uuid
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_socketio import emit
+
+from config import Config
+from metrics import metrics
+from services import get_services, request_sid
+
+qa_bp = Blueprint('qa', __name__)
+
+
+@qa_bp.route('/send_question', methods=['POST'])
+def send_question():
+    """Send question to OpenAI and get answer"""
+    services = get_services()
+    try:
+        data = request.get_json()
+        question = data.get('question', '').strip()
+
+        if not question:
+            return jsonify({
+                'success': False,
+                'message': 'No question provided'
+            }), 400
+
+        # Generate answer using OpenAI, aware of the client's interview so far if it proved its sid
+        sid = request_sid()
+        answer = services.openai_client.generate_answer(question, **services.answer_context(sid))
+        timestamp = time.time()
+
+        # Emit the answer via WebSocket to the requesting client only
+        if sid:
+            services.emit('answer_received', {
+                'question': question,
+                'answer': answer,
+                'timestamp': timestamp
+            }, to=sid)
+        services.remember_answer(sid, question, answer)
+
+        return jsonify({
+            'success': True,
+            'question': question,
+            'answer': answer,
+            'timestamp': timestamp
+        })
+
+    except Exception as e:
+        logging.error(f"Error generating answer: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Failed to generate answer: {str(e)}'
+        }), 500
+
+
+@qa_bp.route('/stream_answer', methods=['POST'])
+def stream_answer():
+    """Stream the answer as Server-Sent Events so the first tokens show up immediately"""
+    services = get_services()
+    data = request.get_json()
+    question = data.get('question', '').strip()
+
+    if not question:
+        return jsonify({
+            'success': False,
+            'message': 'No question provided'
+        }), 400
+
+    def sse(event, payload):
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    def generate():
+        timestamp = time.time()
+        parts = []
+        try:
+            for delta in services.openai_client.stream_answer(question):
+                parts.append(delta)
+                yield sse('delta', {'delta': delta})
+
+            yield sse('done', {
+                'question': question,
+                'answer': ''.join(parts).strip(),
+                'timestamp': timestamp
+            })
+        except Exception as e:
+            logging.error(f"Error streaming answer: {e}")
+            yield sse('error', {'message': f'Failed to generate answer: {str(e)}'})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@qa_bp.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    """Answer cache hit/miss counters"""
+    return jsonify(get_services().openai_client.cache_stats())
+
+
+def register_qa_events(socketio, services):
+    """Socket.IO handlers shared by every socket-enabled mode"""
+
+    @socketio.on('connect')
+    def handle_connect():
+        """Handle client connection"""
+        logging.info('Client connected')
+        emit('status_update', {
+            'status': 'connected',
+            'message': 'Connected to Interview Assistant'
+        })
+        # HTTP calls made on behalf of this socket send the token back with its sid
+        emit('session', {
+            'sid': request.sid,
+            'token': services.session_token(request.sid)
+        })
+
+    @socketio.on('disconnect')
+    def handle_disconnect():
+        """Handle client disconnection"""
+        logging.info('Client disconnected')
+        services.session_manager.remove(request.sid)
+        metrics.forget_session(request.sid, Config.TRACE_DIR)
+        if services.persistence is not None:
+            services.persistence.end_session(request.sid)
+
+    @socketio.on('manual_question')
+    def handle_manual_question(data):
+        """Handle manually triggered question, streaming the answer as it is generated"""
+        question = data.get('question', '').strip()
+        if question:
+            answer_id = uuid.uuid4().hex
+            timestamp = time.time()
+            start = time.perf_counter()
+            try:
+                # Use the answer pre-generated when the question was detected, if there is one
+                session = services.session_manager.get(request.sid)
+                speculation = session.speculator.claim(question) if session and session.speculator else None
+
+                emit('answer_started', {
+                    'id': answer_id,
+                    'question': question,
+                    'timestamp': timestamp,
+                    'speculative': speculation is not None
+                })
+
+                deltas = speculation.stream() if speculation else services.openai_client.stream_answer(
+                    question, **services.answer_context(request.sid)
+                )
+                parts = []
+                for delta in deltas:
+                    if not parts:
+                        # What the user waits for: includes any head start a speculative answer had
+                        metrics.observe('answer_first_token', time.perf_counter() - start, request.sid)
+                    parts.append(delta)
+                    emit('answer_delta', {
+                        'id': answer_id,
+                        'delta': delta
+                    })
+
+                # Final event carries the complete answer so clients can reconcile
+                answer = ''.join(parts).strip()
+                emit('answer_received', {
+                    'id': answer_id,
+                    'question': question,
+                    'answer': answer,
+                    'timestamp': timestamp
+                })
+                metrics.observe('answer_total', time.perf_counter() - start, request.sid)
+                services.remember_answer(request.sid, question, answer, speculative=speculation is not None)
+            except Exception as e:
+                emit('error', {
+                    'id': answer_id,
+                    'message': f'Failed to generate answer: {str(e)}'
+                })
@@ -0,0 +1,233 @@
+import logging
+import re
+from typing import List, Optional
+
+import numpy as np
+
+from answer_cache import ngram_vector, normalize_text
+from config import Config
+
+# Sentence boundaries in punctuated transcript text
+SENTENCE_SPLIT = re.compile(r"(?<=[.?!])\s+")
+WORD = re.compile(r"[a-z]+(?:'[a-z]+)?")
+TAG_QUESTION = re.compile(r",\s*(right|correct|isn't it|aren't you|don't you|didn't you|wouldn't you|no)\W*$", re.I)
+
+# Spoken lead-ins skipped before matching ("So, tell me...", "Okay and what...")
+FILLERS = frozenset("so okay ok and um uh well alright now right also then next".split())
+
+WH_WORDS = frozenset("what why how when where who whom whose which".split())
+AUXILIARIES = frozenset("""
+    is are was were am do does did can could would will should shall have has had may might must
+    isn't aren't wasn't weren't don't doesn't didn't can't couldn't wouldn't won't shouldn't haven't hasn't
+""".split())
+# After an auxiliary, these make "Do you...", "Is there..." a question; weaker ones ("Do it", "Have a") only might
+SUBJECTS = frozenset("you i we they he she there your you've you'd you're anyone someone anything".split())
+WEAK_SUBJECTS = frozenset("it this that these those any the a an our my his her their its".split())
+# "how many", "what kind", "how about" ... read as questions even without an auxiliary
+WH_FOLLOWERS = AUXILIARIES | frozenset("about many much long often far come kind sort type would".split())
+
+# Imperative and embedded prompts an interviewer uses instead of a direct question. Verbs that also
+# open ordinary remarks ("Tell me about it", "Elaborate plans...", "Name a price", "Share the link",
+# "Imagine that") only count with the words that make them a prompt.
+QUESTION_OPENERS = ("how", "what", "why", "when", "where", "which", "who", "whether")
+PROMPT_OBJECTS = ("a time", "a situation", "a project", "an example", "your", "yourself") + QUESTION_OPENERS
+
+
+def framed(verbs, objects) -> tuple:
+    """Every "<verb> <object>" pair, e.g. framed(("describe",), ("your",)) -> ("describe your",)"""
+    return tuple(f"{verb} {obj}" for verb in verbs for obj in objects)
+
+
+PROMPT_PHRASES = (
+    framed(("tell me", "tell us"), ("about a", "about an", "about your", "about yourself", "about how", "about what",
+                                    "about why", "about when", "about one", "about some", "more", "a", "an", "one",
+                                    "your", "if") + QUESTION_OPENERS)
+    + framed(("describe", "explain"), ("a", "an", "the", "your", "yourself", "one", "to me", "to us")
+             + QUESTION_OPENERS)
+    + framed(("talk about",), PROMPT_OBJECTS)
+    + framed(("i was wondering", "i wonder"), ("if you", "whether you", "how you", "what you", "why you",
+                                               "about your"))
+    + framed(("name a",), ("time", "situation", "project", "few", "couple"))
+    + (
+        "walk me through", "walk us through", "talk me through", "elaborate on", "give me an example",
+        "give me a", "give us an example",
+        "share an example", "share a time", "share a situation", "share an experience", "share a project",
+        "share your experience", "share your approach", "share with me", "share with us",
+        "i'd like to know", "i'd like to hear", "i would like to know", "i would like to hear",
+        "i want to know", "i want to hear", "i'm curious", "i am curious",
+        "let's talk about", "let's discuss", "help me understand", "take me through",
+        "name one", "think of a time",
+        "imagine you", "imagine you're", "imagine that you", "imagine a", "imagine the", "imagine your", "imagine we",
+    )
+)
+
+
+def build_trie(phrases) -> dict:
+    """Word trie; a node holding the key None marks the end of a phrase"""
+    root = {}
+    for phrase in phrases:
+        node = root
+        for word in phrase.split():
+            node = node.setdefault(word, {})
+        node[None] = True
+    return root
+
+
+PROMPT_TRIE = build_trie(PROMPT_PHRASES)
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_SPLIT.split(text.strip()) if sentence.strip()]
+
+
+def starts_with_phrase(words: List[str], trie: dict) -> bool:
+    node = trie
+    for word in words:
+        node = node.get(word)
+        if node is None:
+            return False
+        if None in node:
+            return True
+    return False
+
+
+def rule_score(sentence: str) -> Optional[bool]:
+    """Cheap pattern checks on one sentence.
+
+    True for unambiguous questions and prompts, False for clear statements,
+    None when only the opening words hint at a question in unpunctuated
+    text (left to the classifier if one is loaded, else read as a
+    statement). Whisper punctuates questions with "?", so a hint followed
+    by "." is read as a statement.
+    """
+    if sentence.endswith("?") or TAG_QUESTION.search(sentence):
+        return True
+
+    words = WORD.findall(sentence.lower())
+    start = 0
+    while start < len(words) - 1 and words[start] in FILLERS:
+        start += 1
+    words = words[start:start + 6]
+    if not words:
+        return False
+
+    first = words[0]
+    second = words[1] if len(words) > 1 else None
+    if starts_with_phrase(words, PROMPT_TRIE):
+        return True
+    if first in AUXILIARIES and second in SUBJECTS:
+        return True
+
+    # "What a day.", "Which is why...", "Do it now." and a bare "Is" are statements or fragments
+    hint = first in WH_WORDS or (first in AUXILIARIES and second in WEAK_SUBJECTS)
+    if not hint or sentence[-1] in ".!":
+        return False
+    if first in WH_WORDS and second in WH_FOLLOWERS:
+        return True
+    return None
+
+
+class QuestionClassifier:
+    """Logistic regression over hashed n-gram features, scored a batch at a time.
+
+    Small enough to train in a second with numpy on a few hundred labeled
+    sentences (see benchmarks/eval_question_detector.py) and to score a
+    batch with one matrix product.
+    """
+
+    def __init__(self, weights: np.ndarray, bias: float, dim=512):
+        self.weights = weights
+        self.bias = bias
+        self.dim = dim
+
+    @staticmethod
+    def features(sentences: List[str], dim=512) -> np.ndarray:
+        matrix = np.zeros((len(sentences), dim + 1), dtype=np.float32)
+        for i, sentence in enumerate(sentences):
+            matrix[i, :dim] = ngram_vector(normalize_text(sentence), dim)
+            matrix[i, dim] = sentence.rstrip().endswith("?")
+        return matrix
+
+    def score(self, sentences: List[str]) -> np.ndarray:
+        """Question probability per sentence"""
+        if not sentences:
+            return np.zeros(0, dtype=np.float32)
+        logits = self.features(sentences, self.dim) @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    @classmethod
+    def fit(cls, sentences: List[str], labels, dim=512, epochs=300, learning_rate=1.0, l2=1e-3):
+        """Full-batch gradient descent on the log loss"""
+        features = cls.features(sentences, dim)
+        labels = np.asarray(labels, dtype=np.float32)
+        weights = np.zeros(features.shape[1], dtype=np.float32)
+        bias = 0.0
+        for _ in range(epochs):
+            predictions = 1.0 / (1.0 + np.exp(-(features @ weights + bias)))
+            error = predictions - labels
+            weights -= learning_rate * (features.T @ error / len(labels) + l2 * weights)
+            bias -= learning_rate * float(error.mean())
+        return cls(weights, bias, dim)
+
+    def save(self, path: str):
+        np.savez(path, weights=self.weights, bias=self.bias, dim=self.dim)
+
+    @classmethod
+    def load(cls, path: str):
+        data = np.load(path)
+        return cls(data['weights'], float(data['bias']), int(data['dim']))
+
+
+class QuestionDetector:
+    """Finds the questions in a piece of transcript, sentence by sentence"""
+
+    def __init__(self, classifier: Optional[QuestionClassifier] = None, threshold=0.5):
+        self.classifier = classifier
+        self.threshold = threshold
+
+    def detect_batch(self, texts: List[str]) -> List[List[str]]:
+        """Question sentences in each text; ambiguous sentences across the batch share one classifier call"""
+        sentences = [split_sentences(text) for text in texts]
+        verdicts = [[rule_score(sentence) for sentence in group] for group in sentences]
+
+        ambiguous = [(i, j) for i, group in enumerate(verdicts) for j, verdict in enumerate(group) if verdict is None]
+        if ambiguous:
+            if self.classifier is not None:
+                scores = self.classifier.score([sentences[i][j] for i, j in ambiguous])
+                for (i, j), score in zip(ambiguous, scores):
+                    verdicts[i][j] = bool(score >= self.threshold)
+            else:
+                for i, j in ambiguous:
+                    verdicts[i][j] = False  # a false alarm costs an unwanted answer; wait for clearer text
+
+        return [
+            [sentence for sentence, verdict in zip(group, group_verdicts) if verdict]
+            for group, group_verdicts in zip(sentences, verdicts)
+        ]
+
+    def detect(self, text: str) -> List[str]:
+        return self.detect_batch([text])[0]
+
+    def is_question(self, text: str) -> bool:
+        return bool(self.detect(text))
+
+
+_detector = None
+
+
+def get_detector() -> QuestionDetector:
+    """Process-wide detector, with the classifier from Config.QUESTION_CLASSIFIER_PATH if one is set"""
+    global _detector
+    if _detector is None:
+        classifier = None
+        if Config.QUESTION_CLASSIFIER_PATH:
+            try:
+                classifier = QuestionClassifier.load(Config.QUESTION_CLASSIFIER_PATH)
+            except Exception as e:
+                logging.error(f"Failed to load question classifier: {e}")
+        _detector = QuestionDetector(classifier, Config.QUESTION_CLASSIFIER_THRESHOLD)
+    return _detector
+
+
+def is_question(text: str) -> bool:
+    return get_detector().is_question(text)
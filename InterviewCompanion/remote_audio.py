@@ -0,0 +1,58 @@
+import time
+import numpy as np
+
+# Encodings the browser client may use for audio frames sent over Socket.IO.
+# 8-bit mu-law halves the bandwidth of 16-bit PCM (128 vs 256 kbit/s at 16 kHz)
+# with no audible difference for speech recognition, and decodes with a table lookup.
+SUPPORTED_ENCODINGS = ('mulaw', 'pcm16')
+
+
+def _mulaw_table() -> np.ndarray:
+    """G.711 mu-law byte -> float32 sample lookup table"""
+    codes = ~np.arange(256, dtype=np.uint8)
+    sign = (codes & 0x80) != 0
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa.astype(np.int32) << 3) + 0x84) << exponent) - 0x84
+    samples = np.where(sign, -magnitude, magnitude)
+    return (samples / 32768.0).astype(np.float32)
+
+
+MULAW_DECODE = _mulaw_table()
+
+
+def decode_frame(payload: bytes, encoding: str = 'mulaw') -> np.ndarray:
+    """Decode one client audio frame into mono float32 samples"""
+    if encoding == 'mulaw':
+        return MULAW_DECODE[np.frombuffer(payload, dtype=np.uint8)]
+    if encoding == 'pcm16':
+        return np.frombuffer(payload, dtype='<i2').astype(np.float32) / 32768.0
+    raise ValueError(f"Unsupported audio encoding: {encoding}")
+
+
+class BandwidthMeter:
+    """Counts bytes received for a session and reports the average bitrate"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.started = time.monotonic()
+
+    def record(self, num_bytes: int):
+        self.bytes_received += num_bytes
+        self.frames_received += 1
+
+    def kbps(self) -> float:
+        """Average receive rate in kbit/s since the meter was reset"""
+        elapsed = max(time.monotonic() - self.started, 1e-3)
+        return self.bytes_received * 8 / 1000 / elapsed
+
+    def stats(self) -> dict:
+        return {
+            'bytes_received': self.bytes_received,
+            'frames_received': self.frames_received,
+            'kbps': round(self.kbps(), 1)
+        }
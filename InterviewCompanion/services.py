@@ -0,0 +1,187 @@
+import hashlib
+import hmac
+import importlib.util
+import logging
+import os
+import threading
+from typing import Optional
+
+from flask import current_app, request
+
+from config import Config
+from conversation_context import ConversationContext
+from metrics import metrics
+from session_manager import SessionManager
+
+
+def audio_transcription_available() -> bool:
+    """True if the configured transcription backend is installed, checked without importing it"""
+    if Config.WHISPER_SERVER_ADDRESS:
+        return True  # the model lives in the Whisper server process
+    package = "faster_whisper" if Config.TRANSCRIPTION_BACKEND == "faster-whisper" else "whisper"
+    return importlib.util.find_spec(package) is not None
+
+
+class AppServices:
+    """Collaborators shared by the routes and Socket.IO handlers of one app.
+
+    Expensive pieces (the OpenAI client, the Whisper model) are created on
+    first use so a worker that only serves text Q&A never pays for them.
+    """
+
+    def __init__(self, mode: str, socketio=None, audio_enabled=False):
+        self.mode = mode
+        self.socketio = socketio
+        self.audio_enabled = audio_enabled
+
+        self._openai_client = None
+        self._final_pass = None
+        self._batch_runner = None
+        self.persistence = None  # PersistenceWriter, set by the app factory when history is enabled
+        self._lock = threading.Lock()
+        # Signs session tokens; per process, like the sessions themselves
+        self._token_key = os.urandom(32)
+
+        # Per-client transcription state, keyed by Socket.IO sid
+        self.session_manager = SessionManager(
+            audio_processor_factory=self.create_audio_processor if audio_enabled else None,
+            max_transcription_length=Config.MAX_TRANSCRIPTION_LENGTH,
+            conversation_factory=lambda: ConversationContext(
+                max_tokens=Config.CONTEXT_MAX_TOKENS,
+                transcript_tokens=Config.CONTEXT_TRANSCRIPT_TOKENS,
+                verbatim_turns=Config.CONTEXT_VERBATIM_TURNS,
+                summary_tokens=Config.CONTEXT_SUMMARY_TOKENS
+            )
+        )
+
+    @property
+    def openai_client(self):
+        if self._openai_client is None:
+            with self._lock:
+                if self._openai_client is None:
+                    from openai_client import OpenAIClient
+                    self._openai_client = OpenAIClient()
+        return self._openai_client
+
+    @property
+    def final_pass(self):
+        """Background re-transcription of finished utterances, or None if disabled"""
+        if not (self.audio_enabled and Config.FINAL_PASS_ENABLED and Config.VAD_ENABLED):
+            return None
+        if self._final_pass is None:
+            with self._lock:
+                if self._final_pass is None:
+                    from final_pass import FinalPassWorker
+                    from whisper_server import get_transcriber
+                    transcriber = get_transcriber(Config.FINAL_PASS_MODEL)
+                    self._final_pass = FinalPassWorker(
+                        lambda audio, prompt: transcriber.transcribe(audio, prompt=prompt, mode='final'),
+                        workers=Config.FINAL_PASS_WORKERS,
+                        max_pending=Config.FINAL_PASS_MAX_PENDING,
+                        max_defer=Config.FINAL_PASS_MAX_DEFER
+                    )
+        return self._final_pass
+
+    @property
+    def batch_runner(self):
+        """Background queue for uploaded recordings"""
+        if self._batch_runner is None:
+            with self._lock:
+                if self._batch_runner is None:
+                    from batch_transcription import BatchRunner
+                    self._batch_runner = BatchRunner(self.create_batch_job, max_running=Config.BATCH_MAX_RUNNING,
+                                                     keep_jobs=Config.BATCH_KEEP_JOBS)
+        return self._batch_runner
+
+    def create_batch_job(self, path: str, answers=True):
+        """A job for one uploaded recording, sharing this process's model and OpenAI client"""
+        from batch_transcription import create_job
+        from whisper_server import get_transcriber
+        return create_job(path, get_transcriber(Config.WHISPER_MODEL), self.openai_client if answers else None)
+
+    def create_audio_processor(self):
+        """Build the audio pipeline for one session; the Whisper model itself is shared"""
+        from audio_processor import AudioProcessor
+        return AudioProcessor(
+            sample_rate=Config.SAMPLE_RATE,
+            chunk_duration=Config.CHUNK_DURATION,
+            in_memory=Config.WHISPER_IN_MEMORY,
+            block_duration=Config.STREAM_STEP if Config.STREAMING_ENABLED or Config.VAD_ENABLED else None,
+            use_vad=Config.VAD_ENABLED,
+            model_name=Config.WHISPER_MODEL,
+            max_backlog=Config.AUDIO_MAX_BACKLOG,
+            buffer_history=Config.AUDIO_BUFFER_HISTORY,
+            dc_removal=Config.PREPROCESS_DC_REMOVAL,
+            agc=Config.PREPROCESS_AGC,
+            noise_reduction=Config.PREPROCESS_NOISE_REDUCTION,
+            condition_remote=Config.PREPROCESS_BROWSER_AUDIO,
+            prompt_context_chars=Config.PROMPT_CONTEXT_CHARS
+        )
+
+    def session_token(self, sid: str) -> str:
+        """Proof of owning a Socket.IO sid, only ever sent to that sid's own socket"""
+        return hmac.new(self._token_key, sid.encode(), hashlib.sha256).hexdigest()
+
+    def answer_context(self, sid: Optional[str]) -> dict:
+        """Keyword arguments that make an answer aware of this client's interview so far (and label its metrics)"""
+        if not sid:
+            return {}
+        session = self.session_manager.get(sid)
+        return {
+            'conversation': self.session_manager.conversation(sid),
+            'transcript': session.transcript.text() if session else '',
+            'session': sid
+        }
+
+    def remember_answer(self, sid: Optional[str], question: str, answer: str, speculative=False):
+        """Add a delivered answer to the client's conversation, summarizing older turns in the background"""
+        if not sid or not answer:
+            return
+        if self.persistence is not None:
+            self.persistence.record_answer(sid, question, answer, speculative)
+        thread = threading.Thread(
+            target=self.session_manager.conversation(sid).add_turn,
+            args=(question, answer, self.openai_client.summarize_conversation),
+            name="conversation-summary"
+        )
+        thread.daemon = True
+        thread.start()
+
+    def emit(self, event: str, data: dict, to=None):
+        """Emit over Socket.IO if this app has sockets; a no-op otherwise"""
+        if self.socketio is not None:
+            with metrics.span('socket_emit', to):
+                self.socketio.emit(event, data, to=to)
+
+
+def persistence_available() -> bool:
+    """True if history persistence is enabled and flask-sqlalchemy is installed"""
+    return Config.PERSISTENCE_ENABLED and importlib.util.find_spec("flask_sqlalchemy") is not None
+
+
+def get_services() -> AppServices:
+    """Services for the current Flask app"""
+    return current_app.extensions['interview_assistant']
+
+
+def request_sid() -> Optional[str]:
+    """Socket.IO sid an HTTP request acts for, or None.
+
+    HTTP requests have no request.sid of their own, so the client names its
+    sid together with the token the server sent over that socket on
+    connect; a sid without its token (another client's, say) is ignored.
+    """
+    data = request.get_json(silent=True) or {}
+    sid = data.get('sid') or request.args.get('sid')
+    token = data.get('token') or request.args.get('token')
+    if not sid or not token:
+        return None
+    return sid if hmac.compare_digest(str(token), get_services().session_token(str(sid))) else None
+
+
+def preload(services: AppServices):
+    """Eagerly create the heavy services, e.g. to keep first-request latency down"""
+    logging.info("Preloading OpenAI client and Whisper model")
+    services.openai_client
+    if services.audio_enabled:
+        services.create_audio_processor()
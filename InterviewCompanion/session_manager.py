@@ -0,0 +1,187 @@
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+from conversation_context import ConversationContext
+from remote_audio import BandwidthMeter
+
+
+class TranscriptStore:
+    """Bounded transcript kept as a deque of committed segments.
+
+    Appending is O(1) and, once the total length exceeds `max_length`
+    characters, the oldest segments are dropped so memory stays flat over
+    long sessions. Segments have increasing ids so a later, more accurate
+    transcription can replace a run of them, and every change bumps
+    `version` so clients can ignore updates that arrive out of order.
+    """
+
+    def __init__(self, max_length=5000):
+        self.max_length = max_length
+        self.segments = deque()  # [segment id, text]
+        self.length = 0
+        self.next_id = 0
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def append(self, text: str) -> Optional[int]:
+        """Add a segment and return its id (None if the text was blank)"""
+        text = text.strip()
+        if not text:
+            return None
+
+        with self.lock:
+            segment_id = self.next_id
+            self.next_id += 1
+            self.segments.append([segment_id, text])
+            self.length += len(text) + 1
+            self.version += 1
+
+            while self.length > self.max_length and len(self.segments) > 1:
+                self.length -= len(self.segments.popleft()[1]) + 1
+            return segment_id
+
+    def revise(self, first_id: int, last_id: int, text: str) -> bool:
+        """Replace segments first_id..last_id with `text`.
+
+        Returns False, changing nothing, if any of them has already been
+        dropped or the text is the same.
+        """
+        text = text.strip()
+        with self.lock:
+            indexes = [i for i, (segment_id, _) in enumerate(self.segments) if first_id <= segment_id <= last_id]
+            if not text or len(indexes) != last_id - first_id + 1:
+                return False
+
+            old = [self.segments[i][1] for i in indexes]
+            if " ".join(old) == text:
+                return False
+
+            self.segments[indexes[0]][1] = text
+            for i in reversed(indexes[1:]):
+                del self.segments[i]
+            self.length += len(text) + 1 - sum(len(segment) + 1 for segment in old)
+            self.version += 1
+            return True
+
+    def text(self) -> str:
+        """The retained transcript as a single string"""
+        with self.lock:
+            full = " ".join(text for _, text in self.segments)
+        return full[-self.max_length:]
+
+    def snapshot(self):
+        """(text, version), read together"""
+        with self.lock:
+            full = " ".join(text for _, text in self.segments)
+            return full[-self.max_length:], self.version
+
+    def clear(self):
+        with self.lock:
+            self.segments.clear()
+            self.length = 0
+            self.version += 1
+
+    def __len__(self):
+        return self.length
+
+
+class TranscriptionSession:
+    """State for one connected client: its audio pipeline, worker thread and transcript"""
+
+    def __init__(self, sid: str, audio_processor=None, max_transcription_length=5000):
+        self.sid = sid
+        self.room = sid  # every Socket.IO client is automatically in a room named after its sid
+        self.audio_processor = audio_processor
+        self.transcript = TranscriptStore(max_transcription_length)
+
+        # 'browser' sessions receive audio frames over Socket.IO; 'server' sessions use the local mic
+        self.audio_source = 'server'
+        self.bandwidth = BandwidthMeter()
+
+        # The running capture/transcribe pipeline, kept for its queue and latency counters
+        self.pipeline = None
+
+        # Pre-generates answers to detected questions (see speculative.py); created with the first pipeline
+        self.speculator = None
+
+        self.active = False
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self, target: Callable) -> bool:
+        """Start the worker thread; returns False if it is already running"""
+        with self.lock:
+            if self.active:
+                return False
+            self.active = True
+            self.thread = threading.Thread(target=target, args=(self,))
+            self.thread.daemon = True
+            self.thread.start()
+            return True
+
+    def stop(self):
+        """Signal the worker to finish and release the audio device"""
+        with self.lock:
+            self.active = False
+            thread = self.thread
+
+        if self.audio_processor:
+            self.audio_processor.stop_recording()
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+
+
+class SessionManager:
+    """Registry of transcription sessions keyed by Socket.IO sid"""
+
+    def __init__(self, audio_processor_factory: Optional[Callable] = None, max_transcription_length=5000,
+                 conversation_factory: Callable = ConversationContext):
+        self.audio_processor_factory = audio_processor_factory
+        self.max_transcription_length = max_transcription_length
+        self.conversation_factory = conversation_factory
+        self.sessions: Dict[str, TranscriptionSession] = {}
+        # Q&A history per sid, kept separately so text-only clients never build an audio pipeline
+        self.conversations: Dict[str, ConversationContext] = {}
+        self.lock = threading.Lock()
+
+    def get(self, sid: str) -> Optional[TranscriptionSession]:
+        with self.lock:
+            return self.sessions.get(sid)
+
+    def get_or_create(self, sid: str) -> TranscriptionSession:
+        session = self.get(sid)
+        if session is not None:
+            return session
+
+        # Building the audio pipeline can load the model, so it happens outside the registry lock
+        audio_processor = self.audio_processor_factory() if self.audio_processor_factory else None
+        created = TranscriptionSession(sid, audio_processor, self.max_transcription_length)
+        with self.lock:
+            session = self.sessions.setdefault(sid, created)
+        if session is created:
+            logging.info(f"Created transcription session {sid}")
+        return session
+
+    def conversation(self, sid: str) -> ConversationContext:
+        with self.lock:
+            conversation = self.conversations.get(sid)
+            if conversation is None:
+                conversation = self.conversation_factory()
+                self.conversations[sid] = conversation
+            return conversation
+
+    def remove(self, sid: str):
+        """Stop and forget a session, e.g. when its client disconnects"""
+        with self.lock:
+            session = self.sessions.pop(sid, None)
+            self.conversations.pop(sid, None)
+        if session:
+            session.stop()
+            if session.speculator:
+                session.speculator.cancel()
+            logging.info(f"Removed transcription session {sid}")
+
+    def __len__(self):
+        with self.lock:
+            return len(self.sessions)
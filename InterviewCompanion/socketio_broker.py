@@ -0,0 +1,193 @@
+"""Message queue for running the Socket.IO app in several processes.
+
+Every process publishes its emits to a shared queue and delivers the ones
+addressed to clients connected to it, so transcription updates and answers
+reach a client whichever worker produced them. Set SOCKETIO_MESSAGE_QUEUE:
+
+    redis://host:6379/0     Redis (needs the redis package)
+    amqp://host:5672//      RabbitMQ or anything else kombu supports
+    local://127.0.0.1:5056  the broker in this module, for one host or tests
+
+Deployment notes:
+
+* Each process keeps its clients' sessions (audio pipeline, transcript,
+  conversation) in memory, so a client must reach the same process for
+  its socket and its HTTP calls. Run N single-worker instances
+  (`gunicorn -w 1 --threads 100 -b 127.0.0.1:500N main:app`) behind a
+  proxy that routes by client, e.g. nginx `upstream { ip_hash; ... }`.
+  gunicorn's own `-w N` cannot route by client.
+* Across nodes, point every instance at the same queue and run the
+  broker (or Redis) somewhere they can all reach.
+* Keep Whisper out of the web tier. Run `python whisper_server.py
+  --address 0.0.0.0:5055` on CPU-only nodes with
+  TRANSCRIPTION_BACKEND=faster-whisper (int8) and set
+  WHISPER_SERVER_ADDRESS on the web instances. Use a random
+  WHISPER_SERVER_AUTHKEY shared by server and clients, and keep the port
+  on a private network: any peer with the key can run code on the server.
+
+Run the local broker with `python socketio_broker.py` (address from
+SOCKETIO_MESSAGE_QUEUE, default 127.0.0.1:5056). It and every instance
+need the same random SOCKETIO_BROKER_AUTHKEY: anyone with the key can
+emit to any client.
+"""
+import json
+import logging
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from typing import Optional
+
+import socketio
+
+from config import Config
+
+
+def parse_local_url(url: str):
+    """'local://host:port' -> (host, port)"""
+    host, _, port = url[len('local://'):].rstrip('/').rpartition(':')
+    return (host or '127.0.0.1', int(port))
+
+
+# First message on every broker connection: what the connection is for
+HELLO_LISTEN = b'listen'
+HELLO_PUBLISH = b'publish'
+
+
+class LocalBroker:
+    """Fan-out relay: every message a publisher sends is forwarded to all listeners.
+
+    Connections say which they are in their first message. Only listeners
+    are sent messages, so a publish-only connection that nobody reads can
+    never fill its pipe and stall the relay.
+    """
+
+    def __init__(self, address, authkey: bytes):
+        if not authkey:
+            raise ValueError("Refusing to start without SOCKETIO_BROKER_AUTHKEY; generate one with "
+                             "python -c 'import secrets; print(secrets.token_hex(32))'")
+        self.listener = Listener(address, authkey=authkey)
+        self.connections = []  # listeners only, with their send locks
+        self.lock = threading.Lock()
+        self.relayed = 0
+
+    def serve_forever(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+            except Exception as e:
+                logging.error(f"Error accepting broker connection: {e}")
+                continue
+            thread = threading.Thread(target=self._serve, args=(connection,), name="broker-relay")
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, connection):
+        try:
+            hello = connection.recv_bytes()
+            if hello == HELLO_LISTEN:
+                with self.lock:
+                    self.connections.append((connection, threading.Lock()))
+                # Listeners send nothing more; this returns when the connection closes
+                while True:
+                    connection.recv_bytes()
+            elif hello == HELLO_PUBLISH:
+                self._relay(connection)
+            else:
+                logging.warning(f"Closing broker connection with unknown role {hello[:32]!r}")
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._drop(connection)
+
+    def _relay(self, connection):
+        while True:
+            message = connection.recv_bytes()
+            with self.lock:
+                targets = list(self.connections)
+            for target, send_lock in targets:
+                try:
+                    with send_lock:
+                        target.send_bytes(message)
+                except Exception:
+                    self._drop(target)
+            self.relayed += 1
+
+    def _drop(self, connection):
+        with self.lock:
+            self.connections = [entry for entry in self.connections if entry[0] is not connection]
+        try:
+            connection.close()
+        except OSError:
+            pass
+
+
+class LocalBrokerManager(socketio.PubSubManager):
+    """Socket.IO client manager that shares emits through a LocalBroker"""
+
+    name = 'local'
+
+    def __init__(self, url='local://127.0.0.1:5056', channel='flask-socketio', write_only=False, logger=None,
+                 authkey: bytes = b''):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.address = parse_local_url(url)
+        self.authkey = authkey or Config.SOCKETIO_BROKER_AUTHKEY
+        if not self.authkey:
+            raise ValueError("SOCKETIO_BROKER_AUTHKEY must be set to the Socket.IO broker's key")
+        self.connection = None
+        self.send_lock = threading.Lock()
+
+    def _connect(self):
+        self.connection = Client(self.address, authkey=self.authkey)
+        self.connection.send_bytes(HELLO_PUBLISH)
+        return self.connection
+
+    def _publish(self, data):
+        message = json.dumps({'channel': self.channel, 'data': data}).encode()
+        for retries_left in range(1, -1, -1):  # 2 attempts
+            try:
+                with self.send_lock:
+                    connection = self.connection or self._connect()
+                    connection.send_bytes(message)
+                return
+            except Exception as e:
+                self.connection = None
+                if not retries_left:
+                    self._get_logger().error(f"Cannot publish to Socket.IO broker, giving up: {e}")
+
+    def _listen(self):
+        retry_sleep = 1
+        while True:
+            try:
+                # A connection of its own, so a publish never waits behind a blocking receive
+                connection = Client(self.address, authkey=self.authkey)
+                connection.send_bytes(HELLO_LISTEN)
+                retry_sleep = 1
+                while True:
+                    message = json.loads(connection.recv_bytes())
+                    if message.get('channel') == self.channel:
+                        yield message['data']
+            except Exception as e:
+                self._get_logger().error(f"Cannot receive from Socket.IO broker, retrying in {retry_sleep} s: {e}")
+                time.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 60)
+
+
+def message_queue_options(url: Optional[str], channel='flask-socketio') -> dict:
+    """SocketIO() keyword arguments for a message queue URL; empty for a single process"""
+    if not url:
+        return {}
+    if url.startswith('local://'):
+        return {'client_manager': LocalBrokerManager(url, channel=channel)}
+    return {'message_queue': url, 'channel': channel}
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    url = Config.SOCKETIO_MESSAGE_QUEUE if (Config.SOCKETIO_MESSAGE_QUEUE or '').startswith('local://') \
+        else 'local://127.0.0.1:5056'
+    try:
+        broker = LocalBroker(parse_local_url(url), Config.SOCKETIO_BROKER_AUTHKEY)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    logging.info(f"Socket.IO broker listening on {url}")
+    broker.serve_forever()
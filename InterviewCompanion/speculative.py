@@ -0,0 +1,208 @@
+import logging
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+from answer_cache import normalize_text
+from conversation_context import count_tokens
+
+# off: never; committed: on finished question segments; partial: also on in-progress hypotheses
+SPECULATIVE_POLICIES = ('off', 'committed', 'partial')
+
+
+class Speculation:
+    """One pre-generated answer, filled in by a background thread as tokens arrive"""
+
+    def __init__(self, question: str, partial=False):
+        self.question = question
+        self.key = normalize_text(question)
+        self.partial = partial  # started from a hypothesis that may still change
+        self.started = time.time()
+
+        self.parts = []
+        self.done = False
+        self.error = None
+        self.cancelled = False
+        self.claimed = False
+        self.tokens = None  # estimated spend, known once generation has ended
+        self.reserved = 0  # budget held for this speculation until its real spend is known
+        self.condition = threading.Condition()
+
+    def append(self, delta: str):
+        with self.condition:
+            self.parts.append(delta)
+            self.condition.notify_all()
+
+    def finish(self, error: Optional[Exception] = None):
+        with self.condition:
+            self.done = True
+            self.error = error
+            self.condition.notify_all()
+
+    def matches(self, key: str) -> bool:
+        """Same normalized question; a changed word or an added "not" can change what is asked"""
+        return bool(key) and key == self.key
+
+    def stream(self) -> Iterator[str]:
+        """Everything generated so far, then further deltas as they arrive"""
+        index = 0
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: index < len(self.parts) or self.done)
+                new_parts = self.parts[index:]
+                done, error = self.done, self.error
+            index += len(new_parts)
+            yield from new_parts
+
+            if done and index >= len(self.parts):
+                if error is not None:
+                    raise error
+                return
+
+    def text(self) -> str:
+        with self.condition:
+            return ''.join(self.parts)
+
+
+class AnswerSpeculator:
+    """Starts answering a session's detected questions before the user asks.
+
+    Only the latest question is speculated on: a new one, or a changed
+    hypothesis under the 'partial' policy, cancels the previous request
+    unless the user has already claimed it. Estimated token spend per
+    session is capped at `token_budget`, and used/wasted counters show
+    whether speculation pays for itself.
+    """
+
+    def __init__(self, client_factory: Callable, policy='committed', token_budget=20000, max_tokens=500,
+                 context_factory: Optional[Callable[[], dict]] = None):
+        self.client_factory = client_factory
+        self.context_factory = context_factory  # extra stream_answer() arguments, e.g. the conversation
+        self.policy = policy
+        self.token_budget = token_budget
+        self.max_tokens = max_tokens
+
+        self.current: Optional[Speculation] = None
+        self.lock = threading.Lock()
+
+        self.started = 0
+        self.used = 0
+        self.wasted = 0
+        self.cancelled = 0
+        self.over_budget = 0
+        self.tokens_spent = 0
+        self.tokens_wasted = 0
+
+    def on_question(self, question: str, partial=False):
+        """A question was detected in committed text, or in a partial hypothesis if `partial`"""
+        if self.policy == 'off' or (partial and self.policy != 'partial'):
+            return
+
+        key = normalize_text(question)
+        if not key:
+            return
+
+        with self.lock:
+            current = self.current
+            if current is not None and current.matches(key) and not current.error:
+                current.partial = current.partial and partial  # confirmed by committed text
+                return  # already answering this one
+
+            self._discard(current)
+            # Reserve a full answer's worth of tokens up front so the cap holds even mid-stream
+            reserve = count_tokens(question) + self.max_tokens
+            if self.tokens_spent + reserve > self.token_budget:
+                self.over_budget += 1
+                self.current = None
+                return
+
+            speculation = Speculation(question, partial)
+            speculation.reserved = reserve
+            self.tokens_spent += reserve  # settled to the real spend when generation ends
+            self.current = speculation
+            self.started += 1
+
+        thread = threading.Thread(target=self._generate, args=(speculation,), name="speculative-answer")
+        thread.daemon = True
+        thread.start()
+
+    def on_utterance_end(self, text: str):
+        """Drop a speculation started from a hypothesis the final utterance did not confirm"""
+        key = normalize_text(text)
+        with self.lock:
+            current = self.current
+            if current is not None and current.partial and not current.matches(key):
+                self._discard(current)
+                self.current = None
+
+    def claim(self, question: str) -> Optional[Speculation]:
+        """The speculation for `question` if there is a usable one; it then counts as used"""
+        key = normalize_text(question)
+        with self.lock:
+            current = self.current
+            if current is None or current.claimed or current.error or not current.matches(key):
+                return None
+            current.claimed = True
+            self.used += 1
+            return current
+
+    def cancel(self):
+        """Stop any unclaimed speculation, e.g. when the session goes away"""
+        with self.lock:
+            self._discard(self.current)
+            self.current = None
+
+    def stats(self) -> dict:
+        return {
+            'policy': self.policy,
+            'started': self.started,
+            'used': self.used,
+            'wasted': self.wasted,
+            'cancelled': self.cancelled,
+            'over_budget': self.over_budget,
+            'tokens_spent': self.tokens_spent,
+            'tokens_wasted': self.tokens_wasted,
+            'token_budget': self.token_budget
+        }
+
+    def _discard(self, speculation: Optional[Speculation]):
+        """Must hold self.lock"""
+        if speculation is None or speculation.claimed:
+            return
+        self.wasted += 1
+        if speculation.tokens is not None:
+            self.tokens_wasted += speculation.tokens
+        else:
+            # Still generating: stop it, and count its tokens as wasted when it ends
+            speculation.cancelled = True
+            self.cancelled += 1
+
+    def _generate(self, speculation: Speculation):
+        error = None
+        prompt_tokens = count_tokens(speculation.question)
+        try:
+            client = self.client_factory()
+            context = self.context_factory() if self.context_factory else {}
+            prompt_tokens += count_tokens(client.system_prompt)
+            stream = client.stream_answer(speculation.question, **context)
+            try:
+                for delta in stream:
+                    if speculation.cancelled:
+                        break  # closing the stream aborts the HTTP request
+                    speculation.append(delta)
+            finally:
+                stream.close()
+        except Exception as e:
+            logging.error(f"Error generating speculative answer: {e}")
+            error = e
+        finally:
+            tokens = prompt_tokens + count_tokens(speculation.text())
+            with self.lock:
+                speculation.tokens = tokens
+                self.tokens_spent += tokens - speculation.reserved
+                speculation.reserved = 0
+                if speculation.cancelled:
+                    self.tokens_wasted += tokens
+            speculation.finish(error)
+
+        logging.debug(f"Speculative answer for '{speculation.question[:50]}' finished ({tokens} tokens)")
@@ -1,10 +1,20 @@
 class InterviewAssistant {
     constructor() {
         this.socket = null;
+        this.sessionToken = null;
         this.isConnected = false;
         this.isRecording = false;
         this.currentTranscription = '';
+        this.currentPartial = '';
+        this.transcriptVersion = -1;  // latest server transcript version shown
         this.answerCount = 0;
+        this.pendingAnswers = new Map();  // streaming answers by id -> answer text element
+        
+        // Browser microphone capture (audio is streamed to the server over Socket.IO)
+        this.audioContext = null;
+        this.mediaStream = null;
+        this.captureNode = null;
+        this.droppedFrames = 0;
         
         this.initializeElements();
         this.initializeSocket();
@@ -46,6 +56,7 @@ class InterviewAssistant {
         
         this.socket.on('disconnect', () => {
             this.isConnected = false;
+            this.stopBrowserCapture();
             this.updateConnectionStatus(false);
             this.startBtn.disabled = true;
             this.stopBtn.disabled = true;
@@ -56,19 +67,46 @@ class InterviewAssistant {
             this.updateStatus(data.status, data.message);
         });
         
+        // HTTP requests made for this socket must carry the token the server sent it
+        this.socket.on('session', (data) => {
+            this.sessionToken = data.token;
+        });
+        
         this.socket.on('transcription_update', (data) => {
-            this.updateTranscription(data.text, data.full_transcription);
+            if (this.isStaleTranscript(data.version)) return;
+            this.updateTranscription(data.text, data.full_transcription, data.partial || '');
+        });
+        
+        // A background final pass re-transcribed an utterance more accurately
+        this.socket.on('transcription_revision', (data) => {
+            if (this.isStaleTranscript(data.version)) return;
+            this.updateTranscription(data.text, data.full_transcription, this.currentPartial);
         });
         
         this.socket.on('question_detected', (data) => {
             this.showQuestionAlert(data.question);
         });
         
+        this.socket.on('answer_started', (data) => {
+            this.startAnswer(data.id, data.question, data.timestamp);
+        });
+        
+        this.socket.on('answer_delta', (data) => {
+            this.appendAnswerDelta(data.id, data.delta);
+        });
+        
         this.socket.on('answer_received', (data) => {
-            this.displayAnswer(data.question, data.answer, data.timestamp);
+            if (data.id && this.pendingAnswers.has(data.id)) {
+                this.finishAnswer(data.id, data.answer);
+            } else {
+                this.displayAnswer(data.question, data.answer, data.timestamp);
+            }
         });
         
         this.socket.on('error', (data) => {
+            if (data.id) {
+                this.finishAnswer(data.id, null);
+            }
             this.showError(data.message);
         });
     }
@@ -95,6 +133,10 @@ class InterviewAssistant {
         this.manualQuestionInput.addEventListener('input', this.autoResizeTextarea);
     }
     
+    sessionIds() {
+        return { sid: this.socket.id, token: this.sessionToken };
+    }
+    
     async startTranscription() {
         try {
             this.setButtonLoading(this.startBtn, true);
@@ -103,12 +145,16 @@ class InterviewAssistant {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
-                }
+                },
+                body: JSON.stringify(this.sessionIds())
             });
             
             const data = await response.json();
             
             if (data.success) {
+                if (data.audio_source === 'browser') {
+                    await this.startBrowserCapture(data.sample_rate, data.encoding);
+                }
                 this.isRecording = true;
                 this.startBtn.disabled = true;
                 this.stopBtn.disabled = false;
@@ -127,12 +173,14 @@ class InterviewAssistant {
     async stopTranscription() {
         try {
             this.setButtonLoading(this.stopBtn, true);
+            this.stopBrowserCapture();
             
             const response = await fetch('/stop_transcription', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
-                }
+                },
+                body: JSON.stringify(this.sessionIds())
             });
             
             const data = await response.json();
@@ -152,6 +200,118 @@ class InterviewAssistant {
         }
     }
     
+    async startBrowserCapture(sampleRate, encoding) {
+        try {
+            this.mediaStream = await navigator.mediaDevices.getUserMedia({
+                audio: { channelCount: 1, echoCancellation: true, noiseSuppression: true }
+            });
+            
+            // Ask the browser to resample to the server rate; fall back to resampling ourselves
+            this.audioContext = new AudioContext({ sampleRate: sampleRate });
+            await this.audioContext.audioWorklet.addModule('/static/js/capture-worklet.js');
+            
+            const source = this.audioContext.createMediaStreamSource(this.mediaStream);
+            this.captureNode = new AudioWorkletNode(this.audioContext, 'capture-processor');
+            this.captureNode.port.onmessage = (event) => {
+                const samples = this.resample(event.data, this.audioContext.sampleRate, sampleRate);
+                this.sendAudioFrame(samples, encoding);
+            };
+            source.connect(this.captureNode);
+            this.droppedFrames = 0;
+        } catch (error) {
+            this.stopBrowserCapture();
+            await fetch('/stop_transcription', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify(this.sessionIds())
+            });
+            throw new Error(`Microphone unavailable: ${error.message}`);
+        }
+    }
+    
+    stopBrowserCapture() {
+        if (this.captureNode) {
+            this.captureNode.port.onmessage = null;
+            this.captureNode.disconnect();
+            this.captureNode = null;
+        }
+        if (this.mediaStream) {
+            this.mediaStream.getTracks().forEach(track => track.stop());
+            this.mediaStream = null;
+        }
+        if (this.audioContext) {
+            this.audioContext.close();
+            this.audioContext = null;
+        }
+    }
+    
+    sendAudioFrame(samples, encoding) {
+        if (!this.isConnected) {
+            return;
+        }
+        
+        const payload = encoding === 'pcm16' ? this.encodePcm16(samples) : this.encodeMulaw(samples);
+        this.socket.emit('audio_frame', { audio: payload, encoding: encoding }, (ack) => {
+            // The server drops the oldest audio when transcription falls behind
+            if (ack && ack.dropped > this.droppedFrames) {
+                this.droppedFrames = ack.dropped;
+                console.warn(`Server is behind: ${ack.dropped} audio blocks dropped`);
+            }
+        });
+    }
+    
+    resample(samples, fromRate, toRate) {
+        if (fromRate === toRate) {
+            return samples;
+        }
+        
+        const ratio = fromRate / toRate;
+        const output = new Float32Array(Math.floor(samples.length / ratio));
+        for (let i = 0; i < output.length; i++) {
+            const position = i * ratio;
+            const index = Math.floor(position);
+            const next = Math.min(index + 1, samples.length - 1);
+            const fraction = position - index;
+            output[i] = samples[index] * (1 - fraction) + samples[next] * fraction;
+        }
+        return output;
+    }
+    
+    encodePcm16(samples) {
+        const output = new Int16Array(samples.length);
+        for (let i = 0; i < samples.length; i++) {
+            const sample = Math.max(-1, Math.min(1, samples[i]));
+            output[i] = sample < 0 ? sample * 0x8000 : sample * 0x7FFF;
+        }
+        return output.buffer;
+    }
+    
+    encodeMulaw(samples) {
+        // G.711 mu-law: 8 bits per sample, half the bandwidth of 16-bit PCM
+        const BIAS = 0x84;
+        const CLIP = 32635;
+        const output = new Uint8Array(samples.length);
+        
+        for (let i = 0; i < samples.length; i++) {
+            let sample = Math.round(Math.max(-1, Math.min(1, samples[i])) * 32767);
+            const sign = sample < 0 ? 0x80 : 0;
+            if (sign) {
+                sample = -sample;
+            }
+            sample = Math.min(sample, CLIP) + BIAS;
+            
+            let exponent = 7;
+            for (let mask = 0x4000; (sample & mask) === 0 && exponent > 0; mask >>= 1) {
+                exponent--;
+            }
+            const mantissa = (sample >> (exponent + 3)) & 0x0F;
+            output[i] = ~(sign | (exponent << 4) | mantissa) & 0xFF;
+        }
+        return output.buffer;
+    }
+    
     async sendManualQuestion() {
         const question = this.manualQuestionInput.value.trim();
         
@@ -196,6 +356,8 @@ class InterviewAssistant {
     
     clearTranscription() {
         this.currentTranscription = '';
+        this.currentPartial = '';
+        this.transcriptVersion = -1;
         this.transcriptionArea.innerHTML = '<p class="text-muted text-center py-4">Listening...</p>';
     }
     
@@ -238,11 +400,24 @@ class InterviewAssistant {
         }
     }
     
-    updateTranscription(newText, fullTranscription) {
+    isStaleTranscript(version) {
+        // Updates and revisions come from different server threads; never go back to an older transcript
+        if (version === undefined) return false;
+        if (version < this.transcriptVersion) return true;
+        this.transcriptVersion = version;
+        return false;
+    }
+    
+    updateTranscription(newText, fullTranscription, partial = '') {
         this.currentTranscription = fullTranscription;
-        
-        if (fullTranscription.trim()) {
-            this.transcriptionArea.innerHTML = `<p class="transcription-text">${this.escapeHtml(fullTranscription)}</p>`;
+        this.currentPartial = partial;
+        
+        if (fullTranscription.trim() || partial.trim()) {
+            // Partial text is still being revised by the server, so render it separately
+            const partialHtml = partial.trim()
+                ? ` <span class="transcription-partial">${this.escapeHtml(partial)}</span>`
+                : '';
+            this.transcriptionArea.innerHTML = `<p class="transcription-text">${this.escapeHtml(fullTranscription)}${partialHtml}</p>`;
         } else {
             this.transcriptionArea.innerHTML = '<p class="text-muted text-center py-4">Listening...</p>';
         }
@@ -280,6 +455,36 @@ class InterviewAssistant {
         
         // Auto-scroll to top to show new answer
         this.answersArea.scrollTop = 0;
+        
+        return answerElement;
+    }
+    
+    startAnswer(id, question, timestamp) {
+        const answerElement = this.displayAnswer(question, '', timestamp);
+        const answerText = answerElement.querySelector('.answer-text');
+        answerText.classList.add('answer-streaming');
+        this.pendingAnswers.set(id, answerText);
+    }
+    
+    appendAnswerDelta(id, delta) {
+        const answerText = this.pendingAnswers.get(id);
+        if (answerText) {
+            answerText.textContent += delta;
+        }
+    }
+    
+    finishAnswer(id, answer) {
+        const answerText = this.pendingAnswers.get(id);
+        if (!answerText) {
+            return;
+        }
+        
+        // The final event carries the full answer; prefer it over the accumulated deltas
+        if (answer !== null) {
+            answerText.textContent = answer;
+        }
+        answerText.classList.remove('answer-streaming');
+        this.pendingAnswers.delete(id);
     }
     
     createAnswerElement(question, answer, timestamp, id) {
@@ -311,7 +516,8 @@ class InterviewAssistant {
         const copyBtn = div.querySelector('.copy-btn');
         const copyQuestionBtn = div.querySelector('.copy-question-btn');
         
-        copyBtn.addEventListener('click', (e) => this.copyToClipboard(e, answer));
+        const answerText = div.querySelector('.answer-text');
+        copyBtn.addEventListener('click', (e) => this.copyToClipboard(e, answerText.textContent));
         copyQuestionBtn.addEventListener('click', (e) => this.copyToClipboard(e, question));
         
         // Replace feather icons
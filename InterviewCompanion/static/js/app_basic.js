@@ -144,7 +144,7 @@ class InterviewAssistant {
         try {
             this.setButtonLoading(this.sendQuestionBtn, true);
             
-            const response = await fetch('/send_question', {
+            const response = await fetch('/stream_answer', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -152,14 +152,14 @@ class InterviewAssistant {
                 body: JSON.stringify({ question: question })
             });
             
-            const data = await response.json();
-            
-            if (data.success) {
-                this.displayAnswer(data.question, data.answer, data.timestamp);
-            } else {
+            if (!response.ok) {
+                const data = await response.json();
                 this.showError(data.message);
+                return;
             }
             
+            await this.readAnswerStream(response, question);
+            
         } catch (error) {
             this.showError(`Failed to send question: ${error.message}`);
         } finally {
@@ -167,6 +167,56 @@ class InterviewAssistant {
         }
     }
     
+    async readAnswerStream(response, question) {
+        // Render tokens as they arrive from the Server-Sent Events stream
+        const answerElement = this.displayAnswer(question, '', Date.now() / 1000);
+        const answerText = answerElement.querySelector('.answer-text');
+        answerText.classList.add('answer-streaming');
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        try {
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) {
+                    break;
+                }
+                
+                buffer += decoder.decode(value, { stream: true });
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const event = this.parseServerEvent(buffer.slice(0, boundary));
+                    buffer = buffer.slice(boundary + 2);
+                    
+                    if (event.type === 'delta') {
+                        answerText.textContent += event.data.delta;
+                    } else if (event.type === 'done') {
+                        answerText.textContent = event.data.answer;
+                    } else if (event.type === 'error') {
+                        this.showError(event.data.message);
+                    }
+                }
+            }
+        } finally {
+            answerText.classList.remove('answer-streaming');
+        }
+    }
+    
+    parseServerEvent(raw) {
+        let type = 'message';
+        const dataLines = [];
+        raw.split('\n').forEach(line => {
+            if (line.startsWith('event:')) {
+                type = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                dataLines.push(line.slice(5).trim());
+            }
+        });
+        return { type: type, data: dataLines.length ? JSON.parse(dataLines.join('\n')) : {} };
+    }
+    
     startDictation() {
         if (this.recognition && !this.isListening) {
             this.transcript = '';
@@ -243,6 +293,8 @@ class InterviewAssistant {
         
         // Auto-scroll to top to show new answer
         this.answersArea.scrollTop = 0;
+        
+        return answerElement;
     }
     
     createAnswerElement(question, answer, timestamp, id) {
@@ -274,7 +326,8 @@ class InterviewAssistant {
         const copyBtn = div.querySelector('.copy-btn');
         const copyQuestionBtn = div.querySelector('.copy-question-btn');
         
-        copyBtn.addEventListener('click', (e) => this.copyToClipboard(e, answer));
+        const answerText = div.querySelector('.answer-text');
+        copyBtn.addEventListener('click', (e) => this.copyToClipboard(e, answerText.textContent));
         copyQuestionBtn.addEventListener('click', (e) => this.copyToClipboard(e, question));
         
         // Replace feather icons
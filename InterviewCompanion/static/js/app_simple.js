@@ -1,8 +1,10 @@
 class InterviewAssistant {
     constructor() {
         this.socket = null;
+        this.sessionToken = null;
         this.isConnected = false;
         this.answerCount = 0;
+        this.pendingAnswers = new Map();  // streaming answers by id -> answer text element
         
         this.initializeElements();
         this.initializeSocket();
@@ -47,11 +49,31 @@ class InterviewAssistant {
             console.log('Status update:', data.message);
         });
         
+        // HTTP requests made for this socket must carry the token the server sent it
+        this.socket.on('session', (data) => {
+            this.sessionToken = data.token;
+        });
+        
+        this.socket.on('answer_started', (data) => {
+            this.startAnswer(data.id, data.question, data.timestamp);
+        });
+        
+        this.socket.on('answer_delta', (data) => {
+            this.appendAnswerDelta(data.id, data.delta);
+        });
+        
         this.socket.on('answer_received', (data) => {
-            this.displayAnswer(data.question, data.answer, data.timestamp);
+            if (data.id && this.pendingAnswers.has(data.id)) {
+                this.finishAnswer(data.id, data.answer);
+            } else {
+                this.displayAnswer(data.question, data.answer, data.timestamp);
+            }
         });
         
         this.socket.on('error', (data) => {
+            if (data.id) {
+                this.finishAnswer(data.id, null);
+            }
             this.showError(data.message);
         });
     }
@@ -149,6 +171,36 @@ class InterviewAssistant {
         
         // Auto-scroll to top to show new answer
         this.answersArea.scrollTop = 0;
+        
+        return answerElement;
+    }
+    
+    startAnswer(id, question, timestamp) {
+        const answerElement = this.displayAnswer(question, '', timestamp);
+        const answerText = answerElement.querySelector('.answer-text');
+        answerText.classList.add('answer-streaming');
+        this.pendingAnswers.set(id, answerText);
+    }
+    
+    appendAnswerDelta(id, delta) {
+        const answerText = this.pendingAnswers.get(id);
+        if (answerText) {
+            answerText.textContent += delta;
+        }
+    }
+    
+    finishAnswer(id, answer) {
+        const answerText = this.pendingAnswers.get(id);
+        if (!answerText) {
+            return;
+        }
+        
+        // The final event carries the full answer; prefer it over the accumulated deltas
+        if (answer !== null) {
+            answerText.textContent = answer;
+        }
+        answerText.classList.remove('answer-streaming');
+        this.pendingAnswers.delete(id);
     }
     
     createAnswerElement(question, answer, timestamp, id) {
@@ -185,9 +237,10 @@ class InterviewAssistant {
         const copyQuestionBtn = div.querySelector('.copy-question-btn');
         const improveBtn = div.querySelector('.improve-btn');
         
-        copyBtn.addEventListener('click', (e) => this.copyToClipboard(e, answer));
+        const answerText = div.querySelector('.answer-text');
+        copyBtn.addEventListener('click', (e) => this.copyToClipboard(e, answerText.textContent));
         copyQuestionBtn.addEventListener('click', (e) => this.copyToClipboard(e, question));
-        improveBtn.addEventListener('click', (e) => this.improveAnswer(e, question, answer));
+        improveBtn.addEventListener('click', (e) => this.improveAnswer(e, question, answerText.textContent));
         
         // Replace feather icons
         setTimeout(() => feather.replace(), 0);
@@ -230,6 +283,8 @@ class InterviewAssistant {
                     'Content-Type': 'application/json'
                 },
                 body: JSON.stringify({
+                    sid: this.socket.id,
+                    token: this.sessionToken,
                     question: `Please improve this interview answer: Question: "${question}" Current answer: "${currentAnswer}" Provide a better, more detailed version.`
                 })
             });
@@ -0,0 +1,33 @@
+// Collects microphone samples into ~100 ms blocks and hands them to the main thread.
+class CaptureProcessor extends AudioWorkletProcessor {
+    constructor() {
+        super();
+        this.blockSize = Math.round(sampleRate / 10);
+        this.buffer = new Float32Array(this.blockSize);
+        this.filled = 0;
+    }
+    
+    process(inputs) {
+        const channel = inputs[0] && inputs[0][0];
+        if (!channel) {
+            return true;
+        }
+        
+        let offset = 0;
+        while (offset < channel.length) {
+            const count = Math.min(channel.length - offset, this.blockSize - this.filled);
+            this.buffer.set(channel.subarray(offset, offset + count), this.filled);
+            this.filled += count;
+            offset += count;
+            
+            if (this.filled === this.blockSize) {
+                this.port.postMessage(this.buffer);
+                this.buffer = new Float32Array(this.blockSize);
+                this.filled = 0;
+            }
+        }
+        return true;
+    }
+}
+
+registerProcessor('capture-processor', CaptureProcessor);
@@ -0,0 +1,162 @@
+import logging
+import re
+import numpy as np
+from typing import List, Optional
+
+
+class StreamingTranscriber:
+    """Incremental transcription over an overlapping window of recent audio.
+
+    Audio blocks are appended to a rolling buffer and the buffer is re-decoded
+    every `step` seconds. Words that two consecutive hypotheses agree on are
+    committed; the rest is reported as a partial result that may still change.
+    Committed audio is trimmed from the front of the buffer so each decode only
+    covers the uncommitted tail plus a little context.
+    """
+
+    def __init__(self, audio_processor, step=0.5, max_window=15.0, context=1.0):
+        self.audio_processor = audio_processor
+        self.sample_rate = audio_processor.sample_rate
+        self.step_samples = int(step * self.sample_rate)
+        self.max_window_samples = int(max_window * self.sample_rate)
+        self.context_samples = int(context * self.sample_rate)
+
+        self.committed_words = []
+        self.prompted = 0  # committed words already handed to the prompt context
+        self.reset()
+
+    def reset(self):
+        """Drop all buffered audio and hypotheses"""
+        # Everything committed so far now lies before the (empty) window
+        self._extend_prompt(len(self.committed_words))
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0.0  # session time (seconds) of buffer[0]
+        self.committed_end = 0.0  # session time of the end of the last committed word
+        self.committed_words = []
+        self.prompted = 0
+        self.pending_words = []  # previous hypothesis beyond the committed prefix
+        self.samples_since_decode = 0
+
+    def insert_audio(self, audio_chunk: np.ndarray):
+        """Append a block of captured audio to the rolling buffer"""
+        audio_chunk = np.asarray(audio_chunk, dtype=np.float32).reshape(-1)
+        self.buffer = np.concatenate((self.buffer, audio_chunk))
+        self.samples_since_decode += len(audio_chunk)
+
+    def ready(self) -> bool:
+        """True once enough new audio has arrived for the next decode"""
+        return self.samples_since_decode >= self.step_samples
+
+    def process(self) -> Optional[dict]:
+        """Re-decode the window and return newly committed and partial text.
+
+        Returns None when there is not yet enough new audio for a decode.
+        """
+        if not self.ready():
+            return None
+        self.samples_since_decode = 0
+
+        hypothesis = self._decode_window()
+
+        # Commit the longest prefix the previous and current hypotheses agree on
+        agreed = 0
+        for previous, current in zip(self.pending_words, hypothesis):
+            if self._normalize(previous['word']) != self._normalize(current['word']):
+                break
+            agreed += 1
+
+        newly_committed = hypothesis[:agreed]
+        self.pending_words = hypothesis[agreed:]
+
+        if newly_committed:
+            self.committed_words.extend(newly_committed)
+            self.committed_end = newly_committed[-1]['end']
+
+        # Words in audio that had to be dropped from an overfull window are committed as-is
+        newly_committed = newly_committed + self._trim_buffer()
+
+        return {
+            'committed': self._join(newly_committed),
+            'partial': self._join(self.pending_words)
+        }
+
+    def flush(self) -> str:
+        """Commit whatever is still pending, e.g. when transcription stops"""
+        if self.samples_since_decode > 0 and len(self.buffer) > 0:
+            self.pending_words = self._decode_window()
+
+        remaining = self.pending_words
+        self.committed_words.extend(remaining)
+        if remaining:
+            self.committed_end = remaining[-1]['end']
+        self.pending_words = []
+        self.samples_since_decode = 0
+        return self._join(remaining)
+
+    def _decode_window(self) -> List[dict]:
+        """Transcribe the buffer and keep only words after the committed point"""
+        words = self.audio_processor.transcribe_words(self.buffer, prompt=self.audio_processor.prompt_context.text())
+
+        hypothesis = []
+        for word in words:
+            start = self.buffer_start + word['start']
+            end = self.buffer_start + word['end']
+            # Timestamp-aligned stitching: skip words already covered by the committed text
+            if end <= self.committed_end + 0.05:
+                continue
+            hypothesis.append({'word': word['word'], 'start': start, 'end': end})
+        return hypothesis
+
+    def _trim_buffer(self) -> List[dict]:
+        """Drop committed audio so decodes don't grow with the session.
+
+        Returns any pending words that were force-committed because the
+        window hit max_window without the hypotheses agreeing.
+        """
+        forced = []
+        # Keep a little context before the commit point so words at the boundary decode cleanly
+        trim_time = self.committed_end - self.context_samples / self.sample_rate
+        trim_samples = int((trim_time - self.buffer_start) * self.sample_rate)
+
+        # Never let the window exceed max_window, even if nothing could be committed
+        overflow = len(self.buffer) - self.max_window_samples
+        if overflow > trim_samples:
+            logging.debug("Streaming window overflow, force-committing words in trimmed audio")
+            trim_samples = overflow
+            cutoff = self.buffer_start + trim_samples / self.sample_rate
+            forced = [w for w in self.pending_words if w['start'] < cutoff]
+            if forced:
+                self.committed_words.extend(forced)
+                self.committed_end = forced[-1]['end']
+                self.pending_words = self.pending_words[len(forced):]
+
+        if trim_samples > 0:
+            self.buffer = self.buffer[trim_samples:]
+            self.buffer_start += trim_samples / self.sample_rate
+
+            # Words whose audio has left the window become prompt context for the next decodes
+            done = self.prompted
+            while done < len(self.committed_words) and self.committed_words[done]['end'] <= self.buffer_start:
+                done += 1
+            self._extend_prompt(done)
+
+        return forced
+
+    def _extend_prompt(self, upto: int):
+        """Append committed_words[prompted:upto] to the session's prompt context.
+
+        Only text whose audio is no longer in the window is used, so Whisper
+        is never prompted with words it is about to hear again.
+        """
+        if upto > self.prompted:
+            self.audio_processor.prompt_context.append(self._join(self.committed_words[self.prompted:upto]))
+            self.prompted = upto
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        return re.sub(r"[^\w']", "", word.lower())
+
+    @staticmethod
+    def _join(words: List[dict]) -> str:
+        return "".join(w['word'] for w in words).strip()
@@ -0,0 +1,403 @@
+import functools
+import logging
+
+import numpy as np
+
+from flask import Blueprint, jsonify, request
+
+from config import Config
+from metrics import metrics
+from pipeline import Pipeline, Stage
+from question_detector import get_detector
+from remote_audio import SUPPORTED_ENCODINGS, decode_frame
+from services import get_services, request_sid
+from speculative import AnswerSpeculator
+from streaming_transcriber import StreamingTranscriber
+from vad import UtteranceSegmenter
+
+transcription_bp = Blueprint('transcription', __name__)
+
+
+@transcription_bp.route('/start_transcription', methods=['POST'])
+def start_transcription():
+    """Start audio transcription"""
+    services = get_services()
+    try:
+        if not services.audio_enabled:
+            return jsonify({
+                'success': False,
+                'message': 'Audio recording not available in this environment. Please use manual text input.'
+            }), 400
+
+        sid = request_sid()
+        if not sid:
+            return jsonify({
+                'success': False,
+                'message': 'No valid session id and token provided'
+            }), 400
+
+        session = services.session_manager.get_or_create(sid)
+        if not session.active:
+            session.audio_source = Config.AUDIO_SOURCE
+            session.bandwidth.reset()
+
+        if session.start(functools.partial(transcription_worker, services)):
+            services.emit('status_update', {
+                'status': 'started',
+                'message': 'Transcription started successfully'
+            }, to=session.room)
+
+            return jsonify({
+                'success': True,
+                'message': 'Transcription started',
+                'audio_source': session.audio_source,
+                'sample_rate': Config.SAMPLE_RATE,
+                'encoding': Config.AUDIO_ENCODING
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'Transcription already active'
+            })
+    except Exception as e:
+        logging.error(f"Error starting transcription: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Failed to start transcription: {str(e)}'
+        }), 500
+
+
+@transcription_bp.route('/stop_transcription', methods=['POST'])
+def stop_transcription():
+    """Stop audio transcription"""
+    services = get_services()
+    try:
+        session = services.session_manager.get(request_sid() or '')
+        if session:
+            session.stop()
+            if session.audio_source == 'browser':
+                logging.info(f"Session {session.sid} audio bandwidth: {session.bandwidth.stats()}")
+            services.emit('status_update', {
+                'status': 'stopped',
+                'message': 'Transcription stopped'
+            }, to=session.room)
+
+        return jsonify({
+            'success': True,
+            'message': 'Transcription stopped'
+        })
+    except Exception as e:
+        logging.error(f"Error stopping transcription: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'Failed to stop transcription: {str(e)}'
+        }), 500
+
+
+@transcription_bp.route('/get_current_transcription', methods=['GET'])
+def get_current_transcription():
+    """Get the current transcription text"""
+    session = get_services().session_manager.get(request_sid() or '')
+    return jsonify({
+        'transcription': session.transcript.text() if session else '',
+        'active': session.active if session else False,
+        'bandwidth': session.bandwidth.stats() if session else None,
+        'buffer': session.audio_processor.audio_buffer.stats() if session and session.audio_processor else None,
+        'pipeline': session.pipeline.stats() if session and session.pipeline else None,
+        'speculation': session.speculator.stats() if session and session.speculator else None
+    })
+
+
+def transcription_worker(services, session):
+    """Background worker for continuous transcription"""
+    audio_processor = session.audio_processor
+    if not audio_processor:
+        return
+
+    try:
+        if session.audio_source == 'browser':
+            audio_processor.start_remote()
+        else:
+            audio_processor.start_recording()
+
+        if session.speculator is None:
+            session.speculator = AnswerSpeculator(
+                lambda: services.openai_client,
+                policy=Config.SPECULATIVE_POLICY,
+                token_budget=Config.SPECULATIVE_TOKEN_BUDGET,
+                max_tokens=Config.MAX_TOKENS,
+                context_factory=lambda: services.answer_context(session.sid)
+            )
+
+        session.pipeline = build_pipeline(services, session)
+        session.pipeline.run()  # returns once stop_recording() ends the input and every stage has drained
+
+    except Exception as e:
+        logging.error(f"Error in transcription worker: {e}")
+        services.emit('error', {
+            'message': f'Transcription error: {str(e)}'
+        }, to=session.room)
+    finally:
+        audio_processor.stop_recording()
+
+
+def build_pipeline(services, session):
+    """capture -> vad -> transcribe -> detect -> emit, joined by bounded queues.
+
+    The transcriber's input queue drops the oldest audio when decoding falls
+    behind, so the transcript stays close to live instead of lagging further
+    and further; utterance boundaries are never dropped, so every utterance
+    still ends (and its questions are still detected). Every other hand-off
+    blocks. Drops show up in the pipeline stats and on /metrics.
+    """
+    audio_processor = session.audio_processor
+    size = Config.PIPELINE_QUEUE_SIZE
+
+    if Config.STREAMING_ENABLED:
+        segment, flush_segment, transcribe, flush_transcribe, droppable = streaming_stages(audio_processor)
+    elif Config.VAD_ENABLED:
+        segment, flush_segment, transcribe, flush_transcribe, droppable = utterance_stages(audio_processor)
+    else:
+        segment, flush_segment, transcribe, flush_transcribe, droppable = chunk_stages(audio_processor)
+
+    observe = metrics.observer(session.sid)
+    audio_processor.observe = observe
+    return Pipeline(
+        functools.partial(audio_processor.get_audio_chunk, timeout=None),
+        [
+            Stage('vad', segment, on_stop=flush_segment, maxsize=size),
+            Stage('transcribe', transcribe, on_stop=flush_transcribe, maxsize=size, drop_oldest=True,
+                  droppable=droppable),
+            Stage('detect', detect_question, maxsize=size),
+            Stage('emit', create_emitter(services, session), maxsize=size),
+        ],
+        observe=observe,
+        on_drop=metrics.drop_counter(session.sid)
+    )
+
+
+def create_segmenter(audio_processor):
+    """Utterance segmenter sharing the audio processor's VAD"""
+    return UtteranceSegmenter(
+        audio_processor.vad,
+        min_silence=Config.VAD_MIN_SILENCE,
+        max_utterance=Config.VAD_MAX_UTTERANCE
+    )
+
+
+def transcript_result(text, partial='', utterance=None, prompt=None):
+    """Stage output for the detect and emit stages, or None if there is nothing to pass on.
+
+    `utterance` marks the end of an utterance and carries its audio (and the
+    prompt it was decoded with) for the final pass.
+    """
+    if not text and not partial and utterance is None:
+        return None
+    return [{'text': text, 'partial': partial, 'utterance': utterance, 'prompt': prompt}]
+
+
+def chunk_stages(audio_processor):
+    """Transcribe every captured chunk as it is"""
+
+    def segment(audio_chunk):
+        return [audio_chunk]
+
+    def transcribe(audio_chunk):
+        return transcript_result(audio_processor.transcribe_audio(audio_chunk).strip())
+
+    return segment, None, transcribe, None, None  # any chunk may be dropped
+
+
+def utterance_stages(audio_processor):
+    """Transcribe whole utterances cut at natural pauses; silence never reaches Whisper"""
+    segmenter = create_segmenter(audio_processor)
+
+    def flush_segment():
+        utterance = segmenter.flush()
+        return [utterance] if utterance is not None else None
+
+    def transcribe(utterance):
+        prompt = audio_processor.prompt_context.text()
+        return transcript_result(audio_processor.transcribe_audio(utterance), utterance=utterance, prompt=prompt)
+
+    # Each item is a whole utterance ending at a boundary; backpressure is left to the capture ring
+    return segmenter.push, flush_segment, transcribe, None, lambda utterance: False
+
+
+def streaming_stages(audio_processor):
+    """Re-decode an overlapping window every STREAM_STEP and emit partial/committed text"""
+    streamer = StreamingTranscriber(
+        audio_processor,
+        step=Config.STREAM_STEP,
+        max_window=Config.STREAM_MAX_WINDOW
+    )
+    segmenter = create_segmenter(audio_processor) if Config.VAD_ENABLED else None
+    utterance_prompt = None
+
+    def segment(audio_chunk):
+        if segmenter is None:
+            return [{'audio': audio_chunk, 'utterance': None}]
+
+        utterances = segmenter.push(audio_chunk)
+        if not segmenter.active and not utterances:
+            return None  # Between utterances: nothing to decode
+        return [{'audio': audio_chunk, 'utterance': np.concatenate(utterances) if utterances else None}]
+
+    def transcribe(block):
+        nonlocal utterance_prompt
+        if len(streamer.buffer) == 0 and not streamer.committed_words:
+            utterance_prompt = audio_processor.prompt_context.text()  # context from before this utterance
+
+        streamer.insert_audio(block['audio'])
+        if block['utterance'] is not None:
+            # Commit the whole utterance at the pause so question detection sees full sentences
+            remaining = streamer.flush()
+            streamer.reset()
+            return transcript_result(remaining, utterance=block['utterance'], prompt=utterance_prompt)
+
+        result = streamer.process()
+        if result is None:
+            return None
+        return transcript_result(result['committed'], result['partial'])
+
+    def flush_transcribe():
+        return transcript_result(streamer.flush())
+
+    def droppable(block):
+        return block['utterance'] is None  # blocks that end an utterance commit it
+
+    return segment, None, transcribe, flush_transcribe, droppable
+
+
+def detect_question(result):
+    """Attach the question sentences, if any, found in committed text"""
+    result['question'] = " ".join(get_detector().detect(result['text'])) if result['text'] else ""
+    return [result]
+
+
+def create_emitter(services, session):
+    """Final stage: publish committed text, or just refresh the partial hypothesis.
+
+    It also remembers which transcript segments the current utterance
+    produced, so the final pass can replace them once the utterance ends,
+    and feeds detected questions to the session's answer speculator.
+    """
+    first_id = last_id = None
+    utterance_text = []
+    speculator = session.speculator
+
+    def emit(result):
+        nonlocal first_id, last_id
+        if result['text']:
+            segment_id = publish_transcription(services, session, result['text'], partial=result['partial'],
+                                               question=result['question'])
+            if segment_id is not None:
+                first_id = segment_id if first_id is None else first_id
+                last_id = segment_id
+            utterance_text.append(result['text'])
+            if result['question'] and speculator:
+                speculator.on_question(result['question'])
+        else:
+            text, version = session.transcript.snapshot()
+            services.emit('transcription_update', {
+                'text': '',
+                'partial': result['partial'],
+                'full_transcription': text,
+                'version': version
+            }, to=session.room)
+
+        if speculator and result['partial']:
+            # Start on a question while the speaker is still finishing it (policy 'partial' only)
+            questions = get_detector().detect(" ".join(utterance_text + [result['partial']]))
+            if questions:
+                speculator.on_question(questions[-1], partial=True)
+
+        if result['utterance'] is not None or (result['text'] and not Config.VAD_ENABLED):
+            if speculator:
+                speculator.on_utterance_end(" ".join(utterance_text))
+            utterance_text.clear()
+
+        if result['utterance'] is not None:
+            if first_id is not None:
+                request_final_pass(services, session, result['utterance'], result['prompt'], first_id, last_id)
+            first_id = last_id = None
+
+    return emit
+
+
+def publish_transcription(services, session, text, partial='', question=None):
+    """Append committed text to the session transcript and notify its client; returns the segment id"""
+    segment_id = session.transcript.append(text)
+    full_transcription, version = session.transcript.snapshot()
+
+    # Emit transcription update via WebSocket
+    services.emit('transcription_update', {
+        'id': segment_id,
+        'text': text,
+        'partial': partial,
+        'full_transcription': full_transcription,
+        'version': version
+    }, to=session.room)
+    if services.persistence is not None:
+        services.persistence.record_segment(session.sid, segment_id, text)  # queued after the emit, never before
+
+    # Surface just the question sentences, not the statements around them
+    if question is None:
+        question = " ".join(get_detector().detect(text))
+    if question:
+        services.emit('question_detected', {
+            'question': question
+        }, to=session.room)
+
+    return segment_id
+
+
+def request_final_pass(services, session, utterance, prompt, first_id, last_id):
+    """Re-transcribe a finished utterance in the background and revise its live text"""
+    final_pass = services.final_pass
+    if final_pass is None:
+        return
+
+    def revise(text):
+        if not session.transcript.revise(first_id, last_id, text):
+            return  # unchanged, or already scrolled out of the retained transcript
+        full_transcription, version = session.transcript.snapshot()
+        services.emit('transcription_revision', {
+            'first_id': first_id,
+            'last_id': last_id,
+            'text': text.strip(),
+            'full_transcription': full_transcription,
+            'version': version
+        }, to=session.room)
+        if services.persistence is not None:
+            services.persistence.record_revision(session.sid, first_id, last_id, text)
+
+    final_pass.submit(session.audio_processor.prepare_audio(utterance), prompt, revise)
+
+
+def register_transcription_events(socketio, services):
+    """Socket.IO handlers for live transcription"""
+
+    @socketio.on('audio_frame')
+    def handle_audio_frame(data):
+        """Receive a block of browser-captured audio for this client's session"""
+        session = services.session_manager.get(request.sid)
+        if not session or not session.active or session.audio_source != 'browser':
+            return {'accepted': False}
+
+        if not isinstance(data, dict):
+            return {'accepted': False}
+        payload = data.get('audio')
+        encoding = data.get('encoding', Config.AUDIO_ENCODING)
+        if not isinstance(payload, (bytes, bytearray)) or encoding not in SUPPORTED_ENCODINGS:
+            return {'accepted': False}
+
+        session.bandwidth.record(len(payload))
+        with metrics.span('capture', session.sid):
+            accepted = session.audio_processor.push_audio(decode_frame(payload, encoding))
+
+        # The ack lets the client notice when the transcriber is falling behind
+        return {
+            'accepted': accepted,
+            'dropped': session.audio_processor.dropped_blocks
+        }
@@ -0,0 +1,97 @@
+import logging
+import threading
+from typing import Optional
+
+import numpy as np
+
+from decoding import BACKGROUND_MODES, decoding_profile
+
+# faster-whisper pulls in CTranslate2, so it is only imported when that backend is selected
+_faster_whisper = None
+
+
+def _import_faster_whisper():
+    global _faster_whisper
+    if _faster_whisper is None:
+        import faster_whisper
+        _faster_whisper = faster_whisper
+    return _faster_whisper
+
+
+class FasterWhisperTranscriber:
+    """Whisper running on CTranslate2 (faster-whisper) with quantized weights.
+
+    With int8 weights on CPU this is typically several times faster than the
+    PyTorch model at similar accuracy. It has the same interface as
+    BatchedTranscriber, so AudioProcessor does not care which one it gets.
+    """
+
+    model = None  # no openai-whisper model, so the temp-file path is unavailable
+
+    def __init__(self, model_name: str, device='cpu', compute_type='int8', threads=0, workers=1):
+        faster_whisper = _import_faster_whisper()
+        logging.info(f"Loading faster-whisper model '{model_name}' ({device}, {compute_type})...")
+        self.engine = faster_whisper.WhisperModel(
+            model_name,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=threads,
+            num_workers=workers
+        )
+
+        # CTranslate2 runs up to `workers` decodes in parallel; queue the rest, live ones first
+        self.free_slots = workers
+        self.live_waiting = 0
+        self.condition = threading.Condition()
+        logging.info("faster-whisper model loaded successfully")
+
+    def _segments(self, audio: np.ndarray, prompt: Optional[str], mode: str, **options) -> list:
+        profile = decoding_profile(mode)
+        self._acquire_slot(mode in BACKGROUND_MODES)
+        try:
+            segments, _ = self.engine.transcribe(
+                np.asarray(audio, dtype=np.float32),
+                language="en",
+                initial_prompt=prompt,
+                temperature=list(profile['temperatures']),
+                beam_size=profile['beam_size'],
+                best_of=profile['best_of'],
+                condition_on_previous_text=False,
+                **options
+            )
+            # transcribe() is lazy; decoding happens while the generator is consumed
+            return list(segments)
+        finally:
+            self._release_slot()
+
+    def _acquire_slot(self, background: bool):
+        """Wait for a decode slot; background decodes also wait until no live decode is queued"""
+        with self.condition:
+            if not background:
+                self.live_waiting += 1
+            self.condition.wait_for(lambda: self.free_slots > 0 and (not background or self.live_waiting == 0))
+            if not background:
+                self.live_waiting -= 1
+            self.free_slots -= 1
+
+    def _release_slot(self):
+        with self.condition:
+            self.free_slots += 1
+            self.condition.notify_all()
+
+    def transcribe(self, audio: np.ndarray, timeout: Optional[float] = None, prompt: Optional[str] = None,
+                   mode='live') -> str:
+        """Transcribe 16 kHz float32 audio"""
+        return "".join(segment.text for segment in self._segments(audio, prompt, mode)).strip()
+
+    def transcribe_words(self, audio: np.ndarray, prompt: Optional[str] = None, mode='live') -> list:
+        """Transcribe with word timestamps relative to the start of the buffer"""
+        words = []
+        for segment in self._segments(audio, prompt, mode, word_timestamps=True):
+            for word in segment.words or []:
+                words.append({
+                    'word': word.word,
+                    'start': float(word.start),
+                    'end': float(word.end)
+                })
+        return words
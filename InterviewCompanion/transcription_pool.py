@@ -0,0 +1,369 @@
+import argparse
+import itertools
+import logging
+import os
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+import numpy as np
+
+from config import Config
+
+WHISPER_SAMPLE_RATE = 16000
+
+
+class SharedAudioSlots:
+    """Fixed set of float32 audio buffers in one shared-memory block.
+
+    The web process copies each request's audio into a free slot and the
+    worker process decodes straight from a numpy view of it, so only the
+    slot index crosses the process boundary. `acquire` blocks while every
+    slot is in use, which bounds how far requests can run ahead of the pool.
+    """
+
+    def __init__(self, slots: int, max_samples: int, name: Optional[str] = None):
+        self.slots = slots
+        self.max_samples = max_samples
+        self.owner = name is None
+        size = slots * max_samples * np.dtype(np.float32).itemsize
+        self.memory = SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        if not self.owner:
+            # Python < 3.13 would otherwise unlink the block when this (worker) process exits
+            resource_tracker.unregister(self.memory._name, 'shared_memory')
+        self.buffers = np.ndarray((slots, max_samples), dtype=np.float32, buffer=self.memory.buf)
+
+        self.free = queue.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        return self.free.get(timeout=timeout)
+
+    def release(self, slot: int):
+        self.free.put(slot)
+
+    def write(self, slot: int, audio: np.ndarray):
+        self.buffers[slot, :len(audio)] = audio
+
+    def view(self, slot: int, samples: int) -> np.ndarray:
+        return self.buffers[slot, :samples]
+
+    def close(self):
+        self.buffers = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def worker_concurrency(backend: str) -> int:
+    """Requests a worker process decodes at once: a full Whisper batch, or one per CTranslate2 worker"""
+    return Config.FASTER_WHISPER_WORKERS if backend == 'faster-whisper' else Config.WHISPER_BATCH_SIZE
+
+
+class PoolWorker:
+    """Parent-side handle for one decode process: its connection and the requests it holds"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.connection = None
+        self.send_lock = threading.Lock()
+        self.inflight = {}  # request id -> (future, slot or None)
+        self.ready = False
+        self.alive = False
+
+
+class ProcessPoolTranscriber:
+    """Runs the transcription model in separate worker processes.
+
+    Decoding then competes with the web process only for CPU, never for its
+    GIL, so Socket.IO heartbeats and HTTP requests stay responsive while
+    every core is busy. Each worker loads its own model and pins torch (or
+    CTranslate2) to `threads` threads; size the pool so processes * threads
+    matches the cores set aside for transcription. Audio travels through
+    SharedAudioSlots and requests go to the worker with the fewest in
+    flight. A worker that dies is restarted and its requests fail; one that
+    exits or does not connect within `start_timeout` seconds of being
+    spawned is killed and not restarted.
+    """
+
+    model = None  # each worker process holds its own
+
+    def __init__(self, model_name: str, backend: Optional[str] = None, processes=2, threads=1, slots=None,
+                 max_seconds=30.0, start_timeout=30.0):
+        self.model_name = model_name
+        self.backend = backend or Config.TRANSCRIPTION_BACKEND
+        self.threads = threads
+        self.start_timeout = start_timeout
+        self.slots = SharedAudioSlots(slots or processes * 4, int(max_seconds * WHISPER_SAMPLE_RATE))
+        self.authkey = os.urandom(16)
+        self.listener = Listener(authkey=self.authkey)
+        self.request_ids = itertools.count()
+        self.lock = threading.Lock()
+        self.start_lock = threading.Lock()  # pairs each spawned process with the connection it opens
+        self.closed = False
+
+        self.completed = 0
+        self.errors = 0
+        self.copied = 0  # requests too long for a slot, sent pickled instead
+        self.restarts = 0
+
+        self.workers = [PoolWorker(i) for i in range(processes)]
+        try:
+            for worker in self.workers:
+                self._start(worker)
+        except Exception:
+            self.close()
+            raise
+
+    def submit(self, audio: np.ndarray, prompt: Optional[str] = None, mode='live', words=False) -> Future:
+        """Queue 16 kHz float32 audio for the least busy worker"""
+        audio = np.asarray(audio, dtype=np.float32)
+        slot = self.slots.acquire() if len(audio) <= self.slots.max_samples else None
+        if slot is not None:
+            self.slots.write(slot, audio)
+            payload = (slot, len(audio))
+        else:
+            payload = audio
+
+        future = Future()
+        with self.lock:
+            self.copied += slot is None
+            alive = [worker for worker in self.workers if worker.alive]
+            if self.closed or not alive:
+                if slot is not None:
+                    self.slots.release(slot)
+                raise RuntimeError("No transcription worker processes are running")
+            worker = min(alive, key=lambda w: len(w.inflight))
+            request_id = next(self.request_ids)
+            worker.inflight[request_id] = (future, slot)
+
+        try:
+            with worker.send_lock:
+                worker.connection.send((request_id, payload, prompt, mode, words))
+        except Exception as e:
+            self._resolve(worker, request_id, None, f"send failed: {e}")
+        return future
+
+    def transcribe(self, audio: np.ndarray, timeout: Optional[float] = None, prompt: Optional[str] = None,
+                   mode='live') -> str:
+        return self.submit(audio, prompt, mode).result(timeout=timeout)
+
+    def transcribe_words(self, audio: np.ndarray, prompt: Optional[str] = None, mode='live') -> list:
+        return self.submit(audio, prompt, mode, words=True).result()
+
+    def stats(self) -> dict:
+        with self.lock:
+            inflight = [len(worker.inflight) for worker in self.workers]
+            alive = sum(worker.alive for worker in self.workers)
+        return {
+            'processes': len(self.workers),
+            'alive': alive,
+            'threads_per_process': self.threads,
+            'inflight': inflight,
+            'free_slots': self.slots.free.qsize(),
+            'completed': self.completed,
+            'errors': self.errors,
+            'copied': self.copied,
+            'restarts': self.restarts
+        }
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            try:
+                with worker.send_lock:
+                    worker.connection.send(None)
+                worker.process.wait(timeout=5)
+            except Exception:
+                worker.process.kill()
+        self.listener.close()
+        self.slots.close()
+
+    def _start(self, worker: PoolWorker):
+        env = dict(os.environ)
+        # Pin the math libraries before the worker imports them
+        for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+            env[variable] = str(self.threads)
+        env['TRANSCRIPTION_POOL_AUTHKEY'] = self.authkey.hex()
+        with self.start_lock:
+            worker.process = self._spawn(worker, env)
+            # The worker connects before loading its model, so this only waits for the interpreter to start
+            worker.connection = self._accept(worker)
+        worker.alive = True
+        thread = threading.Thread(target=self._read_results, args=(worker,), name=f"transcription-pool-{worker.index}")
+        thread.daemon = True
+        thread.start()
+
+    def _accept(self, worker: PoolWorker):
+        """The connection the worker just spawned opens; kills it and raises if it exits or times out first"""
+        result = {}
+
+        def accept():
+            try:
+                result['connection'] = self.listener.accept()
+            except Exception as e:
+                result['error'] = e
+
+        thread = threading.Thread(target=accept, name=f"transcription-pool-accept-{worker.index}")
+        thread.daemon = True
+        thread.start()
+        deadline = time.monotonic() + self.start_timeout
+        while thread.is_alive() and worker.process.poll() is None and time.monotonic() < deadline:
+            thread.join(0.1)
+
+        exit_code = worker.process.poll()
+        if thread.is_alive():
+            worker.process.kill()
+            worker.process.wait()
+            # Unblock accept() with a bare connection; its failed handshake ends the thread
+            family = socket.AF_INET if isinstance(self.listener.address, tuple) else socket.AF_UNIX
+            with socket.socket(family) as unblock:
+                unblock.connect(self.listener.address)
+            thread.join()
+        if 'connection' not in result or worker.process.poll() is not None:
+            if 'connection' in result:
+                result['connection'].close()
+            worker.process.kill()
+            reason = f"exited with code {exit_code}" if exit_code is not None else \
+                f"did not connect within {self.start_timeout:g}s"
+            raise RuntimeError(f"Transcription worker {worker.index} {reason}")
+        return result['connection']
+
+    def _spawn(self, worker: PoolWorker, env: dict) -> subprocess.Popen:
+        return subprocess.Popen([
+            sys.executable, os.path.abspath(__file__),
+            '--address', self.listener.address,
+            '--index', str(worker.index),
+            '--shared-memory', self.slots.name,
+            '--slots', str(self.slots.slots),
+            '--max-samples', str(self.slots.max_samples),
+            '--model', self.model_name,
+            '--backend', self.backend,
+            '--threads', str(self.threads),
+            '--concurrency', str(worker_concurrency(self.backend))
+        ], env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    def _read_results(self, worker: PoolWorker):
+        try:
+            while True:
+                request_id, result, error = worker.connection.recv()
+                if request_id is None:
+                    worker.ready = True
+                    logging.info(f"Transcription worker {worker.index} (pid {worker.process.pid}) ready")
+                    continue
+                self._resolve(worker, request_id, result, error)
+        except (EOFError, OSError):
+            pass
+
+        with self.lock:
+            worker.alive = False
+            failed = list(worker.inflight)
+        for request_id in failed:
+            self._resolve(worker, request_id, None, "transcription worker exited")
+
+        if self.closed:
+            return
+        if not worker.ready:
+            logging.error(f"Transcription worker {worker.index} exited during startup; not restarting it")
+            return
+        logging.error(f"Transcription worker {worker.index} exited; restarting it")
+        self.restarts += 1
+        worker.ready = False
+        try:
+            self._start(worker)
+        except Exception as e:
+            logging.error(f"Error restarting transcription worker {worker.index}: {e}")
+
+    def _resolve(self, worker: PoolWorker, request_id: int, result, error: Optional[str]):
+        with self.lock:
+            entry = worker.inflight.pop(request_id, None)
+            if entry is None:
+                return
+            if error is None:
+                self.completed += 1
+            else:
+                self.errors += 1
+        future, slot = entry
+        if slot is not None:
+            self.slots.release(slot)
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(RuntimeError(error))
+
+
+def worker_main(args):
+    """Decode requests from the parent until it sends None.
+
+    Requests are read ahead and decoded on `args.concurrency` threads, so
+    the in-process transcriber sees several at once: BatchedTranscriber can
+    batch them and serve live ones ahead of background ones.
+    """
+    connection = Client(args.address, authkey=bytes.fromhex(os.environ['TRANSCRIPTION_POOL_AUTHKEY']))
+    slots = SharedAudioSlots(args.slots, args.max_samples, name=args.shared_memory)
+    send_lock = threading.Lock()
+
+    from whisper_server import create_transcriber
+    transcriber = create_transcriber(args.model, args.backend, processes=0, threads=args.threads)
+    connection.send((None, None, None))  # ready
+
+    def decode(request_id, payload, prompt, mode, words):
+        audio = slots.view(*payload) if isinstance(payload, tuple) else payload
+        try:
+            if words:
+                response = (request_id, transcriber.transcribe_words(audio, prompt=prompt, mode=mode), None)
+            else:
+                response = (request_id, transcriber.transcribe(audio, prompt=prompt, mode=mode), None)
+        except Exception as e:
+            logging.error(f"Error in transcription worker {args.index}: {e}")
+            response = (request_id, None, str(e) or type(e).__name__)
+        try:
+            with send_lock:
+                connection.send(response)
+        except OSError:
+            pass  # parent is gone
+
+    executor = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="transcription-worker")
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        executor.submit(decode, *request)
+
+    executor.shutdown(wait=True)
+    slots.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Transcription worker process (started by ProcessPoolTranscriber)")
+    parser.add_argument('--address', required=True)
+    parser.add_argument('--index', type=int, required=True)
+    parser.add_argument('--shared-memory', required=True)
+    parser.add_argument('--slots', type=int, required=True)
+    parser.add_argument('--max-samples', type=int, required=True)
+    parser.add_argument('--model', required=True)
+    parser.add_argument('--backend', required=True)
+    parser.add_argument('--threads', type=int, required=True)
+    parser.add_argument('--concurrency', type=int, default=1, help='requests decoded at once')
+    worker_main(parser.parse_args())
@@ -0,0 +1,158 @@
+import numpy as np
+from collections import deque
+from typing import List, Optional, Tuple
+
+
+class VoiceActivityDetector:
+    """Frame-level speech detection from energy, zero-crossing rate and spectral flatness.
+
+    All features are computed for a whole block at once on a (frames, samples)
+    view of the audio, so the per-block cost is a handful of NumPy calls.
+    """
+
+    def __init__(self, sample_rate=16000, frame_duration=0.02, snr_db=9.0,
+                 min_energy_db=-50.0, max_flatness=0.45, max_zcr=0.35, min_speech_duration=0.15):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_duration)
+        self.frame_duration = self.frame_size / sample_rate
+        self.snr_db = snr_db
+        self.min_energy_db = min_energy_db
+        self.max_flatness = max_flatness
+        self.max_zcr = max_zcr
+        self.min_speech_frames = max(1, int(round(min_speech_duration / self.frame_duration)))
+
+        self.window = np.hanning(self.frame_size).astype(np.float32)
+        self.noise_db = -60.0  # adaptive noise floor estimate
+
+    def frames(self, audio: np.ndarray) -> np.ndarray:
+        """View audio as non-overlapping frames, dropping any trailing partial frame"""
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        n_frames = len(audio) // self.frame_size
+        return audio[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+
+    def features(self, frames: np.ndarray):
+        """Return per-frame energy (dBFS), zero-crossing rate and spectral flatness"""
+        energy = np.mean(frames * frames, axis=1)
+        energy_db = 10.0 * np.log10(energy + 1e-10)
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_size - 1)
+
+        power = np.abs(np.fft.rfft(frames * self.window, axis=1)) ** 2 + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+        return energy_db, zcr, flatness
+
+    def speech_mask(self, audio: np.ndarray, update=True) -> np.ndarray:
+        """Boolean speech decision for each frame of the block"""
+        frames = self.frames(audio)
+        if len(frames) == 0:
+            return np.zeros(0, dtype=bool)
+
+        energy_db, zcr, flatness = self.features(frames)
+
+        if update:
+            # Track the noise floor quickly downwards and slowly upwards
+            quiet = float(np.percentile(energy_db, 10))
+            if quiet < self.noise_db:
+                self.noise_db = quiet
+            else:
+                self.noise_db = 0.95 * self.noise_db + 0.05 * quiet
+
+        threshold = max(self.noise_db + self.snr_db, self.min_energy_db)
+        loud = energy_db > threshold
+        # Voiced speech is harmonic (low flatness); fricatives are noisy but have a high ZCR with real energy
+        voiced = (flatness < self.max_flatness) & (zcr < self.max_zcr)
+        fricative = (zcr >= self.max_zcr) & (energy_db > threshold + self.snr_db)
+        return loud & (voiced | fricative)
+
+    def contains_speech(self, audio: np.ndarray) -> bool:
+        """True if the buffer holds a run of speech frames long enough not to be a click"""
+        mask = self.speech_mask(audio, update=False)
+        if len(mask) < self.min_speech_frames:
+            return False
+        run = np.convolve(mask.astype(np.int32), np.ones(self.min_speech_frames, dtype=np.int32), mode='valid')
+        return bool(np.any(run >= self.min_speech_frames))
+
+
+class UtteranceSegmenter:
+    """Splits a stream of audio blocks into utterances at natural pauses"""
+
+    def __init__(self, detector: VoiceActivityDetector, min_silence=0.6, max_utterance=15.0, padding=0.2):
+        self.detector = detector
+        self.frame_size = detector.frame_size
+        self.min_silence_frames = max(1, int(round(min_silence / detector.frame_duration)))
+        self.max_utterance_frames = int(round(max_utterance / detector.frame_duration))
+        self.padding_frames = int(round(padding / detector.frame_duration))
+
+        self.position = 0  # frames seen so far, for utterance start times
+        self.utterance_start = 0
+        self.reset()
+
+    def reset(self):
+        """Discard any partially collected utterance"""
+        self.active = False
+        self.remainder = np.zeros(0, dtype=np.float32)
+        self.pre_roll = deque(maxlen=self.padding_frames + self.detector.min_speech_frames)
+        self.speech_run = 0
+        self.silence_run = 0
+        self.utterance_frames = []
+
+    def push(self, audio_block: np.ndarray) -> List[np.ndarray]:
+        """Feed captured audio and return any utterances completed by it"""
+        return [utterance for _, utterance in self.push_timed(audio_block)]
+
+    def push_timed(self, audio_block: np.ndarray) -> List[Tuple[float, np.ndarray]]:
+        """push(), with each utterance's start in seconds since the segmenter was created"""
+        audio = np.concatenate((self.remainder, np.asarray(audio_block, dtype=np.float32).reshape(-1)))
+        frames = self.detector.frames(audio)
+        self.remainder = audio[len(frames) * self.frame_size:]
+
+        completed = []
+        for frame, is_speech in zip(frames, self.detector.speech_mask(audio)):
+            self.position += 1
+            if not self.active:
+                self.pre_roll.append(frame)
+                self.speech_run = self.speech_run + 1 if is_speech else 0
+                if self.speech_run >= self.detector.min_speech_frames:
+                    # Start the utterance with some leading context so onsets aren't clipped
+                    self.active = True
+                    self.utterance_start = self.position - len(self.pre_roll)
+                    self.utterance_frames = list(self.pre_roll)
+                    self.pre_roll.clear()
+                    self.silence_run = 0
+                continue
+
+            self.utterance_frames.append(frame)
+            self.silence_run = 0 if is_speech else self.silence_run + 1
+
+            if self.silence_run >= self.min_silence_frames:
+                completed.append(self._finish(trailing_silence=self.silence_run))
+            elif len(self.utterance_frames) >= self.max_utterance_frames:
+                # Overlong utterance: cut it here but keep listening
+                completed.append(self._finish(trailing_silence=0, keep_active=True))
+
+        return completed
+
+    def flush(self) -> Optional[np.ndarray]:
+        """Return the utterance in progress, if any, e.g. when capture stops"""
+        timed = self.flush_timed()
+        return timed[1] if timed else None
+
+    def flush_timed(self) -> Optional[Tuple[float, np.ndarray]]:
+        """flush(), with the utterance's start time"""
+        if not self.active:
+            return None
+        return self._finish(trailing_silence=self.silence_run)
+
+    def _finish(self, trailing_silence: int, keep_active=False) -> Tuple[float, np.ndarray]:
+        keep = len(self.utterance_frames) - max(0, trailing_silence - self.padding_frames)
+        utterance = np.concatenate(self.utterance_frames[:keep])
+        start = self.utterance_start * self.detector.frame_duration
+
+        self.utterance_frames = []
+        self.utterance_start = self.position  # a force-split utterance continues from the next frame
+        self.silence_run = 0
+        self.speech_run = 0
+        self.active = keep_active
+        return start, utterance
@@ -0,0 +1,372 @@
+import argparse
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.managers import BaseManager
+from typing import Optional
+
+import numpy as np
+
+from config import Config
+from decoding import BACKGROUND_MODES, decoding_profile, needs_fallback
+
+# torch and whisper take seconds and hundreds of MB to import, so they are
+# only loaded when a model is actually needed (see load_shared_model).
+torch = None
+whisper = None
+
+# Models loaded in this process, keyed by name, so every session shares one copy
+_models = {}
+_models_lock = threading.Lock()
+
+# Engines selectable through Config.TRANSCRIPTION_BACKEND
+TRANSCRIPTION_BACKENDS = ('whisper', 'faster-whisper')
+
+# In-process transcribers, keyed by (backend, model name)
+_transcribers = {}
+_transcribers_lock = threading.Lock()
+
+
+def _import_whisper():
+    global torch, whisper
+    if whisper is None:
+        import torch as torch_module
+        import whisper as whisper_module
+        torch, whisper = torch_module, whisper_module
+
+
+def load_shared_model(model_name: str):
+    """Load a Whisper model once per process"""
+    with _models_lock:
+        _import_whisper()
+        if model_name not in _models:
+            logging.info(f"Loading Whisper model '{model_name}'...")
+            _models[model_name] = whisper.load_model(model_name)
+            logging.info("Whisper model loaded successfully")
+        return _models[model_name]
+
+
+class BatchedTranscriber:
+    """Micro-batches transcription requests from many sessions onto one model.
+
+    Callers block on a Future while a single worker thread collects requests
+    until the batch is full or the oldest request has waited `max_wait`
+    seconds, then decodes the padded mel spectrograms in one forward pass.
+    Requests in a BACKGROUND_MODES mode wait in a separate lane that is only
+    served when no live request is waiting, and a background decode lets
+    waiting live requests go first before each of its decode passes.
+
+    Requests are grouped by mode only. whisper.decode() takes one prompt
+    for the whole batch, so a request decoded alongside others is decoded
+    without its transcript prompt unless they all share it (as a request
+that ends up alone does).
+    """
+
+    def __init__(self, model_name: str, batch_size=8, max_wait=0.05, threads=0):
+        self.model = load_shared_model(model_name)
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+
+        # Decodes run, and how many were retries at a higher temperature
+        self.decodes = 0
+        self.fallback_decodes = 0
+
+        if threads:
+            torch.set_num_threads(threads)
+
+        # Whisper modules are not safe to run concurrently from several threads
+        self.model_lock = threading.Lock()
+        self.condition = threading.Condition()
+        self.live = deque()
+        self.background = deque()
+
+        self.worker = threading.Thread(target=self._batch_loop, name="whisper-batcher")
+        self.worker.daemon = True
+        self.worker.start()
+
+    def submit(self, audio: np.ndarray, prompt: Optional[str] = None, mode='live') -> Future:
+        """Queue 16 kHz float32 audio for batched decoding"""
+        future = Future()
+        with self.condition:
+            lane = self.background if mode in BACKGROUND_MODES else self.live
+            lane.append((np.asarray(audio, dtype=np.float32), future, prompt, mode))
+            self.condition.notify()
+        return future
+
+    def transcribe(self, audio: np.ndarray, timeout: Optional[float] = None, prompt: Optional[str] = None,
+                   mode='live') -> str:
+        """Transcribe 16 kHz float32 audio, sharing a decode batch with other callers.
+
+        `prompt` is the preceding transcript to condition on and `mode` picks
+        the decoding profile ('live' or 'final').
+        """
+        if len(audio) > whisper.audio.N_SAMPLES:
+            # Longer than one Whisper window: needs the sequential long-form decoder
+            with self.model_lock:
+                return self.model.transcribe(audio, **self._transcribe_options(prompt, mode))["text"].strip()
+        return self.submit(audio, prompt, mode).result(timeout=timeout)
+
+    def transcribe_words(self, audio: np.ndarray, prompt: Optional[str] = None, mode='live') -> list:
+        """Transcribe with word timestamps; not batched since it needs the long-form decoder"""
+        with self.model_lock:
+            result = self.model.transcribe(
+                audio,
+                word_timestamps=True,
+                condition_on_previous_text=False,
+                **self._transcribe_options(prompt, mode)
+            )
+
+        words = []
+        for segment in result.get("segments", []):
+            for word in segment.get("words", []):
+                words.append({
+                    'word': word['word'],
+                    'start': float(word['start']),
+                    'end': float(word['end'])
+                })
+        return words
+
+    def stats(self) -> dict:
+        return {
+            'decodes': self.decodes,
+            'fallback_decodes': self.fallback_decodes
+        }
+
+    @staticmethod
+    def _transcribe_options(prompt, mode) -> dict:
+        """Keyword arguments for model.transcribe() under a decoding profile"""
+        profile = decoding_profile(mode)
+        return {
+            'language': "en",
+            'initial_prompt': prompt,
+            'temperature': profile['temperatures'],
+            'beam_size': profile['beam_size'] if profile['beam_size'] > 1 else None,
+            'best_of': profile['best_of']
+        }
+
+    def _batch_loop(self):
+        while True:
+            self._run_batch(self._next_batch())
+
+    def _next_batch(self) -> list:
+        with self.condition:
+            self.condition.wait_for(lambda: self.live or self.background)
+            if not self.live:
+                # Background work is not latency sensitive: take what is queued without waiting for more
+                return [self.background.popleft() for _ in range(min(len(self.background), self.batch_size))]
+
+            batch = [self.live.popleft()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.condition.wait_for(lambda: self.live, timeout=remaining):
+                    break
+                batch.append(self.live.popleft())
+            return batch
+
+    def _yield_to_live(self):
+        """Decode any live requests that arrived while background work was running"""
+        while True:
+            with self.condition:
+                if not self.live:
+                    return
+            self._run_batch(self._next_batch())
+
+    def _run_batch(self, batch):
+        # Requests can only share a decode if they share its options, so group by decoding profile
+        groups = {}
+        for audio, future, prompt, mode in batch:
+            groups.setdefault(mode, []).append((audio, future, prompt))
+
+        for mode, requests in groups.items():
+            self._decode_group(requests, mode)
+
+    def _decode_group(self, requests, mode):
+        futures = [future for _, future, _ in requests]
+        # One prompt applies to the whole batch, so it is kept only if every request in it has the same one
+        prompts = {prompt for _, _, prompt in requests}
+        prompt = prompts.pop() if len(prompts) == 1 else None
+        try:
+            mels = [
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=self.model.dims.n_mels)
+                for audio, _, _ in requests
+            ]
+            mel_batch = torch.stack(mels).to(self.model.device)
+            profile = decoding_profile(mode)
+            temperatures = profile['temperatures']
+
+            texts = [""] * len(requests)
+            pending = list(range(len(requests)))
+            for attempt, temperature in enumerate(temperatures):
+                if mode in BACKGROUND_MODES:
+                    self._yield_to_live()
+                options = self._decoding_options(profile, temperature, prompt)
+                with self.model_lock:
+                    results = whisper.decode(self.model, mel_batch[pending], options)
+                self.decodes += len(pending)
+
+                # Only the chunks whose decode failed go round again, one step hotter
+                retry = []
+                for index, result in zip(pending, results):
+                    texts[index] = result.text.strip()
+                    if needs_fallback(result.compression_ratio, result.avg_logprob, result.no_speech_prob):
+                        retry.append(index)
+
+                if not retry or attempt == len(temperatures) - 1:
+                    break
+                self.fallback_decodes += len(retry)
+                pending = retry
+
+            logging.debug(f"Decoded Whisper batch of {len(requests)} ({mode})")
+            for future, text in zip(futures, texts):
+                future.set_result(text)
+
+        except Exception as e:
+            logging.error(f"Error decoding Whisper batch: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _decoding_options(self, profile, temperature, prompt):
+        # Whisper takes beam_size for greedy (T=0) decodes and best_of for sampled ones, never both
+        greedy = temperature == 0
+        return whisper.DecodingOptions(
+            language="en",
+            temperature=temperature,
+            beam_size=profile['beam_size'] if greedy and profile['beam_size'] > 1 else None,
+            best_of=profile['best_of'] if not greedy else None,
+            prompt=prompt,
+            without_timestamps=True,
+            fp16=self.model.device.type == "cuda"
+        )
+
+
+class WhisperServerManager(BaseManager):
+    """Exposes a BatchedTranscriber to other processes on the host"""
+
+
+class WhisperClientManager(BaseManager):
+    """Connects to a running WhisperServerManager"""
+
+
+WhisperClientManager.register('get_transcriber')
+
+
+class RemoteTranscriber:
+    """Client for a transcriber served by `python whisper_server.py`"""
+
+    model = None  # the model lives in the server process
+
+    def __init__(self, address, authkey: bytes):
+        if not authkey:
+            raise ValueError("WHISPER_SERVER_AUTHKEY must be set to the Whisper server's key")
+        manager = WhisperClientManager(address=address, authkey=authkey)
+        manager.connect()
+        self.remote = manager.get_transcriber()
+        logging.info(f"Connected to Whisper server at {address}")
+
+    def transcribe(self, audio: np.ndarray, timeout: Optional[float] = None, prompt: Optional[str] = None,
+                   mode='live') -> str:
+        return self.remote.transcribe(audio, timeout, prompt, mode)
+
+    def transcribe_words(self, audio: np.ndarray, prompt: Optional[str] = None, mode='live') -> list:
+        return self.remote.transcribe_words(audio, prompt, mode)
+
+
+def parse_address(address: str):
+    """Turn 'host:port' into a manager address tuple"""
+    host, _, port = address.rpartition(':')
+    return (host or '127.0.0.1', int(port))
+
+
+def pool_threads(processes: int) -> int:
+    """Threads per worker process: TRANSCRIPTION_THREADS, or the cores split evenly"""
+    return Config.TRANSCRIPTION_THREADS or max(1, (os.cpu_count() or 1) // processes)
+
+
+def create_transcriber(model_name: str, backend: Optional[str] = None, processes: Optional[int] = None,
+                       threads: Optional[int] = None):
+    """Build a transcriber for the configured backend.
+
+    Every backend provides `transcribe(audio, timeout=None, prompt=None,
+    mode='live') -> str`, `transcribe_words(audio, prompt=None, mode='live')
+    -> list` and a `model` attribute (the openai-whisper model, or None),
+    all taking 16 kHz mono float32 audio. With `processes` (default
+    Config.TRANSCRIPTION_PROCESSES) the backend runs in that many worker
+    processes instead of this one.
+    """
+    backend = backend or Config.TRANSCRIPTION_BACKEND
+    processes = Config.TRANSCRIPTION_PROCESSES if processes is None else processes
+    threads = Config.TRANSCRIPTION_THREADS if threads is None else threads
+    if processes > 0:
+        from transcription_pool import ProcessPoolTranscriber
+        return ProcessPoolTranscriber(
+            model_name,
+            backend,
+            processes=processes,
+            threads=threads or pool_threads(processes),
+            max_seconds=Config.TRANSCRIPTION_POOL_MAX_SECONDS,
+            start_timeout=Config.TRANSCRIPTION_POOL_START_TIMEOUT
+        )
+    if backend == 'whisper':
+        return BatchedTranscriber(
+            model_name,
+            batch_size=Config.WHISPER_BATCH_SIZE,
+            max_wait=Config.WHISPER_BATCH_WAIT,
+            threads=threads
+        )
+    if backend == 'faster-whisper':
+        from transcription_backends import FasterWhisperTranscriber
+        return FasterWhisperTranscriber(
+            model_name,
+            device=Config.FASTER_WHISPER_DEVICE,
+            compute_type=Config.FASTER_WHISPER_COMPUTE_TYPE,
+            threads=threads,
+            workers=Config.FASTER_WHISPER_WORKERS
+        )
+    raise ValueError(f"Unknown transcription backend '{backend}', expected one of: {', '.join(TRANSCRIPTION_BACKENDS)}")
+
+
+def get_transcriber(model_name: str, backend: Optional[str] = None):
+    """Return the host-wide Whisper server if configured, else a shared in-process transcriber"""
+    if Config.WHISPER_SERVER_ADDRESS:
+        return RemoteTranscriber(parse_address(Config.WHISPER_SERVER_ADDRESS), Config.WHISPER_SERVER_AUTHKEY)
+
+    key = (backend or Config.TRANSCRIPTION_BACKEND, model_name)
+    with _transcribers_lock:
+        if key not in _transcribers:
+            _transcribers[key] = create_transcriber(model_name, key[0])
+        return _transcribers[key]
+
+
+def serve(address, authkey: bytes, model_name: str):
+    """Run the host-wide Whisper server until interrupted.
+
+    The manager unpickles whatever an authenticated peer sends, so the key
+    is the only thing between the port and code execution: it must be set
+    explicitly, and the server only leaves loopback when asked to.
+    """
+    if not authkey:
+        raise ValueError("Refusing to start without WHISPER_SERVER_AUTHKEY; generate one with "
+                         "python -c 'import secrets; print(secrets.token_hex(32))'")
+    transcriber = create_transcriber(model_name)
+    WhisperServerManager.register('get_transcriber', callable=lambda: transcriber)
+    manager = WhisperServerManager(address=address, authkey=authkey)
+    server = manager.get_server()
+    logging.info(f"Whisper server ({Config.TRANSCRIPTION_BACKEND}, {model_name}) listening on {address}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Host-wide Whisper server (key from WHISPER_SERVER_AUTHKEY)")
+    parser.add_argument('--address', default='127.0.0.1:5055',
+                        help="host:port to listen on; e.g. 0.0.0.0:5055 to accept other nodes")
+    args = parser.parse_args()
+    try:
+        serve(parse_address(args.address), Config.WHISPER_SERVER_AUTHKEY, Config.WHISPER_MODEL)
+    except ValueError as e:
+        parser.exit(1, f"{e}\n")